@@ -0,0 +1,337 @@
+"""
+Approximate pareto fronts with a bounded number of paths.
+Cost and fun are divided into boxes of width epsilon, of every box that is
+not dominated by another box one path is kept (epsilon-dominance archive).
+Every path that was offered, pareto optimal or not, then has a kept path
+with at most epsilon more cost and at most epsilon less fun.
+With a maximum size instead of epsilon, epsilon grows until the kept paths
+fit into it.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import bisect
+import doctest
+import heapq
+import math
+from graph import CAT_EDGES, cost_fun_graph
+from multiobjective_optimization import path_value
+from search_stats import SearchStats, timed
+
+
+TEST_PATHS1 = [("A", "C", "D", "F"), ("A", "B", "D", "F"),
+               ("A", "B", "E", "F")]
+
+
+class EpsilonArchive:
+    """
+    Online epsilon-dominance archive of (path, cost, fun) tuples.
+    The box of a path is (cost // epsilon, -fun // epsilon), only paths in
+    boxes that no other box dominates are kept, one per box. Within a box
+    a path replaces the kept one if it is at least as good in both values,
+    otherwise the path closer to the corner of the box is kept.
+    Without epsilon the paths are compared by their exact values until
+    there are more than max_size of them.
+    >>> archive = EpsilonArchive(epsilon=5)
+    >>> archive.add(("A", "C", "D", "F"), 6, 7)
+    True
+    >>> archive.add(("A", "B", "D", "F"), 10, 11)
+    True
+    >>> archive.add(("A", "X", "F"), 8, 9)
+    False
+    >>> archive.items()
+    [(('A', 'C', 'D', 'F'), 6, 7), (('A', 'B', 'D', 'F'), 10, 11)]
+    >>> archive = EpsilonArchive(max_size=2)
+    >>> archive.extend([("P1",), i, 2 * i] for i in range(10))
+    >>> len(archive), archive.epsilon
+    (2, 8.0)
+    >>> EpsilonArchive()
+    Traceback (most recent call last):
+    ...
+    ValueError: epsilon or max_size has to be given
+    """
+
+    def __init__(self, epsilon=None, max_size=None):
+        """
+        :param epsilon: width of the boxes, the approximation bound
+        :param max_size: highest number of kept paths, epsilon is doubled
+        whenever there are more
+        """
+        if epsilon is None and max_size is None:
+            raise ValueError("epsilon or max_size has to be given")
+        if epsilon is not None and epsilon <= 0:
+            raise ValueError("epsilon has to be positive")
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size has to be at least 1")
+        self.epsilon = epsilon
+        self.max_size = max_size
+        # Sorted by cost box, along it the fun box falls.
+        self._cost_boxes = []
+        self._fun_boxes = []
+        self._items = []
+
+    def add(self, path, cost, fun):
+        """
+        Adds a path to the archive if no kept path epsilon-dominates it
+        and removes the kept paths whose boxes it dominates.
+        :param path: a tuple of nodes
+        :param cost: the total cost of the path
+        :param fun: the total fun of the path
+        :return: True if the path was added
+        """
+        added = self._insert(path, cost, fun)
+        if added and self.max_size is not None:
+            while len(self._items) > self.max_size:
+                self._coarsen()
+        return added
+
+    def extend(self, evaluated_paths):
+        """
+        Adds every path of an iterable of (path, cost, fun) tuples.
+        """
+        for path, cost, fun in evaluated_paths:
+            self.add(path, cost, fun)
+
+    def items(self):
+        """
+        :return: a list of the kept (path, cost, fun) tuples, sorted by cost
+        """
+        return list(self._items)
+
+    def paths(self):
+        """
+        :return: a set of the kept paths
+        """
+        return {path for path, _, _ in self._items}
+
+    def __len__(self):
+        return len(self._items)
+
+    def _box(self, cost, fun):
+        if self.epsilon is None:
+            return cost, -fun
+        return (math.floor(cost / self.epsilon),
+                math.floor(-fun / self.epsilon))
+
+    def _insert(self, path, cost, fun):
+        cost_box, fun_box = self._box(cost, fun)
+        first = bisect.bisect_left(self._cost_boxes, cost_box)
+        # The box with the lowest fun box of all cheaper boxes.
+        if first > 0 and self._fun_boxes[first - 1] <= fun_box:
+            return False
+        if (first < len(self._items) and self._cost_boxes[first] == cost_box
+                and self._fun_boxes[first] <= fun_box):
+            if self._fun_boxes[first] < fun_box:
+                return False
+            # Same box, only one path is kept.
+            _, kept_cost, kept_fun = self._items[first]
+            if kept_cost <= cost and kept_fun >= fun:
+                return False
+            if (not (cost <= kept_cost and fun >= kept_fun)
+                    and self._corner_distance(cost, fun)
+                    >= self._corner_distance(kept_cost, kept_fun)):
+                return False
+            self._items[first] = (path, cost, fun)
+            return True
+        # Dominated boxes have a higher cost box and a higher fun box,
+        # they follow directly after position first.
+        last = first
+        while (last < len(self._items)
+               and self._fun_boxes[last] >= fun_box):
+            last += 1
+        self._cost_boxes[first:last] = [cost_box]
+        self._fun_boxes[first:last] = [fun_box]
+        self._items[first:last] = [(path, cost, fun)]
+        return True
+
+    def _corner_distance(self, cost, fun):
+        cost_box, fun_box = self._box(cost, fun)
+        return ((cost - cost_box * self.epsilon) ** 2
+                + (-fun - fun_box * self.epsilon) ** 2)
+
+    def _coarsen(self):
+        """
+        Doubles epsilon and puts the kept paths into the larger boxes.
+        A box of width 2 * epsilon contains whole boxes of width epsilon,
+        so every path seen so far stays epsilon-dominated.
+        """
+        if self.epsilon is None:
+            costs = [cost for _, cost, _ in self._items]
+            funs = [fun for _, _, fun in self._items]
+            self.epsilon = max(max(costs) - min(costs),
+                               max(funs) - min(funs)) / self.max_size
+        else:
+            self.epsilon *= 2
+        items = self._items
+        self._cost_boxes = []
+        self._fun_boxes = []
+        self._items = []
+        for path, cost, fun in items:
+            self._insert(path, cost, fun)
+
+
+def approximate_pareto(paths_list, edges_dict, epsilon=None, max_size=None,
+                       stats=None):
+    """
+    Calculates an approximate pareto front of a list of paths.
+    For every path a returned path has at most epsilon more cost
+    and at most epsilon less fun.
+    :param paths_list: a list containing tuples with nodes stored within
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param epsilon: approximation bound
+    :param max_size: highest number of returned paths
+    :param stats: optional SearchStats object, counts the paths that were
+    not chosen as pruned and times the evaluation and the archive
+    :return: a set of paths
+    >>> approximate_pareto(TEST_PATHS1, CAT_EDGES, 5) == {('A', 'C', 'D', 'F'),
+    ...     ('A', 'B', 'D', 'F')}
+    True
+    >>> approximate_pareto(TEST_PATHS1, CAT_EDGES, max_size=1)
+    {('A', 'C', 'D', 'F')}
+    >>> stats = SearchStats()
+    >>> _ = approximate_pareto(TEST_PATHS1, CAT_EDGES, 5, stats=stats)
+    >>> stats.paths_pruned, sorted(stats.phase_times)
+    (1, ['dominance', 'evaluation'])
+    """
+    archive = EpsilonArchive(epsilon, max_size)
+    # First calculate the cost and fun values for each path.
+    paths_values = path_value(paths_list, edges_dict, stats)
+    # Check if path is valid.
+    if paths_values is None:
+        return None
+    with timed(stats, "dominance"):
+        for path, (cost, fun) in zip(paths_list, paths_values):
+            archive.add(path, cost, fun)
+    if stats is not None:
+        stats.paths_pruned += len(paths_values) - len(archive)
+    optimal_paths = archive.paths()
+    # Check if optimal path exists.
+    if len(optimal_paths) == 0:
+        return None
+    return optimal_paths
+
+
+def approximate_pareto_front(start, goal, edges_dict, epsilon=None,
+                             max_size=None, stats=None):
+    """
+    Calculates an approximate pareto front from start to goal straight
+    from the graph, like pareto_labels. A partial path is discarded as soon
+    as another one at the same node lies in a box that is at least as good
+    and visited only nodes it visited as well. The boxes at the nodes have
+    the width epsilon / (2 * (number of nodes - 1)), because errors add up
+    along a path, the paths reaching the goal go into an EpsilonArchive
+    with epsilon / 2. For every pareto optimal path a returned path has
+    at most epsilon more cost and at most epsilon less fun.
+    With only max_size, partial paths are discarded by their exact values.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param epsilon: approximation bound
+    :param max_size: highest number of returned paths
+    :param stats: optional SearchStats object, counts expanded and
+    discarded partial paths and times the search
+    :return: a set of paths
+    >>> approximate_pareto_front("A", "F", CAT_EDGES, 0.5) == {
+    ...     ('A', 'C', 'D', 'F'), ('A', 'B', 'D', 'F')}
+    True
+    >>> approximate_pareto_front("A", "E", CAT_EDGES, max_size=1)
+    {('A', 'C', 'D', 'B', 'E')}
+    >>> approximate_pareto_front("A", "Z", CAT_EDGES, 1)
+    >>> stats = SearchStats()
+    >>> _ = approximate_pareto_front("A", "F", CAT_EDGES, 0.5, stats=stats)
+    >>> stats.nodes_expanded, stats.paths_completed
+    (9, 4)
+    """
+    if epsilon is None:
+        archive = EpsilonArchive(None, max_size)
+    else:
+        archive = EpsilonArchive(epsilon / 2, max_size)
+    edges_dict = cost_fun_graph(edges_dict)
+    # Every node gets a bit, visited nodes of a label are stored as bitmask.
+    node_bits = {node: 1 << i for i, node in enumerate(edges_dict.nodes)}
+    if start not in node_bits:
+        return None
+    if epsilon is None:
+        def box(cost, fun):
+            return cost, -fun
+    else:
+        node_epsilon = epsilon / (2 * max(len(node_bits) - 1, 1))
+
+        def box(cost, fun):
+            return (math.floor(cost / node_epsilon),
+                    math.floor(-fun / node_epsilon))
+    if start == goal:
+        archive.add((start,), 0, 0)
+    # A label is [cost box, fun box, visited mask, cost, fun, path, discarded].
+    first_label = [*box(0, 0), node_bits[start], 0, 0, (start,), False]
+    node_labels = {start: [first_label]}
+    queue = [(0, 0, 0, first_label)]
+    counter = 1
+    with timed(stats, "search"):
+        while queue:
+            *_, label = heapq.heappop(queue)
+            if label[6]:
+                continue
+            _, _, mask, cost, fun, path, _ = label
+            if stats is not None:
+                stats.max_depth = max(stats.max_depth, len(path) - 1)
+            neighbors = edges_dict.neighbors(path[-1])
+            if stats is not None:
+                stats.nodes_expanded += 1
+                stats.edges_scanned += len(neighbors)
+            for neighbor, edge_cost, edge_fun in neighbors:
+                neighbor_bit = node_bits[neighbor]
+                if mask & neighbor_bit:
+                    continue
+                new_cost = cost + edge_cost
+                new_fun = fun + edge_fun
+                if neighbor == goal:
+                    archive.add(path + (neighbor,), new_cost, new_fun)
+                    if stats is not None:
+                        stats.paths_completed += 1
+                    continue
+                new_label = [*box(new_cost, new_fun), mask | neighbor_bit,
+                             new_cost, new_fun, path + (neighbor,), False]
+                labels = node_labels.setdefault(neighbor, [])
+                if _box_dominated(new_label, labels):
+                    if stats is not None:
+                        stats.paths_pruned += 1
+                    continue
+                # Discard labels at the neighbor that the new label dominates.
+                remaining = []
+                for other in labels:
+                    if _box_dominated(other, [new_label]):
+                        other[6] = True
+                        if stats is not None:
+                            stats.paths_pruned += 1
+                    else:
+                        remaining.append(other)
+                remaining.append(new_label)
+                node_labels[neighbor] = remaining
+                heapq.heappush(queue, (new_cost, -new_fun, counter,
+                                       new_label))
+                counter += 1
+    optimal_paths = archive.paths()
+    # Check if optimal path exists.
+    if len(optimal_paths) == 0:
+        return None
+    return optimal_paths
+
+
+def _box_dominated(label, labels):
+    """
+    Checks whether one of the labels has a box that is at least as good
+    in both values and a visited mask that is a subset of the label's
+    visited mask.
+    """
+    cost_box, fun_box, mask = label[0], label[1], label[2]
+    for other in labels:
+        if (other[0] <= cost_box and other[1] <= fun_box
+                and other[2] & ~mask == 0):
+            return True
+    return False
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -0,0 +1,171 @@
+"""
+Answers many (start, goal) queries on one graph at once.
+The queries are grouped by their start node, work that only depends on
+the start node is done once per group:
+- weighted queries without negative edge scores use one shortest path
+  tree (one-to-all Dijkstra) per start node,
+- greedy queries use one greedy walk per start node, because the walk
+  does not depend on the goal.
+The groups are solved on a process pool, the results are returned
+in the order of the queries.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+from concurrent.futures import ProcessPoolExecutor
+from graph import CAT_EDGES, Graph, cost_fun_graph
+from greedy_algo import greedy_best_path, greedy_walk
+from dp_solver import weighted_best_path
+from exact_solver import ShortestPathTree, scores_non_negative
+
+
+# Graph and query parameters of a worker process, set by _init_worker.
+_worker = {}
+
+
+def group_queries(queries):
+    """
+    Groups queries by their start node, every goal is kept once.
+    :param queries: a list of (start, goal) tuples
+    :return: a list of (start, goals) tuples in the order
+    the start nodes first appear
+    >>> group_queries([("A", "F"), ("B", "F"), ("A", "E"), ("A", "F")])
+    [('A', ['F', 'E']), ('B', ['F'])]
+    """
+    groups = {}
+    for start, goal in queries:
+        goals = groups.setdefault(start, [])
+        if goal not in goals:
+            goals.append(goal)
+    return list(groups.items())
+
+
+def solve_group(graph, kind, parameters, start, goals):
+    """
+    Answers the queries of one start node.
+    :param graph: a Graph
+    :param kind: "tree" (shortest path tree), "weighted" (one search
+    per goal) or "greedy" (one greedy walk)
+    :param parameters: (weight_cost, weight_fun) or (focus_value,)
+    :param start: the start node of the group
+    :param goals: a list of goal nodes
+    :return: a list with the result of every goal
+    >>> solve_group(Graph(CAT_EDGES), "greedy", ("cost",), "A", ["F", "Z"])
+    [(('A', 'C', 'D', 'F'), 6, 7), None]
+    """
+    if kind == "tree":
+        tree = ShortestPathTree(start, graph, *parameters)
+        return [tree.query(goal) for goal in goals]
+    if kind == "weighted":
+        return [weighted_best_path(start, goal, graph, *parameters)
+                for goal in goals]
+    walk = greedy_walk(start, graph, *parameters)
+    # Cost and fun of the walk up to every node.
+    totals = {start: (0, 0)}
+    total_cost = 0
+    total_fun = 0
+    for node1, node2 in zip(walk, walk[1:]):
+        edge_cost, edge_fun = graph[(node1, node2)]
+        total_cost += edge_cost
+        total_fun += edge_fun
+        totals[node2] = (total_cost, total_fun)
+    positions = {node: i for i, node in enumerate(walk)}
+    results = []
+    for goal in goals:
+        # Like greedy_best_path, the walk has to leave the start node.
+        if goal == start or goal not in positions:
+            results.append(None)
+        else:
+            results.append((walk[:positions[goal] + 1],) + totals[goal])
+    return results
+
+
+def _init_worker(edges, kind, parameters):
+    _worker["graph"] = Graph(edges)
+    _worker["kind"] = kind
+    _worker["parameters"] = parameters
+
+
+def _solve_in_worker(group):
+    start, goals = group
+    return solve_group(_worker["graph"], _worker["kind"],
+                       _worker["parameters"], start, goals)
+
+
+def _run_groups(queries, graph, kind, parameters, max_workers):
+    groups = group_queries(queries)
+    if max_workers == 1 or len(groups) <= 1:
+        # A process pool is not worth it.
+        group_results = [solve_group(graph, kind, parameters, start, goals)
+                         for start, goals in groups]
+    else:
+        with ProcessPoolExecutor(
+                max_workers, initializer=_init_worker,
+                initargs=(dict(graph), kind, parameters)) as executor:
+            group_results = list(executor.map(_solve_in_worker, groups))
+    answers = {}
+    for (start, goals), results in zip(groups, group_results):
+        for goal, result in zip(goals, results):
+            answers[(start, goal)] = result
+    return [answers[query] for query in queries]
+
+
+def batch_best_paths(queries, edges_dict, weight_cost=1, weight_fun=1,
+                     max_workers=None):
+    """
+    Finds the path with the lowest optimize_weighted score for many queries.
+    Without negative edge scores one shortest path tree per start node
+    answers all of its goals, otherwise every query is searched with
+    dp_solver.weighted_best_path. Of several equally good paths
+    any one may be returned.
+    :param queries: a list of (start, goal) tuples
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param weight_cost: weight of the cost value
+    :param weight_fun: weight of the fun value
+    :param max_workers: number of processes (default: number of cores),
+    1 solves everything in this process
+    :return: a list with a (best_path, total_cost, total_fun) tuple
+    or None for every query
+    >>> batch_best_paths([("A", "F"), ("B", "C"), ("A", "Z")], CAT_EDGES,
+    ...                  1, 0, max_workers=2)
+    [(['A', 'C', 'D', 'F'], 6, 7), (['B', 'A', 'C'], 2, 0), None]
+    >>> batch_best_paths([("A", "F"), ("A", "E")], CAT_EDGES, max_workers=1)
+    [(['A', 'B', 'D', 'F'], 10, 11), (['A', 'C', 'D', 'B', 'E'], 9, 9)]
+    """
+    graph = cost_fun_graph(edges_dict)
+    if scores_non_negative(graph, weight_cost, weight_fun):
+        kind = "tree"
+    else:
+        kind = "weighted"
+    return _run_groups(queries, graph, kind, (weight_cost, weight_fun),
+                       max_workers)
+
+
+def batch_greedy_paths(queries, edges_dict, focus_value, max_workers=None):
+    """
+    Answers many greedy_best_path queries with one greedy walk
+    per start node, the results are the same as greedy_best_path's.
+    :param queries: a list of (start, goal) tuples
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param focus_value: "cost" or "fun"
+    :param max_workers: number of processes (default: number of cores),
+    1 solves everything in this process
+    :return: a list with a (path, total_cost, total_fun) tuple
+    or None for every query
+    >>> queries = [("A", "F"), ("A", "E"), ("B", "F")]
+    >>> (batch_greedy_paths(queries, CAT_EDGES, "cost", max_workers=1)
+    ...     == [greedy_best_path(start, goal, CAT_EDGES, "cost")
+    ...         for start, goal in queries])
+    True
+    """
+    # Make sure to only account for either cost or fun.
+    if focus_value not in ("cost", "fun"):
+        raise ValueError("Value has to be 'cost' or 'fun'")
+    return _run_groups(queries, cost_fun_graph(edges_dict), "greedy",
+                       (focus_value,), max_workers)
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -0,0 +1,419 @@
+"""
+Benchmark suite for the search and optimization functions.
+The functions are timed on seeded random, grid and scale-free graphs
+of growing size, every measurement has warm-up runs and repeats.
+The results are written as JSON, two result files can be compared
+to find regressions.
+
+Usage:
+    python benchmark.py run results.json
+    python benchmark.py compare old_results.json new_results.json
+    python benchmark.py gap
+    python benchmark.py memory
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import argparse
+import doctest
+import itertools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from graph_generators import GENERATORS
+from graph import Graph
+from recursive_function import recursive_best_path, optimize_weighted
+from greedy_algo import greedy_best_path, beam_best_path
+from exact_solver import focus_best_path
+from batch_queries import batch_best_paths
+from multiobjective_optimization import (
+    path_value, pareto_optimal, weighted_sum, epsilon_constraint)
+from pareto_archive import simple_paths
+from incremental import IncrementalPaths
+from approximate_pareto import approximate_pareto
+from k_best_paths import best_paths
+from path_trie import PathTrie
+from many_objectives import skyline_indices
+
+
+# Node counts for the exhaustive search and for the other functions.
+SEARCH_SIZES = (12, 16, 20, 24)
+SIZES = (16, 64, 256, 1024)
+# Number of candidate paths given to the optimization functions.
+PATH_COUNT = 2000
+# Number of (start, goal) queries of the batch case.
+QUERY_COUNT = 400
+# Objective counts and number of value vectors of the skyline cases.
+SKYLINE_DIMENSIONS = (2, 3, 4, 6)
+SKYLINE_POINTS = 5000
+# Number of alternatives of the k best paths case.
+K_BEST = 10
+# Node counts and number of edge changes of the incremental update cases,
+# the full recomputation takes seconds on larger graphs.
+UPDATE_SIZES = (16, 64, 256)
+UPDATE_COUNT = 10
+# Heuristics whose results are compared with the exact search:
+# name -> function(start, goal, edges, focus_value).
+HEURISTICS = {
+    "greedy": greedy_best_path,
+    "beam 3/1": beam_best_path,
+    "beam 8/2": lambda start, goal, edges, focus_value: beam_best_path(
+        start, goal, edges, focus_value, beam_width=8, lookahead=2),
+}
+
+
+def measure(function, repeat=5, warmup=1):
+    """
+    Times a function without arguments.
+    :param function: the function to time
+    :param repeat: number of timed runs
+    :param warmup: number of runs before timing
+    :return: a dictionary with the minimum, median, mean and
+    standard deviation of the run times in seconds
+    >>> sorted(measure(lambda: None, repeat=3))
+    ['max', 'mean', 'median', 'min', 'repeat', 'stdev']
+    """
+    for _ in range(warmup):
+        function()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        "max": max(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "repeat": repeat,
+    }
+
+
+def benchmark_cases(search_sizes=SEARCH_SIZES, sizes=SIZES,
+                    path_count=PATH_COUNT, seed=0):
+    """
+    Creates the benchmark cases, every case is timed separately.
+    The searches go from node 0 to the last node of each graph.
+    :param search_sizes: node counts for recursive_best_path
+    :param sizes: node counts for all other functions
+    :param path_count: number of candidate paths for the optimizations
+    :param seed: seed of the graph generators
+    :return: a list of (name, function) tuples
+    >>> [name for name, _ in benchmark_cases((4,), (), 5)][:3]
+    ['recursive_best_path/random/4', 'recursive_best_path/grid/4', \
+'recursive_best_path/scale_free/4']
+    """
+    cases = []
+    for kind, generate in GENERATORS.items():
+        for size in search_sizes:
+            edges = Graph(generate(size, seed=seed))
+            goal = max(edges.nodes)
+            cases.append((
+                f"recursive_best_path/{kind}/{size}",
+                lambda edges=edges, goal=goal: recursive_best_path(
+                    0, goal, edges, optimize_weighted)))
+    for kind, generate in GENERATORS.items():
+        for size in sizes:
+            edges = Graph(generate(size, seed=seed))
+            goal = max(edges.nodes)
+            paths = [path for path, _, _ in itertools.islice(
+                simple_paths(0, goal, edges), path_count)]
+            trie = PathTrie(paths)
+            # The same graph with two more objectives per edge.
+            generator = random.Random(seed)
+            edges_4d = Graph({edge: values + (generator.randint(1, 9),
+                                              generator.randint(0, 9))
+                              for edge, values in edges.items()})
+            # Queries from a few start nodes to many goals.
+            queries = [(i % 4, (i * 7919) % size)
+                       for i in range(QUERY_COUNT)]
+            cases += [
+                (f"greedy_best_path/{kind}/{size}",
+                 lambda edges=edges, goal=goal: greedy_best_path(
+                     0, goal, edges, "cost")),
+                (f"focus_best_path/{kind}/{size}",
+                 lambda edges=edges, goal=goal: focus_best_path(
+                     0, goal, edges, "cost")),
+                (f"k_best_paths/{kind}/{size}",
+                 lambda edges=edges, goal=goal: best_paths(
+                     0, goal, edges, K_BEST, 1, 0)),
+                (f"batch_best_paths/{kind}/{size}",
+                 lambda edges=edges, queries=queries: batch_best_paths(
+                     queries, edges, 1, 0, max_workers=1)),
+                (f"path_value/{kind}/{size}",
+                 lambda edges=edges, paths=paths: path_value(paths, edges)),
+                (f"path_value_4d/{kind}/{size}",
+                 lambda edges=edges_4d, paths=paths: path_value(
+                     paths, edges)),
+                (f"path_value_trie/{kind}/{size}",
+                 lambda edges=edges, trie=trie: path_value(trie, edges)),
+                (f"pareto_optimal/{kind}/{size}",
+                 lambda edges=edges, paths=paths: pareto_optimal(
+                     paths, edges)),
+                (f"approximate_pareto/{kind}/{size}",
+                 lambda edges=edges, paths=paths: approximate_pareto(
+                     paths, edges, max_size=16)),
+                (f"weighted_sum/{kind}/{size}",
+                 lambda edges=edges, paths=paths: weighted_sum(
+                     paths, edges, 1, 1)),
+                (f"epsilon_constraint/{kind}/{size}",
+                 lambda edges=edges, paths=paths: epsilon_constraint(
+                     paths, edges, "cost", 0)),
+            ]
+            if size in UPDATE_SIZES:
+                cases += [
+                    (f"incremental_updates/{kind}/{size}",
+                     update_workload(dict(edges), paths, True, seed=seed)),
+                    (f"full_recompute/{kind}/{size}",
+                     update_workload(dict(edges), paths, False, seed=seed)),
+                ]
+    generator = random.Random(seed)
+    for dimensions in SKYLINE_DIMENSIONS:
+        # Vectors near the plane where the values sum up to 1, most of them
+        # are pareto optimal.
+        points = []
+        for _ in range(SKYLINE_POINTS):
+            values = [generator.random() for _ in range(dimensions)]
+            total = sum(values)
+            points.append(tuple(value / total + generator.random() / 100
+                                for value in values))
+        cases.append((
+            f"skyline_indices/d{dimensions}/{SKYLINE_POINTS}",
+            lambda points=points, dimensions=dimensions: skyline_indices(
+                points, ("min",) * dimensions)))
+    return cases
+
+
+def update_workload(edges_dict, paths_list, incremental,
+                    update_count=UPDATE_COUNT, seed=0):
+    """
+    Creates a small-update workload: one edge of the paths changes,
+    then the pareto, weighted sum and epsilon constraint results are
+    queried again, update_count times.
+    :param edges_dict: a dictionary containing edges
+    and their respective cost and fun values
+    :param paths_list: a list containing tuples with nodes stored within
+    :param incremental: True to repair the results with IncrementalPaths,
+    False to recompute them after every change
+    :param update_count: number of edge changes per run
+    :param seed: seed of the changed edges and their values
+    :return: a function without arguments that runs the workload
+    >>> paths = [("A", "C", "D", "F"), ("A", "B", "D", "F")]
+    >>> edges = {("A", "B"): (3, 2), ("A", "C"): (1, 0), ("B", "D"): (4, 5),
+    ...          ("C", "D"): (2, 3), ("D", "F"): (3, 4)}
+    >>> update_workload(edges, paths, True, 5)()
+    >>> update_workload(edges, paths, False, 5)()
+    """
+    graph = Graph(edges_dict)
+    used_edges = sorted({edge for path in paths_list
+                         for edge in zip(path, path[1:])}, key=str)
+    generator = random.Random(seed)
+    updates = [(generator.choice(used_edges), generator.randint(1, 9),
+                generator.randint(0, 9)) for _ in range(update_count)]
+    if incremental:
+        paths = IncrementalPaths(paths_list, graph)
+
+        def run():
+            for (node1, node2), cost, fun in updates:
+                graph.set_edge(node1, node2, cost, fun)
+                paths.pareto_optimal()
+                paths.weighted_sum(1, 1)
+                paths.epsilon_constraint("cost", 10)
+    else:
+        def run():
+            for (node1, node2), cost, fun in updates:
+                graph.set_edge(node1, node2, cost, fun)
+                pareto_optimal(paths_list, graph)
+                weighted_sum(paths_list, graph, 1, 1)
+                epsilon_constraint(paths_list, graph, "cost", 10)
+    return run
+
+
+def run_benchmarks(cases, repeat=5, warmup=1):
+    """
+    Times every case.
+    :param cases: a list of (name, function) tuples
+    :param repeat: number of timed runs per case
+    :param warmup: number of runs before timing
+    :return: a dictionary with information about the machine
+    and the measurement of every case
+    """
+    results = {}
+    for name, function in cases:
+        results[name] = measure(function, repeat, warmup)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare_results(old, new, tolerance=0.10):
+    """
+    Compares two benchmark results by their median times.
+    :param old: the older benchmark result
+    :param new: the newer benchmark result
+    :param tolerance: allowed slowdown (0.10 means 10 percent)
+    :return: a list of (name, old median, new median, ratio) tuples
+    of all cases that became slower than allowed
+    >>> old = {"results": {"a": {"median": 1.0}, "b": {"median": 1.0}}}
+    >>> new = {"results": {"a": {"median": 1.05}, "b": {"median": 2.0}}}
+    >>> compare_results(old, new)
+    [('b', 1.0, 2.0, 2.0)]
+    """
+    regressions = []
+    for name, measurement in new["results"].items():
+        if name not in old["results"]:
+            continue
+        old_median = old["results"][name]["median"]
+        new_median = measurement["median"]
+        if old_median > 0 and new_median > old_median * (1 + tolerance):
+            regressions.append((name, old_median, new_median,
+                                new_median / old_median))
+    return regressions
+
+
+def path_set_memory(sizes=SIZES, path_count=PATH_COUNT, seed=0):
+    """
+    Measures the memory of the benchmark path sets stored as a list of
+    tuples and as a PathTrie (with tracemalloc, the node labels themselves
+    are shared and not counted).
+    :param sizes: node counts of the graphs
+    :param path_count: number of paths per graph
+    :param seed: seed of the graph generators
+    :return: a dictionary "kind/size" -> {"path_nodes", "trie_nodes",
+    "list_bytes", "trie_bytes"}
+    >>> memory = path_set_memory((8,), 50)
+    >>> sorted(memory["grid/8"])
+    ['list_bytes', 'path_nodes', 'trie_bytes', 'trie_nodes']
+    """
+    memory = {}
+    for kind, generate in GENERATORS.items():
+        for size in sizes:
+            edges = Graph(generate(size, seed=seed))
+            paths = [path for path, _, _ in itertools.islice(
+                simple_paths(0, max(edges.nodes), edges), path_count)]
+            tracemalloc.start()
+            paths_copy = [tuple(list(path)) for path in paths]
+            list_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            tracemalloc.start()
+            trie = PathTrie(paths_copy)
+            trie_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            memory[f"{kind}/{size}"] = {
+                "path_nodes": sum(len(path) for path in paths),
+                "trie_nodes": trie.stored_nodes(),
+                "list_bytes": list_bytes,
+                "trie_bytes": trie_bytes,
+            }
+    return memory
+
+
+def optimality_gaps(sizes=SEARCH_SIZES, seed=0, heuristics=None):
+    """
+    Compares the heuristics with the exact search on the benchmark graphs.
+    The gap is the relative distance to the optimal cost or fun,
+    0.0 is optimal, None means the heuristic found no path.
+    :param sizes: node counts of the graphs
+    :param seed: seed of the graph generators
+    :param heuristics: a dictionary name -> function(start, goal, edges,
+    focus_value), HEURISTICS by default
+    :return: a dictionary "kind/size/focus" -> {heuristic name: gap}
+    >>> gaps = optimality_gaps((6,), heuristics={"beam": beam_best_path})
+    >>> gaps["grid/6/cost"]
+    {'beam': 0.0}
+    """
+    if heuristics is None:
+        heuristics = HEURISTICS
+    gaps = {}
+    for kind, generate in GENERATORS.items():
+        for size in sizes:
+            edges = Graph(generate(size, seed=seed))
+            goal = max(edges.nodes)
+            for focus_value, value_index in (("cost", 1), ("fun", 2)):
+                exact = focus_best_path(0, goal, edges, focus_value)
+                if exact is None:
+                    continue
+                optimum = exact[value_index]
+                row = {}
+                for name, heuristic in heuristics.items():
+                    result = heuristic(0, goal, edges, focus_value)
+                    if result is None:
+                        row[name] = None
+                        continue
+                    # Positive gap: more cost or less fun than optimal.
+                    difference = result[value_index] - optimum
+                    if focus_value == "fun":
+                        difference = -difference
+                    row[name] = difference / max(abs(optimum), 1)
+                gaps[f"{kind}/{size}/{focus_value}"] = row
+    return gaps
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("output", help="JSON file for the results")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--warmup", type=int, default=1)
+    run_parser.add_argument("--seed", type=int, default=0)
+    compare_parser = commands.add_parser("compare",
+                                         help="compare two result files")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--tolerance", type=float, default=0.10)
+    gap_parser = commands.add_parser(
+        "gap", help="compare the heuristics with the exact search")
+    gap_parser.add_argument("--seed", type=int, default=0)
+    memory_parser = commands.add_parser(
+        "memory", help="memory of the path sets as tuples and as a trie")
+    memory_parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args(arguments)
+    if arguments.command == "memory":
+        for case, row in path_set_memory(seed=arguments.seed).items():
+            print(f"{case:24}{row['path_nodes']:>10}{row['trie_nodes']:>10}"
+                  f"{row['list_bytes']:>12}{row['trie_bytes']:>12}")
+        return 0
+    if arguments.command == "gap":
+        gaps = optimality_gaps(seed=arguments.seed)
+        names = list(HEURISTICS)
+        print(f"{'graph':24}" + "".join(f"{name:>10}" for name in names))
+        for case, row in gaps.items():
+            print(f"{case:24}" + "".join(
+                f"{'-':>10}" if row[name] is None else f"{row[name]:>10.1%}"
+                for name in names))
+        return 0
+    if arguments.command == "run":
+        results = run_benchmarks(benchmark_cases(seed=arguments.seed),
+                                 arguments.repeat, arguments.warmup)
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        for name, measurement in results["results"].items():
+            print(f"{name}: {measurement['median']:.6f}s")
+        return 0
+    with open(arguments.old, encoding="utf-8") as file:
+        old = json.load(file)
+    with open(arguments.new, encoding="utf-8") as file:
+        new = json.load(file)
+    regressions = compare_results(old, new, arguments.tolerance)
+    for name, old_median, new_median, ratio in regressions:
+        print(f"{name}: {old_median:.6f}s -> {new_median:.6f}s"
+              f" ({ratio:.2f}x)")
+    if not regressions:
+        print("No regressions found.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    doctest.testmod()
@@ -0,0 +1,173 @@
+"""
+Dynamic programming over (node, visited nodes) states for small graphs.
+Instead of trying every simple path, the best remaining score is stored
+once per node and set of visited nodes (a bitmask).
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+from array import array
+from graph import CAT_EDGES, cost_fun_graph
+from recursive_function import (
+    optimize_weighted, recursive_best_path, bounded_best_path)
+
+
+# Largest number of nodes solved with the bitmask table,
+# the table holds 2 ** n * n numbers.
+DP_NODE_THRESHOLD = 16
+
+
+def relevant_nodes(start, goal, edges_dict):
+    """
+    Finds the nodes that can be part of a path from start to goal,
+    these are reachable from start and can reach the goal.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :return: a list of nodes in the order of the graph's nodes
+    >>> relevant_nodes("A", "F", CAT_EDGES)
+    ['A', 'B', 'C', 'D', 'E', 'F']
+    >>> relevant_nodes("A", "F", {("A", "B"): (1, 1), ("C", "F"): (1, 1)})
+    []
+    """
+    edges_dict = cost_fun_graph(edges_dict)
+    incoming = {}
+    for node1, node2 in edges_dict:
+        incoming.setdefault(node2, []).append(node1)
+    reachable = _search(start, lambda node: (
+        neighbor for neighbor, _, _ in edges_dict.neighbors(node)))
+    reaching = _search(goal, lambda node: incoming.get(node, []))
+    if goal not in reachable:
+        return []
+    return [node for node in edges_dict.nodes
+            if node in reachable and node in reaching]
+
+
+def _search(first, next_nodes):
+    """
+    Returns every node that can be reached from first.
+    """
+    found = {first}
+    stack = [first]
+    while stack:
+        for node in next_nodes(stack.pop()):
+            if node not in found:
+                found.add(node)
+                stack.append(node)
+    return found
+
+
+def bitmask_best_path(start, goal, edges_dict, weight_cost=1, weight_fun=1):
+    """
+    Finds the path with the lowest optimize_weighted score by dynamic
+    programming over (node, visited mask) states, in O(2^n * n^2).
+    For every state the best score of the remaining way to the goal is
+    stored in an array. The path is then built from the start, always
+    taking the first edge that keeps the best score, so among equally good
+    paths the same one as recursive_best_path is returned.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param weight_cost: weight of the cost value
+    :param weight_fun: weight of the fun value
+    :return: a tuple (best_path, total_cost, total_fun) or None
+    >>> bitmask_best_path("A", "F", CAT_EDGES)
+    (['A', 'B', 'D', 'F'], 10, 11)
+    >>> bitmask_best_path("A", "F", CAT_EDGES, 10, 1)
+    (['A', 'C', 'D', 'F'], 6, 7)
+    >>> bitmask_best_path("A", "Z", CAT_EDGES) is None
+    True
+    """
+    if start == goal:
+        return [start], 0, 0
+    edges_dict = cost_fun_graph(edges_dict)
+    nodes = relevant_nodes(start, goal, edges_dict)
+    if not nodes:
+        return None
+    node_ids = {node: i for i, node in enumerate(nodes)}
+    # Edges between relevant nodes, in the order of the graph.
+    adjacency = [[(node_ids[neighbor],
+                   optimize_weighted(cost, fun, weight_cost, weight_fun))
+                  for neighbor, cost, fun in edges_dict.neighbors(node)
+                  if neighbor in node_ids]
+                 for node in nodes]
+    node_count = len(nodes)
+    goal_id = node_ids[goal]
+    unknown = float("nan")
+    # best_rest[mask * node_count + node]: best score from node to the goal
+    # without visiting the nodes in mask again.
+    best_rest = array("d", [unknown]) * ((1 << node_count) * node_count)
+
+    def rest(mask, node):
+        index = mask * node_count + node
+        value = best_rest[index]
+        if value == value:
+            return value
+        if node == goal_id:
+            value = 0.0
+        else:
+            value = float("inf")
+            for neighbor, score in adjacency[node]:
+                if not mask >> neighbor & 1:
+                    value = min(value,
+                                score + rest(mask | 1 << neighbor, neighbor))
+        best_rest[index] = value
+        return value
+
+    current = node_ids[start]
+    mask = 1 << current
+    if rest(mask, current) == float("inf"):
+        return None
+    # Follow the first edge that keeps the best score.
+    path = [start]
+    while current != goal_id:
+        for neighbor, score in adjacency[current]:
+            if (not mask >> neighbor & 1
+                    and score + rest(mask | 1 << neighbor, neighbor)
+                    == rest(mask, current)):
+                break
+        current = neighbor
+        mask |= 1 << neighbor
+        path.append(nodes[neighbor])
+    total_cost = 0
+    total_fun = 0
+    for node1, node2 in zip(path, path[1:]):
+        cost, fun = edges_dict[(node1, node2)]
+        total_cost += cost
+        total_fun += fun
+    return path, total_cost, total_fun
+
+
+def weighted_best_path(start, goal, edges_dict, weight_cost=1, weight_fun=1,
+                       dp_threshold=DP_NODE_THRESHOLD):
+    """
+    Finds the path with the lowest optimize_weighted score.
+    Small graphs (at most dp_threshold nodes that can be part of a path)
+    are solved with bitmask_best_path, larger graphs with the
+    branch-and-bound search.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param weight_cost: weight of the cost value
+    :param weight_fun: weight of the fun value
+    :param dp_threshold: largest number of nodes for the bitmask solver
+    :return: a tuple (best_path, total_cost, total_fun) or None
+    >>> (weighted_best_path("A", "F", CAT_EDGES)
+    ...     == weighted_best_path("A", "F", CAT_EDGES, dp_threshold=0)
+    ...     == recursive_best_path("A", "F", CAT_EDGES, optimize_weighted))
+    True
+    """
+    edges_dict = cost_fun_graph(edges_dict)
+    if len(relevant_nodes(start, goal, edges_dict)) <= dp_threshold:
+        return bitmask_best_path(start, goal, edges_dict,
+                                 weight_cost, weight_fun)
+    result, _ = bounded_best_path(start, goal, edges_dict,
+                                  weight_cost, weight_fun)
+    return result
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -0,0 +1,248 @@
+"""
+Exact solver that picks the fastest method for a query.
+If no edge has a negative optimize_weighted score (for example when only
+the cost matters), a best path never visits a node twice and Dijkstra's
+algorithm (or A* with a heuristic) finds it in O(E log V).
+Only negative edge scores need the search over simple paths.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+import heapq
+from graph import CAT_EDGES, cost_fun_graph
+from recursive_function import optimize_weighted
+from dp_solver import weighted_best_path
+from search_stats import SearchStats, timed
+
+
+# Weights of the single objective queries.
+FOCUS_WEIGHTS = {"cost": (1, 0), "fun": (0, 1)}
+
+
+def scores_non_negative(edges_dict, weight_cost=1, weight_fun=1):
+    """
+    Checks whether every edge has a score of at least 0.
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param weight_cost: weight of the cost value
+    :param weight_fun: weight of the fun value
+    :return: True if no edge score is negative
+    >>> scores_non_negative(CAT_EDGES, 1, 0), scores_non_negative(CAT_EDGES)
+    (True, False)
+    """
+    return all(optimize_weighted(cost, fun, weight_cost, weight_fun) >= 0
+               for cost, fun in cost_fun_graph(edges_dict).values())
+
+
+def dijkstra_best_path(start, goal, edges_dict, weight_cost=1, weight_fun=1,
+                       heuristic=None, stats=None):
+    """
+    Finds the path with the lowest optimize_weighted score with Dijkstra's
+    algorithm, or with A* if a heuristic is given.
+    The result is only optimal if no edge score is negative.
+    Of several equally good paths any one may be returned.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param weight_cost: weight of the cost value
+    :param weight_fun: weight of the fun value
+    :param heuristic: optional function node -> estimated score to the goal,
+    it must never estimate more than the real score (admissible)
+    :param stats: optional SearchStats object that counts the work
+    :return: a tuple (best_path, total_cost, total_fun) or None
+    >>> dijkstra_best_path("A", "F", CAT_EDGES, 1, 0)
+    (['A', 'C', 'D', 'F'], 6, 7)
+    >>> fewest_edges = {"A": 2, "B": 2, "C": 2, "D": 1, "E": 1, "F": 0}
+    >>> dijkstra_best_path("A", "F", CAT_EDGES, 1, 0, fewest_edges.get)
+    (['A', 'C', 'D', 'F'], 6, 7)
+    >>> dijkstra_best_path("A", "Z", CAT_EDGES, 1, 0)
+    >>> stats = SearchStats()
+    >>> _ = dijkstra_best_path("A", "F", CAT_EDGES, 1, 0, stats=stats)
+    >>> stats.nodes_expanded, stats.paths_completed
+    (5, 1)
+    """
+    if start == goal:
+        return [start], 0, 0
+    edges_dict = cost_fun_graph(edges_dict)
+    node_ids, adjacency = edges_dict.indexed()
+    if start not in node_ids or goal not in node_ids:
+        return None
+    nodes = edges_dict.nodes
+    start_id = node_ids[start]
+    goal_id = node_ids[goal]
+    with timed(stats, "search"):
+        previous = _dijkstra(start_id, adjacency, weight_cost, weight_fun,
+                             goal_id, heuristic, nodes, stats)
+    if goal_id not in previous:
+        return None
+    path, total_cost, total_fun = _tree_path(previous, start_id, goal_id)
+    if stats is not None:
+        stats.paths_completed += 1
+        stats.max_depth = max(stats.max_depth, len(path) - 1)
+    return [nodes[i] for i in path], total_cost, total_fun
+
+
+def _dijkstra(start_id, adjacency, weight_cost, weight_fun, goal_id=None,
+              heuristic=None, nodes=None, stats=None):
+    """
+    Dijkstra (A* with a heuristic on the node labels) on node ids.
+    Without a goal every reachable node is settled.
+    :return: a dictionary node id -> (previous node id, cost, fun)
+    of the edge the node is reached with
+    """
+    if heuristic is None:
+        def estimate(_):
+            return 0
+    else:
+        def estimate(node):
+            return heuristic(nodes[node])
+    # Best known score of every node and the edge it was reached with.
+    scores = {start_id: 0}
+    previous = {}
+    queue = [(estimate(start_id), 0, start_id)]
+    while queue:
+        _, score, node = heapq.heappop(queue)
+        if score > scores[node]:
+            # A better way to this node was found in the meantime.
+            continue
+        if node == goal_id:
+            break
+        edges = adjacency[node]
+        if stats is not None:
+            stats.nodes_expanded += 1
+            stats.edges_scanned += len(edges)
+        for neighbor, edge_cost, edge_fun in edges:
+            new_score = score + optimize_weighted(
+                edge_cost, edge_fun, weight_cost, weight_fun)
+            if new_score < scores.get(neighbor, float("inf")):
+                scores[neighbor] = new_score
+                previous[neighbor] = (node, edge_cost, edge_fun)
+                heapq.heappush(queue, (new_score + estimate(neighbor),
+                                       new_score, neighbor))
+    return previous
+
+
+def _tree_path(previous, start_id, goal_id):
+    """
+    Walks back from the goal along the stored edges.
+    :return: a tuple (path of node ids, total_cost, total_fun)
+    """
+    path = [goal_id]
+    total_cost = 0
+    total_fun = 0
+    while path[-1] != start_id:
+        node, edge_cost, edge_fun = previous[path[-1]]
+        path.append(node)
+        total_cost += edge_cost
+        total_fun += edge_fun
+    path.reverse()
+    return path, total_cost, total_fun
+
+
+class ShortestPathTree:
+    """
+    Best paths from one start node to every other node (one-to-all),
+    computed with a single run of Dijkstra. Only correct if no edge
+    has a negative optimize_weighted score.
+    >>> tree = ShortestPathTree("A", CAT_EDGES, 1, 0)
+    >>> tree.query("F"), tree.query("E")
+    ((['A', 'C', 'D', 'F'], 6, 7), (['A', 'B', 'E'], 5, 3))
+    >>> tree.query("A"), tree.query("Z")
+    ((['A'], 0, 0), None)
+    """
+
+    def __init__(self, start, edges_dict, weight_cost=1, weight_fun=1):
+        """
+        :param start: a string containing the start node
+        :param edges_dict: a Graph or a dictionary containing edges
+        and their respective cost and fun values
+        :param weight_cost: weight of the cost value
+        :param weight_fun: weight of the fun value
+        """
+        self.start = start
+        graph = cost_fun_graph(edges_dict)
+        self._nodes = graph.nodes
+        node_ids, adjacency = graph.indexed()
+        self._node_ids = node_ids
+        self._previous = {}
+        if start in node_ids:
+            self._previous = _dijkstra(node_ids[start], adjacency,
+                                       weight_cost, weight_fun)
+
+    def query(self, goal):
+        """
+        :param goal: a string containing the goal node
+        :return: a tuple (best_path, total_cost, total_fun) or None
+        """
+        if goal == self.start:
+            return [goal], 0, 0
+        goal_id = self._node_ids.get(goal)
+        if goal_id not in self._previous:
+            return None
+        path, total_cost, total_fun = _tree_path(
+            self._previous, self._node_ids[self.start], goal_id)
+        return [self._nodes[i] for i in path], total_cost, total_fun
+
+
+def exact_best_path(start, goal, edges_dict, weight_cost=1, weight_fun=1,
+                    heuristic=None):
+    """
+    Finds the path with the lowest optimize_weighted score.
+    Without negative edge scores Dijkstra (or A* with the heuristic)
+    is used, otherwise dp_solver.weighted_best_path.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param weight_cost: weight of the cost value
+    :param weight_fun: weight of the fun value
+    :param heuristic: optional admissible function node -> estimated score
+    to the goal, only used by A*
+    :return: a tuple (best_path, total_cost, total_fun) or None
+    >>> exact_best_path("A", "F", CAT_EDGES, 1, 0)
+    (['A', 'C', 'D', 'F'], 6, 7)
+    >>> exact_best_path("A", "F", CAT_EDGES, 0, 1)
+    (['A', 'B', 'D', 'F'], 10, 11)
+    """
+    if start == goal:
+        return [start], 0, 0
+    edges_dict = cost_fun_graph(edges_dict)
+    if scores_non_negative(edges_dict, weight_cost, weight_fun):
+        return dijkstra_best_path(start, goal, edges_dict, weight_cost,
+                                  weight_fun, heuristic)
+    return weighted_best_path(start, goal, edges_dict, weight_cost,
+                              weight_fun)
+
+
+def focus_best_path(start, goal, edges_dict, focus_value, heuristic=None):
+    """
+    Exact counterpart of greedy_best_path: the path with the lowest cost
+    or the highest fun. The lowest cost is found with Dijkstra,
+    the highest fun needs the search over simple paths.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param focus_value: "cost" or "fun"
+    :param heuristic: optional admissible function node -> lowest
+    remaining cost, only used for "cost"
+    :return: a tuple (path, total_cost, total_fun) or None
+    >>> focus_best_path("A", "F", CAT_EDGES, "cost")
+    (('A', 'C', 'D', 'F'), 6, 7)
+    >>> focus_best_path("A", "E", CAT_EDGES, "fun")
+    (('A', 'B', 'D', 'F', 'E'), 15, 11)
+    """
+    # Make sure to only account for either cost or fun.
+    if focus_value not in FOCUS_WEIGHTS:
+        raise ValueError("Value has to be 'cost' or 'fun'")
+    result = exact_best_path(start, goal, edges_dict,
+                             *FOCUS_WEIGHTS[focus_value], heuristic)
+    if result is None:
+        return None
+    path, total_cost, total_fun = result
+    return tuple(path), total_cost, total_fun
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -0,0 +1,443 @@
+"""
+Graph object with a precomputed adjacency index.
+The edges are given in the same dictionary format used everywhere
+in the project: {(start, goal): (cost, fun)}.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+from array import array
+from collections.abc import Mapping
+
+
+# Example graph, the other modules import it for their doctests.
+CAT_EDGES = {
+    ("A", "B"): (3, 2),
+    ("A", "C"): (1, 0),
+    ("B", "A"): (1, 0),
+    ("B", "D"): (4, 5),
+    ("B", "E"): (2, 1),
+    ("C", "A"): (1, 0),
+    ("C", "D"): (2, 3),
+    ("D", "B"): (4, 5),
+    ("D", "C"): (2, 3),
+    ("D", "F"): (3, 4),
+    ("E", "B"): (2, 1),
+    ("E", "F"): (5, 0),
+    ("F", "D"): (3, 4),
+    ("F", "E"): (5, 0)
+}
+
+
+class Graph(Mapping):
+    """
+    A directed graph built from an edge dictionary.
+    For every node the outgoing edges are stored once,
+    so finding the neighbors of a node does not scan every edge.
+    The graph still behaves like the edge dictionary it was built from,
+    which means it can be passed to every function expecting edges_dict.
+    >>> graph = Graph(CAT_EDGES)
+    >>> graph.neighbors("B")
+    [('A', 1, 0), ('D', 4, 5), ('E', 2, 1)]
+    >>> graph[("D", "F")]
+    (3, 4)
+    >>> len(graph), graph.nodes
+    (14, ['A', 'B', 'C', 'D', 'E', 'F'])
+    >>> graph.neighbors("Z")
+    []
+    >>> Graph({("A", "B"): (1, 2, 3), ("B", "C"): (4, 5)})
+    Traceback (most recent call last):
+    ...
+    ValueError: Every edge needs 3 values.
+    """
+
+    def __init__(self, edges_dict):
+        """
+        :param edges_dict: a dictionary containing edges
+        and their respective cost and fun values
+        """
+        self._edges = dict(edges_dict)
+        # Number of values per edge, two (cost and fun) for an empty graph.
+        self.dimensions = len(next(iter(self._edges.values()), (0, 0)))
+        if any(len(values) != self.dimensions
+               for values in self._edges.values()):
+            raise ValueError(f"Every edge needs {self.dimensions} values.")
+        # Dense edge arrays, built on demand by path_evaluation.edge_table.
+        self._edge_table = None
+        self._indexed = None
+        self._adjacency = {}
+        self._listeners = []
+        # Counts the changes made with set_edge and remove_edge.
+        self.version = 0
+        self.nodes = []
+        for (node1, node2), values in self._edges.items():
+            self._add_nodes(node1, node2)
+            self._adjacency[node1].append((node2, *values))
+
+    def _add_nodes(self, *nodes):
+        # Register nodes in order of their first appearance.
+        for node in nodes:
+            if node not in self._adjacency:
+                self._adjacency[node] = []
+                self.nodes.append(node)
+
+    def set_edge(self, node1, node2, *values):
+        """
+        Adds an edge or changes the values of an existing edge.
+        An existing edge keeps its position among the neighbors.
+        :param node1: a string containing the start node of the edge
+        :param node2: a string containing the goal node of the edge
+        :param values: the new cost and fun value, a graph with more values
+        per edge needs all of them
+        >>> graph = Graph(CAT_EDGES)
+        >>> graph.set_edge("B", "D", 1, 1)
+        >>> graph.set_edge("B", "G", 2, 2)
+        >>> graph.neighbors("B"), graph.version
+        ([('A', 1, 0), ('D', 1, 1), ('E', 2, 1), ('G', 2, 2)], 2)
+        >>> graph.set_edge("B", "D", 1, 1, 1)
+        Traceback (most recent call last):
+        ...
+        ValueError: Every edge needs 2 values.
+        """
+        if not self._edges:
+            self.dimensions = len(values)
+        if len(values) != self.dimensions:
+            raise ValueError(f"Every edge needs {self.dimensions} values.")
+        old_value = self._edges.get((node1, node2))
+        self._edges[(node1, node2)] = values
+        self._add_nodes(node1, node2)
+        neighbors = self._adjacency[node1]
+        if old_value is None:
+            neighbors.append((node2, *values))
+        else:
+            for i, edge in enumerate(neighbors):
+                if edge[0] == node2:
+                    neighbors[i] = (node2, *values)
+                    break
+        self._changed(node1, node2, old_value, values)
+
+    def remove_edge(self, node1, node2):
+        """
+        Removes an edge, its nodes stay part of the graph.
+        :param node1: a string containing the start node of the edge
+        :param node2: a string containing the goal node of the edge
+        >>> graph = Graph(CAT_EDGES)
+        >>> graph.remove_edge("B", "A")
+        >>> graph.neighbors("B"), ("B", "A") in graph
+        ([('D', 4, 5), ('E', 2, 1)], False)
+        """
+        old_value = self._edges.pop((node1, node2))
+        self._adjacency[node1] = [edge for edge in self._adjacency[node1]
+                                  if edge[0] != node2]
+        self._changed(node1, node2, old_value, None)
+
+    def add_listener(self, listener):
+        """
+        Registers a function that is called after every edge change
+        as listener(node1, node2, old_value, new_value),
+        old_value is None for a new edge, new_value for a removed edge.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Removes a function registered with add_listener.
+        """
+        self._listeners.remove(listener)
+
+    def _changed(self, node1, node2, old_value, new_value):
+        self.version += 1
+        # Derived data has to be built again.
+        self._edge_table = None
+        self._indexed = None
+        for listener in list(self._listeners):
+            listener(node1, node2, old_value, new_value)
+
+    def neighbors(self, node):
+        """
+        Returns the outgoing edges of a node.
+        :param node: a string containing the node
+        :return: a list of (neighbor, cost, fun) tuples
+        in the order the edges were given, edges with more values
+        give (neighbor, value 1, ..., value n) tuples
+        >>> Graph({("A", "B"): (1, 2, 3)}).neighbors("A")
+        [('B', 1, 2, 3)]
+        """
+        return self._adjacency.get(node, [])
+
+    def indexed(self):
+        """
+        Returns the graph with integer node ids, the ids follow self.nodes.
+        The result is built once and kept.
+        :return: a tuple (node_ids, adjacency), node_ids maps every node to
+        its id, adjacency holds a list of (neighbor id, cost, fun) per id
+        >>> node_ids, adjacency = Graph(CAT_EDGES).indexed()
+        >>> node_ids["B"], adjacency[node_ids["B"]]
+        (1, [(0, 1, 0), (3, 4, 5), (4, 2, 1)])
+        """
+        if self._indexed is None:
+            node_ids = {node: i for i, node in enumerate(self.nodes)}
+            adjacency = [[(node_ids[edge[0]],) + edge[1:]
+                          for edge in self._adjacency[node]]
+                         for node in self.nodes]
+            self._indexed = (node_ids, adjacency)
+        return self._indexed
+
+    def __getitem__(self, edge):
+        return self._edges[edge]
+
+    def __iter__(self):
+        return iter(self._edges)
+
+    def __len__(self):
+        return len(self._edges)
+
+    def __contains__(self, edge):
+        return edge in self._edges
+
+    def __repr__(self):
+        return f"Graph({self._edges!r})"
+
+
+class CompactGraph(Mapping):
+    """
+    A read-only graph with compact, array-backed storage.
+    Node labels are replaced by integer ids. The outgoing edges of node i
+    are stored at the positions offsets[i] to offsets[i + 1] - 1 of the
+    targets, costs and funs arrays (CSR format), in the order the edges
+    were given. It offers the same methods as Graph (except changes),
+    so every search and optimization function accepts it.
+    >>> graph = CompactGraph(CAT_EDGES)
+    >>> graph.neighbors("B")
+    [('A', 1, 0), ('D', 4, 5), ('E', 2, 1)]
+    >>> graph[("D", "F")], len(graph), ("F", "A") in graph
+    ((3, 4), 14, False)
+    >>> list(graph.offsets), list(graph.targets[:5])
+    ([0, 2, 5, 7, 10, 12, 14], [1, 2, 0, 3, 4])
+    >>> graph.to_dict() == CAT_EDGES
+    True
+    >>> CompactGraph({("A", "B"): (1, 2, 3)})
+    Traceback (most recent call last):
+    ...
+    ValueError: A CompactGraph stores 2 values (cost, fun) per edge, not 3.
+    """
+
+    # Only cost and fun are stored.
+    dimensions = 2
+
+    __slots__ = ("nodes", "node_ids", "offsets", "targets", "costs", "funs",
+                 "file_path", "_edge_table", "_indexed")
+
+    def __init__(self, edges_dict):
+        """
+        :param edges_dict: a Graph or a dictionary containing edges
+        and their respective cost and fun values
+        """
+        self.nodes = []
+        self.node_ids = {}
+        for node1, node2 in edges_dict:
+            for node in (node1, node2):
+                if node not in self.node_ids:
+                    self.node_ids[node] = len(self.nodes)
+                    self.nodes.append(node)
+        # Count the outgoing edges of every node to get the offsets.
+        degrees = [0] * (len(self.nodes) + 1)
+        for node1, _ in edges_dict:
+            degrees[self.node_ids[node1] + 1] += 1
+        for i in range(len(self.nodes)):
+            degrees[i + 1] += degrees[i]
+        self.offsets = array("q", degrees)
+        values = list(edges_dict.values())
+        for value in values:
+            if len(value) != self.dimensions:
+                raise ValueError(
+                    f"A CompactGraph stores {self.dimensions} values"
+                    f" (cost, fun) per edge, not {len(value)}.")
+        self.targets = array("i", bytes(4 * len(values)))
+        self.costs = _value_array([value[0] for value in values])
+        self.funs = _value_array([value[1] for value in values])
+        # Fill the edges in their original order.
+        positions = degrees[:-1]
+        for ((node1, node2), (cost, fun)) in zip(edges_dict, values):
+            node_id = self.node_ids[node1]
+            position = positions[node_id]
+            positions[node_id] += 1
+            self.targets[position] = self.node_ids[node2]
+            self.costs[position] = cost
+            self.funs[position] = fun
+        # Path of the graph file the arrays are mapped from, see graph_file.
+        self.file_path = None
+        self._edge_table = None
+        self._indexed = None
+
+    @classmethod
+    def from_arrays(cls, nodes, offsets, targets, costs, funs):
+        """
+        Builds a graph directly from its CSR arrays without copying them.
+        Any sequences with indexing and slicing can be used,
+        for example arrays or memoryviews of a mapped file.
+        :param nodes: a list of node labels, the index is the node id
+        :param offsets: the first edge position of every node and
+        the number of edges at the end
+        :param targets: the node id of every edge's goal node
+        :param costs: the cost of every edge
+        :param funs: the fun of every edge
+        :return: a CompactGraph
+        >>> graph = CompactGraph.from_arrays(["A", "B"], [0, 1, 1], [1],
+        ...                                  [3], [2])
+        >>> graph.to_dict()
+        {('A', 'B'): (3, 2)}
+        """
+        graph = cls.__new__(cls)
+        graph.nodes = nodes
+        graph.node_ids = {node: i for i, node in enumerate(nodes)}
+        graph.offsets = offsets
+        graph.targets = targets
+        graph.costs = costs
+        graph.funs = funs
+        graph.file_path = None
+        graph._edge_table = None
+        graph._indexed = None
+        return graph
+
+    def neighbors(self, node):
+        """
+        Returns the outgoing edges of a node.
+        :param node: a string containing the node
+        :return: a list of (neighbor, cost, fun) tuples
+        in the order the edges were given
+        """
+        node_id = self.node_ids.get(node)
+        if node_id is None:
+            return []
+        first = self.offsets[node_id]
+        last = self.offsets[node_id + 1]
+        nodes = self.nodes
+        return [(nodes[target], cost, fun) for target, cost, fun in zip(
+            self.targets[first:last], self.costs[first:last],
+            self.funs[first:last])]
+
+    def indexed(self):
+        """
+        Returns the graph with integer node ids, like Graph.indexed.
+        The rows of the adjacency are built from the arrays when they
+        are used, so no second copy of the edges is kept.
+        :return: a tuple (node_ids, adjacency)
+        """
+        if self._indexed is None:
+            self._indexed = (self.node_ids, _CsrRows(self))
+        return self._indexed
+
+    def to_dict(self):
+        """
+        Converts the graph back to the edge dictionary format.
+        :return: a dictionary containing edges
+        and their respective cost and fun values
+        """
+        return dict(self.items())
+
+    def _find(self, edge):
+        node1, node2 = edge
+        node_id = self.node_ids.get(node1)
+        target = self.node_ids.get(node2)
+        if node_id is not None and target is not None:
+            for position in range(self.offsets[node_id],
+                                  self.offsets[node_id + 1]):
+                if self.targets[position] == target:
+                    return position
+        return None
+
+    def __getitem__(self, edge):
+        position = self._find(edge)
+        if position is None:
+            raise KeyError(edge)
+        return self.costs[position], self.funs[position]
+
+    def __contains__(self, edge):
+        return self._find(edge) is not None
+
+    def __iter__(self):
+        for node_id, node in enumerate(self.nodes):
+            for position in range(self.offsets[node_id],
+                                  self.offsets[node_id + 1]):
+                yield node, self.nodes[self.targets[position]]
+
+    def __len__(self):
+        return len(self.targets)
+
+    def __repr__(self):
+        return f"CompactGraph({self.to_dict()!r})"
+
+
+class _CsrRows:
+    """
+    Adjacency rows of a CompactGraph as lists of
+    (neighbor id, cost, fun) tuples, built on access.
+    """
+
+    __slots__ = ("_graph",)
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __getitem__(self, node_id):
+        graph = self._graph
+        first = graph.offsets[node_id]
+        last = graph.offsets[node_id + 1]
+        return list(zip(graph.targets[first:last], graph.costs[first:last],
+                        graph.funs[first:last]))
+
+    def __len__(self):
+        return len(self._graph.nodes)
+
+
+def _value_array(values):
+    """
+    Stores edge values as 64 bit integers if possible, else as floats.
+    """
+    if all(isinstance(value, int) for value in values):
+        return array("q", values)
+    return array("d", values)
+
+
+def as_graph(edges):
+    """
+    Makes sure the edges are available as a Graph.
+    An existing Graph or CompactGraph is returned as it is,
+    an edge dictionary is converted.
+    :param edges: a Graph, a CompactGraph or a dictionary containing edges
+    and their respective cost and fun values
+    :return: a Graph or CompactGraph
+    >>> graph = as_graph(CAT_EDGES)
+    >>> as_graph(graph) is graph
+    True
+    """
+    if isinstance(edges, (Graph, CompactGraph)):
+        return edges
+    return Graph(edges)
+
+
+def cost_fun_graph(edges):
+    """
+    Like as_graph, for the functions that only work with the two values
+    cost and fun. Edges with other numbers of values are rejected,
+    instead of failing somewhere inside a search.
+    :param edges: a Graph, a CompactGraph or a dictionary containing edges
+    and their respective cost and fun values
+    :return: a Graph or CompactGraph
+    >>> cost_fun_graph(CAT_EDGES).dimensions
+    2
+    >>> cost_fun_graph({("A", "B"): (1, 2, 3)})
+    Traceback (most recent call last):
+    ...
+    ValueError: Edges need 2 values (cost, fun), not 3.
+    """
+    graph = as_graph(edges)
+    if graph.dimensions != 2:
+        raise ValueError(
+            f"Edges need 2 values (cost, fun), not {graph.dimensions}.")
+    return graph
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -0,0 +1,204 @@
+"""
+Binary graph file format that is opened with mmap.
+A file holds a header, the node label table, the CSR adjacency and the
+cost and fun columns, so loading a graph does not parse or copy the edges.
+Text edge lists (CSV or whitespace separated) are converted in two passes
+without keeping the edges in memory.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+import mmap
+import struct
+from graph import CAT_EDGES, CompactGraph, cost_fun_graph
+
+
+MAGIC = b"CATG"
+FORMAT_VERSION = 1
+# magic, format version, node count, edge count, size of the label bytes,
+# type of the cost and fun columns ("q" integers or "d" floats)
+HEADER = struct.Struct("<4sIQQQc7x")
+
+
+def _layout(node_count, edge_count, label_size):
+    """
+    Calculates the (start, length) of every section, all sections
+    start at a multiple of 8 bytes.
+    :return: a tuple (sections, file size)
+    """
+    sections = {}
+    position = HEADER.size
+    for name, length in (("label_offsets", 8 * (node_count + 1)),
+                         ("labels", label_size),
+                         ("offsets", 8 * (node_count + 1)),
+                         ("targets", 4 * edge_count),
+                         ("costs", 8 * edge_count),
+                         ("funs", 8 * edge_count)):
+        sections[name] = (position, length)
+        position += (length + 7) // 8 * 8
+    return sections, position
+
+
+def _parse_number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _write(file_path, read_edges):
+    """
+    Writes a graph file from a function that returns a new iterator
+    of (node1, node2, cost, fun) rows every time it is called.
+    The rows are read twice, the edges are never all in memory.
+    """
+    # First pass: node ids, number of outgoing edges, value type.
+    node_ids = {}
+    degrees = []
+    edge_count = 0
+    integers = True
+    for node1, node2, cost, fun in read_edges():
+        for node in (node1, node2):
+            if node not in node_ids:
+                node_ids[node] = len(node_ids)
+                degrees.append(0)
+        degrees[node_ids[node1]] += 1
+        edge_count += 1
+        integers = integers and isinstance(cost, int) and isinstance(fun, int)
+    labels = [str(node).encode("utf-8") for node in node_ids]
+    label_size = sum(len(label) for label in labels)
+    sections, file_size = _layout(len(node_ids), edge_count, label_size)
+    value_type = "q" if integers else "d"
+    with open(file_path, "w+b") as file:
+        file.truncate(file_size)
+        with mmap.mmap(file.fileno(), file_size) as mapped:
+            HEADER.pack_into(mapped, 0, MAGIC, FORMAT_VERSION, len(node_ids),
+                             edge_count, label_size, value_type.encode())
+            view = memoryview(mapped)
+            columns = {name: view[start:start + length]
+                       for name, (start, length) in sections.items()}
+            label_offsets = columns["label_offsets"].cast("q")
+            position = 0
+            for i, label in enumerate(labels):
+                label_offsets[i] = position
+                columns["labels"][position:position + len(label)] = label
+                position += len(label)
+            label_offsets[len(labels)] = position
+            offsets = columns["offsets"].cast("q")
+            next_positions = []
+            position = 0
+            for i, degree in enumerate(degrees):
+                offsets[i] = position
+                next_positions.append(position)
+                position += degree
+            offsets[len(degrees)] = position
+            # Second pass: every edge goes to the next free position
+            # of its start node.
+            targets = columns["targets"].cast("i")
+            costs = columns["costs"].cast(value_type)
+            funs = columns["funs"].cast(value_type)
+            for node1, node2, cost, fun in read_edges():
+                node_id = node_ids[node1]
+                position = next_positions[node_id]
+                next_positions[node_id] += 1
+                targets[position] = node_ids[node2]
+                costs[position] = cost
+                funs[position] = fun
+            for column in (label_offsets, offsets, targets, costs, funs):
+                column.release()
+            for column in columns.values():
+                column.release()
+            view.release()
+
+
+def write_graph(edges_dict, file_path):
+    """
+    Writes a graph to a binary graph file.
+    Node labels are stored as text.
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param file_path: path of the graph file
+    """
+    edges_dict = cost_fun_graph(edges_dict)
+    _write(file_path, lambda: (
+        (node1, node2, cost, fun)
+        for (node1, node2), (cost, fun) in edges_dict.items()))
+
+
+def convert_edge_list(text_path, file_path, delimiter=","):
+    """
+    Converts a text file with one edge per line (start, goal, cost, fun)
+    to a binary graph file. Empty lines and lines starting with "#" are
+    skipped, a first line without numbers is taken as a header.
+    Every edge has to appear only once.
+    :param text_path: path of the CSV or edge list file
+    :param file_path: path of the graph file
+    :param delimiter: separator of the columns, None for whitespace
+    """
+    def read_edges():
+        with open(text_path, encoding="utf-8") as text_file:
+            first_row = True
+            for line_number, line in enumerate(text_file, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                columns = [column.strip() for column in line.split(delimiter)]
+                if len(columns) != 4:
+                    raise ValueError(
+                        f"Line {line_number} needs start, goal, cost and fun.")
+                try:
+                    cost = _parse_number(columns[2])
+                    fun = _parse_number(columns[3])
+                except ValueError:
+                    if first_row:
+                        first_row = False
+                        continue
+                    raise ValueError(
+                        f"Line {line_number} has an invalid cost or fun.")
+                first_row = False
+                yield columns[0], columns[1], cost, fun
+
+    _write(file_path, read_edges)
+
+
+def load_graph(file_path):
+    """
+    Opens a binary graph file with mmap. The edge arrays of the returned
+    CompactGraph are views of the mapped file, only the node labels
+    are read when loading.
+    :param file_path: path of the graph file
+    :return: a CompactGraph
+    >>> import os, tempfile
+    >>> file_path = os.path.join(tempfile.mkdtemp(), "cat.graph")
+    >>> write_graph(CAT_EDGES, file_path)
+    >>> graph = load_graph(file_path)
+    >>> graph.neighbors("B"), graph.to_dict() == CAT_EDGES
+    ([('A', 1, 0), ('D', 4, 5), ('E', 2, 1)], True)
+    >>> graph.file_path == file_path
+    True
+    """
+    with open(file_path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    (magic, version, node_count, edge_count, label_size,
+     value_type) = HEADER.unpack_from(mapped, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("File is not a graph file of a supported version.")
+    value_type = value_type.decode()
+    sections, _ = _layout(node_count, edge_count, label_size)
+    view = memoryview(mapped)
+    columns = {name: view[start:start + length]
+               for name, (start, length) in sections.items()}
+    label_offsets = columns["label_offsets"].cast("q")
+    labels = columns["labels"]
+    nodes = [str(labels[label_offsets[i]:label_offsets[i + 1]], "utf-8")
+             for i in range(node_count)]
+    graph = CompactGraph.from_arrays(
+        nodes, columns["offsets"].cast("q"), columns["targets"].cast("i"),
+        columns["costs"].cast(value_type), columns["funs"].cast(value_type))
+    # Other processes can map the same file instead of copying the edges.
+    graph.file_path = file_path
+    return graph
+
+
+if __name__ == "__main__":
+    doctest.testmod()
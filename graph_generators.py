@@ -0,0 +1,123 @@
+"""
+Seeded generators for synthetic test graphs.
+Every generator returns an edge dictionary in the project's format
+{(start, goal): (cost, fun)} with integer nodes 0 to n - 1.
+The same seed always gives the same graph.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+import math
+import random
+
+
+def _edge_values(generator, max_cost, max_fun):
+    return generator.randint(1, max_cost), generator.randint(0, max_fun)
+
+
+def random_graph(node_count, average_degree=3, seed=0, max_cost=9,
+                 max_fun=9):
+    """
+    Creates a random directed graph. A path 0 -> 1 -> ... -> n - 1 is
+    always part of it, so the last node can be reached from node 0.
+    :param node_count: number of nodes
+    :param average_degree: average number of outgoing edges per node
+    :param seed: seed of the random numbers
+    :param max_cost: highest cost of an edge
+    :param max_fun: highest fun of an edge
+    :return: a dictionary containing edges
+    and their respective cost and fun values
+    >>> random_graph(3, 1, seed=1)
+    {(0, 1): (3, 9), (1, 2): (2, 4), (2, 1): (4, 1)}
+    """
+    generator = random.Random(seed)
+    edges = {}
+    for node in range(node_count - 1):
+        edges[(node, node + 1)] = _edge_values(generator, max_cost, max_fun)
+    wanted = min(int(node_count * average_degree),
+                 node_count * (node_count - 1))
+    while len(edges) < wanted:
+        node1 = generator.randrange(node_count)
+        node2 = generator.randrange(node_count)
+        if node1 != node2 and (node1, node2) not in edges:
+            edges[(node1, node2)] = _edge_values(generator, max_cost, max_fun)
+    return edges
+
+
+def grid_graph(node_count, seed=0, max_cost=9, max_fun=9):
+    """
+    Creates a square grid (like a street map), neighboring nodes
+    are connected in both directions with the same values.
+    :param node_count: approximate number of nodes,
+    the side length is its rounded square root
+    :param seed: seed of the random numbers
+    :param max_cost: highest cost of an edge
+    :param max_fun: highest fun of an edge
+    :return: a dictionary containing edges
+    and their respective cost and fun values
+    >>> sorted(grid_graph(4, seed=1))
+    [(0, 1), (0, 2), (1, 0), (1, 3), (2, 0), (2, 3), (3, 1), (3, 2)]
+    """
+    generator = random.Random(seed)
+    side = max(1, round(math.sqrt(node_count)))
+    edges = {}
+    for row in range(side):
+        for column in range(side):
+            node = row * side + column
+            for neighbor in (node + 1 if column + 1 < side else None,
+                             node + side if row + 1 < side else None):
+                if neighbor is not None:
+                    values = _edge_values(generator, max_cost, max_fun)
+                    edges[(node, neighbor)] = values
+                    edges[(neighbor, node)] = values
+    return edges
+
+
+def scale_free_graph(node_count, edges_per_node=2, seed=0, max_cost=9,
+                     max_fun=9):
+    """
+    Creates a scale-free graph (Barabasi-Albert): every new node connects
+    to existing nodes chosen with a probability proportional to their
+    degree, so a few nodes become hubs. Edges go in both directions.
+    :param node_count: number of nodes
+    :param edges_per_node: number of connections of every new node
+    :param seed: seed of the random numbers
+    :param max_cost: highest cost of an edge
+    :param max_fun: highest fun of an edge
+    :return: a dictionary containing edges
+    and their respective cost and fun values
+    >>> len(scale_free_graph(10, 2, seed=1))
+    34
+    """
+    generator = random.Random(seed)
+    edges = {}
+    # Every node appears in this list once per connection.
+    endpoints = []
+    first_nodes = min(node_count, edges_per_node + 1)
+    for node1 in range(first_nodes):
+        for node2 in range(node1 + 1, first_nodes):
+            values = _edge_values(generator, max_cost, max_fun)
+            edges[(node1, node2)] = values
+            edges[(node2, node1)] = values
+            endpoints += [node1, node2]
+    for node in range(first_nodes, node_count):
+        targets = set()
+        while len(targets) < edges_per_node:
+            targets.add(generator.choice(endpoints))
+        for target in sorted(targets):
+            values = _edge_values(generator, max_cost, max_fun)
+            edges[(node, target)] = values
+            edges[(target, node)] = values
+            endpoints += [node, target]
+    return edges
+
+
+GENERATORS = {
+    "random": random_graph,
+    "grid": grid_graph,
+    "scale_free": scale_free_graph,
+}
+
+
+if __name__ == "__main__":
+    doctest.testmod()
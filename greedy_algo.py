@@ -3,47 +3,69 @@
 __author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
 
 import doctest
+import heapq
 from multiobjective_optimization import path_value
+from graph import CAT_EDGES, Graph, cost_fun_graph
+from search_stats import SearchStats, timed
 
 
-CAT_EDGES = {
-    ("A", "B"): (3, 2),
-    ("A", "C"): (1, 0),
-    ("B", "A"): (1, 0),
-    ("B", "D"): (4, 5),
-    ("B", "E"): (2, 1),
-    ("C", "A"): (1, 0),
-    ("C", "D"): (2, 3),
-    ("D", "B"): (4, 5),
-    ("D", "C"): (2, 3),
-    ("D", "F"): (3, 4),
-    ("E", "B"): (2, 1),
-    ("E", "F"): (5, 0),
-    ("F", "D"): (3, 4),
-    ("F", "E"): (5, 0)
-}
-
-
-def greedy_best_path(start, goal, graph_edges, focus_value):
+def greedy_best_path(start, goal, graph_edges, focus_value, stats=None):
     """
     Finds a path to a goal on a graph
     by choosing the current best edge to progress.
-    :param graph_edges: a dictionary containing edges
+    :param graph_edges: a Graph or a dictionary containing edges
     and their respective cost and fun values
     :param start: a string containing the start node
     :param goal: a string containing the goal node
     :param focus_value: a string cointaining the value
     for the greedy-algorithm to take into account
+    :param stats: optional SearchStats object that counts the work
+    and times the search and the evaluation of the path
     :return: a path to the goal or the furthest path before reaching a dead end
     >>> greedy_best_path("A", "F", CAT_EDGES,"cost")
     (('A', 'C', 'D', 'F'), 6, 7)
     >>> greedy_best_path("A", "F", CAT_EDGES, "fun")
     (('A', 'B', 'D', 'F'), 10, 11)
     >>> greedy_best_path("A", "E", CAT_EDGES, "fun")
+    >>> greedy_best_path("A", "F", Graph(CAT_EDGES), "cost")
+    (('A', 'C', 'D', 'F'), 6, 7)
+    >>> stats = SearchStats()
+    >>> _ = greedy_best_path("A", "F", CAT_EDGES, "cost", stats)
+    >>> stats.nodes_expanded, stats.edges_scanned, stats.max_depth
+    (3, 7, 3)
     """
     # Make sure to only account for either cost or fun.
     if focus_value not in ("cost", "fun"):
         raise ValueError("Value has to be 'cost' or 'fun'")
+    graph_edges = cost_fun_graph(graph_edges)
+    with timed(stats, "search"):
+        optimal_path = greedy_walk(start, graph_edges, focus_value, goal,
+                                   stats)
+    # The walk ended in a dead end.
+    if len(optimal_path) == 1 or optimal_path[-1] != goal:
+        return None
+    with timed(stats, "evaluation"):
+        optimal_path_value = path_value([optimal_path], graph_edges)
+    optimal_path_cost = optimal_path_value[0][0]
+    optimal_path_fun = optimal_path_value[0][1]
+    return optimal_path, optimal_path_cost, optimal_path_fun
+
+
+def greedy_walk(start, graph_edges, focus_value, goal=None, stats=None):
+    """
+    Walks from start along the best edge of every node
+    until the goal or a dead end is reached.
+    The walk does not depend on the goal, greedy_best_path to any node
+    of the walk follows the walk up to that node.
+    :param start: a string containing the start node
+    :param graph_edges: a Graph
+    :param focus_value: "cost" or "fun"
+    :param goal: optional node that ends the walk
+    :param stats: optional SearchStats object that counts the work
+    :return: a tuple of the visited nodes
+    >>> greedy_walk("A", Graph(CAT_EDGES), "cost")
+    ('A', 'C', 'D', 'F', 'E', 'B')
+    """
     current = start
     visited_nodes = [start]
     # Keep repeating until goal or dead end is reached.
@@ -55,39 +77,193 @@ def greedy_best_path(start, goal, graph_edges, focus_value):
             max_fun = 0
         # Find most optimal edge for current node.
         optimal_edge = None
-        # Search every edge for the lowest cost or highest fun.
-        for i in graph_edges:
-            """
-            Make sure edge is connected to current node
-            and has not been visited yet.
-            """
-            if i[0] == current and i[1] not in visited_nodes:
+        neighbors = graph_edges.neighbors(current)
+        if stats is not None:
+            stats.nodes_expanded += 1
+            stats.edges_scanned += len(neighbors)
+        # Search every outgoing edge for the lowest cost or highest fun.
+        for neighbor, next_edge_cost, next_edge_fun in neighbors:
+            # Make sure the next node has not been visited yet.
+            if neighbor not in visited_nodes:
                 if focus_value == "cost":
-                    next_edge_cost = graph_edges[i][0]
                     # Set new minimum cost/maximum fun.
                     if next_edge_cost < min_cost:
                         min_cost = next_edge_cost
-                        optimal_edge = i
+                        optimal_edge = (current, neighbor)
                 else:
-                    next_edge_fun = graph_edges[i][1]
                     if next_edge_fun > max_fun:
                         max_fun = next_edge_fun
-                        optimal_edge = i
+                        optimal_edge = (current, neighbor)
         # If no optimal edge has been found, it is a dead end.
         if optimal_edge is None:
-            return None
+            return tuple(visited_nodes)
         # Go to next node.
         current = optimal_edge[1]
         visited_nodes.append(current)
+        if stats is not None:
+            stats.max_depth = max(stats.max_depth, len(visited_nodes) - 1)
         if goal == current:
-            optimal_path = tuple(visited_nodes)
-            optimal_path_value = path_value([optimal_path], graph_edges)
-            optimal_path_cost = optimal_path_value[0][0]
-            optimal_path_fun = optimal_path_value[0][1]
-            break
-    return optimal_path, optimal_path_cost, optimal_path_fun
+            if stats is not None:
+                stats.paths_completed += 1
+            return tuple(visited_nodes)
+
+
+def beam_best_path(start, goal, graph_edges, focus_value, beam_width=3,
+                   lookahead=1, max_backtracks=10, stats=None):
+    """
+    Finds a path to a goal with a beam search, a middle ground between
+    greedy_best_path (one edge per step) and the exact search.
+    Every step extends all paths of the beam by one edge, only the
+    beam_width best new paths are kept. A new path is rated by its summed
+    cost (or fun) plus the best value of the next lookahead edges after it;
+    a path that runs into a dead end within the lookahead is dropped.
+    The paths that did not fit into the beam are kept in a heap. If every
+    path of the beam ends in a dead end, the best of them form the next
+    beam, this backtracking happens at most max_backtracks times.
+    Paths that reach the goal are not extended, the best of them is kept
+    until the beam runs empty, so a later step can still find a better one.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param graph_edges: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param focus_value: "cost" (lowest cost) or "fun" (highest fun)
+    :param beam_width: number of paths extended in every step
+    :param lookahead: number of edges looked ahead when rating a path
+    :param max_backtracks: how often the search may go back to paths
+    that did not fit into the beam
+    :param stats: optional SearchStats object that counts the work
+    :return: a tuple (path, total_cost, total_fun) or None
+    >>> beam_best_path("A", "F", CAT_EDGES, "cost")
+    (('A', 'C', 'D', 'F'), 6, 7)
+    >>> beam_best_path("A", "F", CAT_EDGES, "fun", beam_width=2, lookahead=2)
+    (('A', 'B', 'D', 'F'), 10, 11)
+
+    Greedy runs into a dead end here, the beam search gets further:
+    >>> beam_best_path("A", "E", CAT_EDGES, "fun")
+    (('A', 'B', 'D', 'F', 'E'), 15, 11)
+    >>> dead_end = {("A", "B"): (1, 0), ("A", "C"): (2, 0), ("C", "D"): (1, 0)}
+    >>> beam_best_path("A", "D", dead_end, "cost", 1, 0)
+    (('A', 'C', 'D'), 3, 0)
+    >>> beam_best_path("A", "D", dead_end, "cost", 1, 0, max_backtracks=0)
+    >>> beam_best_path("A", "Z", CAT_EDGES, "cost")
+
+    The direct edge reaches the goal first, the longer path is cheaper:
+    >>> detour = {("A", "F"): (10, 0), ("A", "B"): (1, 0), ("B", "F"): (1, 0)}
+    >>> beam_best_path("A", "F", detour, "cost")
+    (('A', 'B', 'F'), 2, 0)
+    """
+    # Make sure to only account for either cost or fun.
+    if focus_value not in ("cost", "fun"):
+        raise ValueError("Value has to be 'cost' or 'fun'")
+    graph_edges = cost_fun_graph(graph_edges)
+    node_ids, adjacency = graph_edges.indexed()
+    if start not in node_ids or goal not in node_ids:
+        return None
+    if start == goal:
+        return (start,), 0, 0
+    with timed(stats, "search"):
+        optimal_path = _beam_search(
+            node_ids[start], node_ids[goal], adjacency, focus_value,
+            beam_width, lookahead, max_backtracks, stats)
+    if optimal_path is None:
+        return None
+    optimal_path = tuple(graph_edges.nodes[i] for i in optimal_path)
+    with timed(stats, "evaluation"):
+        optimal_path_value = path_value([optimal_path], graph_edges)
+    return optimal_path, optimal_path_value[0][0], optimal_path_value[0][1]
+
+
+def _beam_search(start_id, goal_id, adjacency, focus_value, beam_width,
+                 lookahead, max_backtracks, stats):
+    """
+    Beam search of beam_best_path on node ids.
+    Lower ratings are better, fun is negated.
+    :return: the path as a tuple of node ids or None
+    """
+    def edge_rating(edge):
+        return edge[1] if focus_value == "cost" else -edge[2]
+
+    # If no rating is negative, a path can only get worse when it grows,
+    # so paths rated worse than the best found path are dropped.
+    growing = all(edge_rating(edge) >= 0 for edges in adjacency
+                  for edge in edges)
+    best_path = None
+    best_rating = float("inf")
+    # A beam entry is (summed rating, path).
+    beam = [(0, (start_id,))]
+    # Paths that did not fit into the beam: (rating, counter, sum, path).
+    reserve = []
+    counter = 0
+    backtracks = 0
+    while beam:
+        candidates = []
+        for summed, path in beam:
+            edges = adjacency[path[-1]]
+            if stats is not None:
+                stats.nodes_expanded += 1
+                stats.edges_scanned += len(edges)
+                stats.max_depth = max(stats.max_depth, len(path))
+            for edge in edges:
+                neighbor = edge[0]
+                if neighbor in path:
+                    continue
+                new_sum = summed + edge_rating(edge)
+                if neighbor == goal_id:
+                    if stats is not None:
+                        stats.paths_completed += 1
+                    if new_sum < best_rating:
+                        best_rating = new_sum
+                        best_path = path + (neighbor,)
+                    continue
+                rest = _look_ahead(neighbor, lookahead, goal_id, adjacency,
+                                   set(path) | {neighbor}, edge_rating)
+                if rest is None or growing and new_sum + rest >= best_rating:
+                    # Dead end within the lookahead or worse than the best.
+                    if stats is not None:
+                        stats.paths_pruned += 1
+                    continue
+                candidates.append((new_sum + rest, counter, new_sum,
+                                   path + (neighbor,)))
+                counter += 1
+        heapq.heapify(candidates)
+        if (not candidates and best_path is None and reserve
+                and backtracks < max_backtracks):
+            # Every path of the beam is a dead end, go back.
+            backtracks += 1
+            candidates = reserve
+            reserve = []
+        chosen = [heapq.heappop(candidates)
+                  for _ in range(min(beam_width, len(candidates)))]
+        for candidate in candidates:
+            heapq.heappush(reserve, candidate)
+        beam = [(summed, path) for _, _, summed, path in chosen]
+    return best_path
+
+
+def _look_ahead(node, depth, goal_id, adjacency, visited, edge_rating):
+    """
+    Finds the best summed rating of the next depth edges after a node,
+    a way that reaches the goal earlier ends there.
+    :return: the best rating or None if every way runs into a dead end
+    """
+    if depth == 0 or node == goal_id:
+        return 0
+    best = None
+    for edge in adjacency[node]:
+        neighbor = edge[0]
+        if neighbor in visited:
+            continue
+        visited.add(neighbor)
+        rest = _look_ahead(neighbor, depth - 1, goal_id, adjacency, visited,
+                           edge_rating)
+        visited.discard(neighbor)
+        if rest is not None:
+            rating = edge_rating(edge) + rest
+            if best is None or rating < best:
+                best = rating
+    return best
 
 
 if __name__ == "__main__":
-    print(greedy_best_path(CAT_EDGES, "A", "F", "cost"))
+    print(greedy_best_path("A", "F", CAT_EDGES, "cost"))
     doctest.testmod()
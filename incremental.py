@@ -0,0 +1,291 @@
+"""
+Incremental re-optimization for graphs whose edge values change.
+The totals of a fixed list of paths are evaluated once. When an edge
+changes, only the paths using it get their totals patched with the
+difference, and the stored pareto, weighted sum and epsilon constraint
+results are repaired from the changed paths instead of being recomputed.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+from collections import OrderedDict
+from graph import CAT_EDGES, cost_fun_graph
+from multiobjective_optimization import pareto_indices
+from path_evaluation import evaluate_paths
+
+
+TEST_PATHS1 = [("A", "C", "D", "F"), ("A", "B", "D", "F"),
+               ("A", "B", "E", "F")]
+
+
+class IncrementalPaths:
+    """
+    Keeps the totals and the optimization results of a list of paths
+    up to date while the edges of the graph change. Changes have to be
+    made with Graph.set_edge or Graph.remove_edge on the graph attribute.
+    The results are the same as those of pareto_optimal, weighted_sum and
+    epsilon_constraint on the current graph. With float values the patched
+    totals can differ from a new evaluation by rounding errors.
+    >>> paths = IncrementalPaths(TEST_PATHS1, CAT_EDGES)
+    >>> paths.pareto_optimal() == {('A', 'B', 'D', 'F'), ('A', 'C', 'D', 'F')}
+    True
+    >>> paths.weighted_sum(1, 1) == paths.pareto_optimal()
+    True
+    >>> paths.graph.set_edge("C", "D", 2, 0)
+    >>> paths.values()
+    [(6, 4), (10, 11), (10, 3)]
+    >>> paths.weighted_sum(1, 1), paths.epsilon_constraint("fun", 8)
+    ({('A', 'B', 'D', 'F')}, {('A', 'C', 'D', 'F')})
+    >>> paths.graph.remove_edge("E", "F")
+    >>> paths.pareto_optimal()
+    Atleast one path is invalid.
+    >>> paths.graph.set_edge("E", "F", 1, 9)
+    >>> paths.values()[2], paths.weighted_sum(1, 1)
+    ((6, 12), {('A', 'B', 'E', 'F')})
+
+    Only the most recently used results are kept and repaired:
+    >>> paths = IncrementalPaths(TEST_PATHS1, CAT_EDGES, max_results=2)
+    >>> for weight in (1, 2, 3):
+    ...     _ = paths.weighted_sum(weight, 1)
+    >>> paths.evictions, paths.full_recomputes
+    (1, 3)
+    >>> paths.graph.set_edge("E", "F", 4, 0)
+    >>> paths.repairs, paths.weighted_sum(3, 1), paths.full_recomputes
+    (2, {('A', 'C', 'D', 'F')}, 3)
+    >>> _ = paths.weighted_sum(1, 1)
+    >>> paths.evictions, paths.full_recomputes
+    (2, 4)
+    """
+
+    def __init__(self, paths_list, edges_dict, max_results=64):
+        """
+        :param paths_list: a list containing tuples with nodes stored within
+        :param edges_dict: a Graph or a dictionary containing edges
+        and their respective cost and fun values
+        :param max_results: maximum number of stored query results,
+        the least recently used result is dropped first
+        """
+        self.graph = cost_fun_graph(edges_dict)
+        self.paths_list = list(paths_list)
+        self._values, invalid_indices = evaluate_paths(self.paths_list,
+                                                       self.graph)
+        self._invalid = len(invalid_indices)
+        # Edge -> {path index: how often the path uses the edge}.
+        self._edge_paths = {}
+        for i, path in enumerate(self.paths_list):
+            for edge in zip(path, path[1:]):
+                users = self._edge_paths.setdefault(edge, {})
+                users[i] = users.get(i, 0) + 1
+        # Query key -> stored result, repaired after every change,
+        # the oldest result comes first.
+        self._results = OrderedDict()
+        self.max_results = max_results
+        self.evictions = 0
+        self.patched_paths = 0
+        self.repairs = 0
+        self.full_recomputes = 0
+        self.graph.add_listener(self._edge_changed)
+
+    def close(self):
+        """
+        Stops following the changes of the graph.
+        """
+        self.graph.remove_listener(self._edge_changed)
+
+    def values(self):
+        """
+        :return: a list with the (total_cost, total_fun) of every path,
+        None for a path that is not connected by edges
+        """
+        return list(self._values)
+
+    def pareto_optimal(self):
+        """
+        :return: the pareto optimal paths like pareto_optimal
+        """
+        if not self._valid():
+            return None
+        state = self._stored(("pareto",))
+        if state is None:
+            state = {"optimal": pareto_indices(self._values)}
+            self._store(("pareto",), state)
+            self.full_recomputes += 1
+        return self._paths(state["optimal"])
+
+    def weighted_sum(self, cost_weight, fun_weight):
+        """
+        :param cost_weight: weight of the cost value
+        :param fun_weight: weight of the fun value
+        :return: the optimal paths like weighted_sum
+        """
+        if not self._valid():
+            return None
+        # Check if number was entered for cost and fun weights.
+        try:
+            float(fun_weight)
+            float(cost_weight)
+        except ValueError:
+            print("Weight factors must be numbers.")
+            return None
+
+        def rating(values):
+            return values[0] * cost_weight - values[1] * fun_weight
+
+        return self._best(("weighted", cost_weight, fun_weight), rating,
+                          lambda values: True)
+
+    def epsilon_constraint(self, main_goal, sec_goal_value):
+        """
+        :param main_goal: a string containing the
+        main goal of the algorithm ("cost"/"fun")
+        :param sec_goal_value: the minimum fun (main goal "cost")
+        or the maximum cost (main goal "fun")
+        :return: the optimal paths like epsilon_constraint
+        """
+        # Make sure goal is either cost or fun.
+        if main_goal not in ("cost", "fun"):
+            raise ValueError("Value has to be 'cost' or 'fun'")
+        if not self._valid():
+            return None
+        if main_goal == "cost":
+            def rating(values):
+                return values[0]
+
+            def feasible(values):
+                return values[1] >= sec_goal_value
+        else:
+            def rating(values):
+                return -values[1]
+
+            def feasible(values):
+                return values[0] <= sec_goal_value
+        return self._best(("epsilon", main_goal, sec_goal_value), rating,
+                          feasible)
+
+    def _valid(self):
+        # Check if every path is connected by edges.
+        if self._invalid:
+            print("Atleast one path is invalid.")
+            return False
+        return len(self._values) > 0
+
+    def _paths(self, indices):
+        # Check if optimal path exists.
+        if len(indices) == 0:
+            return None
+        return {self.paths_list[i] for i in indices}
+
+    def _best(self, key, rating, feasible):
+        """
+        Returns the feasible paths with the lowest rating,
+        the result is stored under key and repaired after changes.
+        """
+        state = self._stored(key)
+        if state is None:
+            state = {"rating": rating, "feasible": feasible}
+            self._select(state, range(len(self._values)))
+            self._store(key, state)
+            self.full_recomputes += 1
+        return self._paths(state["optimal"])
+
+    def _stored(self, key):
+        state = self._results.get(key)
+        if state is not None:
+            self._results.move_to_end(key)
+        return state
+
+    def _store(self, key, state):
+        self._results[key] = state
+        if len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+    def _select(self, state, candidates):
+        values = self._values
+        feasible = [i for i in candidates if state["feasible"](values[i])]
+        state["best"] = min((state["rating"](values[i]) for i in feasible),
+                            default=None)
+        state["optimal"] = {i for i in feasible
+                            if state["rating"](values[i]) == state["best"]}
+
+    def _edge_changed(self, node1, node2, old_value, new_value):
+        users = self._edge_paths.get((node1, node2))
+        if not users:
+            return
+        # Changed path index -> its totals before the change.
+        old_totals = {}
+        for i, count in users.items():
+            old_total = self._values[i]
+            if new_value is None:
+                new_total = None
+            elif old_value is None or old_total is None:
+                new_total = self._evaluate(self.paths_list[i])
+            else:
+                # Patch the totals with the difference of the edge.
+                new_total = (old_total[0] + count * (new_value[0]
+                                                     - old_value[0]),
+                             old_total[1] + count * (new_value[1]
+                                                     - old_value[1]))
+            if new_total == old_total:
+                continue
+            self._invalid += (new_total is None) - (old_total is None)
+            self._values[i] = new_total
+            old_totals[i] = old_total
+            self.patched_paths += 1
+        if not old_totals:
+            return
+        if self._invalid:
+            # The results are None until every path is valid again.
+            self._results.clear()
+            return
+        for key, state in self._results.items():
+            self.repairs += 1
+            if key[0] == "pareto":
+                self._repair_pareto(state, old_totals)
+            else:
+                self._repair_best(state, old_totals)
+
+    def _repair_pareto(self, state, old_totals):
+        values = self._values
+        optimal = set(state["optimal"])
+        for i, old_total in old_totals.items():
+            if i in optimal and (values[i][0] > old_total[0]
+                                 or values[i][1] < old_total[1]):
+                # A worse front member may have been the only path
+                # dominating other paths.
+                state["optimal"] = pareto_indices(values)
+                self.full_recomputes += 1
+                return
+        # Unchanged paths stay dominated by the unchanged or improved front,
+        # only the front and the changed paths can be optimal.
+        candidates = sorted(optimal | set(old_totals))
+        state["optimal"] = [candidates[j] for j in pareto_indices(
+            [values[i] for i in candidates])]
+
+    def _repair_best(self, state, old_totals):
+        values = self._values
+        for i in old_totals:
+            if i in state["optimal"] and (
+                    not state["feasible"](values[i])
+                    or state["rating"](values[i]) > state["best"]):
+                self._select(state, range(len(values)))
+                self.full_recomputes += 1
+                return
+        # The best unchanged path is one of the optimal paths.
+        candidates = [i for i in state["optimal"] if i not in old_totals]
+        self._select(state, candidates + list(old_totals))
+
+    def _evaluate(self, path):
+        total_cost = 0
+        total_fun = 0
+        for edge in zip(path, path[1:]):
+            if edge not in self.graph:
+                return None
+            edge_cost, edge_fun = self.graph[edge]
+            total_cost += edge_cost
+            total_fun += edge_fun
+        return total_cost, total_fun
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -0,0 +1,218 @@
+"""
+The k best simple paths from start to goal by optimize_weighted score
+(Yen's algorithm). The paths are generated one by one in score order,
+the next path only costs the searches for the deviations of the path
+returned last.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+import heapq
+import itertools
+import types
+from graph import CAT_EDGES, cost_fun_graph
+from recursive_function import (
+    optimize_weighted, remaining_bounds, bounded_search_from)
+from exact_solver import scores_non_negative
+from search_stats import SearchStats, timed
+
+
+def k_best_paths(start, goal, edges_dict, weight_cost=1, weight_fun=1,
+                 stats=None):
+    """
+    Generates the simple paths from start to goal with the lowest
+    optimize_weighted score first. Every returned path is the root
+    (beginning) of an earlier path followed by the best spur path that
+    leaves the root by an edge no earlier path with that root took.
+    The spur paths are searched with Dijkstra if no edge score is
+    negative, otherwise with the branch-and-bound search. Deviations of
+    a path are only searched from the node where it left its parent path
+    onwards, the earlier ones were searched for the parent already.
+    Paths with equal scores come in any order.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param weight_cost: weight of the cost value
+    :param weight_fun: weight of the fun value
+    :param stats: optional SearchStats object, counts the nodes the spur
+    searches expand and the returned paths as completed
+    :return: a generator of (path, total_cost, total_fun) tuples
+    >>> for path in k_best_paths("A", "F", CAT_EDGES, 1, 0):
+    ...     print(path)
+    (('A', 'C', 'D', 'F'), 6, 7)
+    (('A', 'B', 'E', 'F'), 10, 3)
+    (('A', 'B', 'D', 'F'), 10, 11)
+    (('A', 'C', 'D', 'B', 'E', 'F'), 14, 9)
+    >>> [path for path, _, _ in k_best_paths("A", "E", CAT_EDGES)][:2]
+    [('A', 'C', 'D', 'B', 'E'), ('A', 'B', 'E')]
+    >>> list(k_best_paths("A", "Z", CAT_EDGES))
+    []
+    >>> stats = SearchStats()
+    >>> _ = next(k_best_paths("A", "F", CAT_EDGES, 1, 0, stats))
+    >>> stats.nodes_expanded, stats.paths_completed
+    (5, 1)
+    """
+    if start == goal:
+        yield (start,), 0, 0
+        return
+    edges_dict = cost_fun_graph(edges_dict)
+    node_ids, _ = edges_dict.indexed()
+    if start not in node_ids or goal not in node_ids:
+        return
+    if scores_non_negative(edges_dict, weight_cost, weight_fun):
+        spur_search = _dijkstra_spur(goal, edges_dict, weight_cost,
+                                     weight_fun, stats)
+    else:
+        spur_search = _bounded_spur(goal, edges_dict, weight_cost,
+                                    weight_fun, stats)
+    # Waiting paths as (score, counter, path, cost, fun, deviation index).
+    candidates = []
+    seen = set()
+    counter = itertools.count()
+    # Trie of the returned paths, every node maps the next node to its trie.
+    returned = {}
+    with timed(stats, "search"):
+        first = spur_search((start,), 0, 0, set())
+    if first is None:
+        return
+    path, total_cost, total_fun = first
+    heapq.heappush(candidates, (
+        optimize_weighted(total_cost, total_fun, weight_cost, weight_fun),
+        next(counter), path, total_cost, total_fun, 0))
+    seen.add(path)
+    while candidates:
+        _, _, path, total_cost, total_fun, deviation = heapq.heappop(
+            candidates)
+        if stats is not None:
+            stats.paths_completed += 1
+            stats.max_depth = max(stats.max_depth, len(path) - 1)
+        yield path, total_cost, total_fun
+        # The next path is searched when it is asked for.
+        trie = returned
+        for node in path[1:]:
+            trie = trie.setdefault(node, {})
+        trie = returned
+        root_cost = 0
+        root_fun = 0
+        with timed(stats, "search"):
+            for i in range(len(path) - 1):
+                if i >= deviation:
+                    # Edges leaving the root that returned paths took.
+                    spur = spur_search(path[:i + 1], root_cost, root_fun,
+                                       trie.keys())
+                    if spur is not None and spur[0] not in seen:
+                        new_path, new_cost, new_fun = spur
+                        seen.add(new_path)
+                        heapq.heappush(candidates, (
+                            optimize_weighted(new_cost, new_fun,
+                                              weight_cost, weight_fun),
+                            next(counter), new_path, new_cost, new_fun, i))
+                edge_cost, edge_fun = edges_dict[(path[i], path[i + 1])]
+                root_cost += edge_cost
+                root_fun += edge_fun
+                trie = trie[path[i + 1]]
+
+
+def _dijkstra_spur(goal, edges_dict, weight_cost, weight_fun, stats):
+    """
+    Returns a function that finds the best path below a root with Dijkstra,
+    the nodes of the root and the blocked first edges are left out.
+    """
+    node_ids, adjacency = edges_dict.indexed()
+    nodes = edges_dict.nodes
+    goal_id = node_ids[goal]
+
+    def spur_search(root, root_cost, root_fun, blocked):
+        spur_id = node_ids[root[-1]]
+        excluded = {node_ids[node] for node in root[:-1]}
+        blocked_ids = {node_ids[node] for node in blocked}
+        scores = {spur_id: 0}
+        previous = {}
+        queue = [(0, spur_id)]
+        while queue:
+            score, node = heapq.heappop(queue)
+            if score > scores[node]:
+                # A better way to this node was found in the meantime.
+                continue
+            if node == goal_id:
+                break
+            if stats is not None:
+                stats.nodes_expanded += 1
+                stats.edges_scanned += len(adjacency[node])
+            for neighbor, edge_cost, edge_fun in adjacency[node]:
+                if neighbor in excluded or (node == spur_id
+                                            and neighbor in blocked_ids):
+                    continue
+                new_score = score + optimize_weighted(
+                    edge_cost, edge_fun, weight_cost, weight_fun)
+                if new_score < scores.get(neighbor, float("inf")):
+                    scores[neighbor] = new_score
+                    previous[neighbor] = (node, edge_cost, edge_fun)
+                    heapq.heappush(queue, (new_score, neighbor))
+        if goal_id not in previous:
+            return None
+        spur = [goal_id]
+        total_cost = root_cost
+        total_fun = root_fun
+        while spur[-1] != spur_id:
+            node, edge_cost, edge_fun = previous[spur[-1]]
+            spur.append(node)
+            total_cost += edge_cost
+            total_fun += edge_fun
+        return (root[:-1] + tuple(nodes[i] for i in reversed(spur)),
+                total_cost, total_fun)
+
+    return spur_search
+
+
+def _bounded_spur(goal, edges_dict, weight_cost, weight_fun, stats):
+    """
+    Returns a function that finds the best path below a root with the
+    branch-and-bound search, which never revisits the nodes of the root.
+    Every first edge that is not blocked is searched on its own.
+    """
+    bounds, slack = remaining_bounds(edges_dict, goal, weight_cost,
+                                     weight_fun)
+
+    def spur_search(root, root_cost, root_fun, blocked):
+        # Only paths strictly worse than the best one so far are cut off.
+        best = types.SimpleNamespace(value=float("inf"))
+        best_result = None
+        for neighbor, _, _ in edges_dict.neighbors(root[-1]):
+            if neighbor in root or neighbor in blocked:
+                continue
+            result, score, _ = bounded_search_from(
+                list(root) + [neighbor], goal, edges_dict, weight_cost,
+                weight_fun, bounds, slack, best, stats)
+            if result is not None and (best_result is None
+                                       or score < best_result[0]):
+                best_result = score, result
+        if best_result is None:
+            return None
+        path, total_cost, total_fun = best_result[1]
+        return tuple(path), total_cost, total_fun
+
+    return spur_search
+
+
+def best_paths(start, goal, edges_dict, k, weight_cost=1, weight_fun=1):
+    """
+    Returns the k simple paths with the lowest optimize_weighted score.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param k: number of paths
+    :param weight_cost: weight of the cost value
+    :param weight_fun: weight of the fun value
+    :return: a list of at most k (path, total_cost, total_fun) tuples
+    >>> best_paths("A", "F", CAT_EDGES, 2, 10, 1)
+    [(('A', 'C', 'D', 'F'), 6, 7), (('A', 'B', 'D', 'F'), 10, 11)]
+    """
+    return list(itertools.islice(
+        k_best_paths(start, goal, edges_dict, weight_cost, weight_fun), k))
+
+
+if __name__ == "__main__":
+    doctest.testmod()
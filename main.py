@@ -6,9 +6,13 @@ This file connects all parts of the project:
 - recursive path finding
 - greedy path finding
 - time measurement
+- a headless JSON-lines query mode (see query_server)
 """
 __author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
 
+import argparse
+import asyncio
+
 # Import optimization methods modul
 from multiobjective_optimization import (
     path_value, pareto_optimal, weighted_sum, epsilon_constraint)
@@ -24,52 +28,40 @@ from greedy_algo import greedy_best_path
 # Import time measurement modul
 from time_measurement import measure_recursive_time, measure_greedy_time
 
+# Import graph object and binary graph file loader
+from graph import CAT_EDGES, Graph
+from graph_file import load_graph
+
+# Import headless query mode
+from query_server import QueryServer, serve_stdin, serve_unix_socket
+
 
 TEST_PATHS1 = [("A", "C", "D", "F"), ("A", "B", "D", "F"),
                ("A", "B", "E", "F")]
 TEST_PATHS2 = [("A", "C", "D", "B", "E", "F"), ("A", "B", "D", "F")]
 TEST_PATHS3 = [("A", "B", "D"), ("A", "C", "D")]
-CAT_EDGES = {
-    ("A", "B"): (3, 2),
-    ("A", "C"): (1, 0),
-    ("B", "A"): (1, 0),
-    ("B", "D"): (4, 5),
-    ("B", "E"): (2, 1),
-    ("C", "A"): (1, 0),
-    ("C", "D"): (2, 3),
-    ("D", "B"): (4, 5),
-    ("D", "C"): (2, 3),
-    ("D", "F"): (3, 4),
-    ("E", "B"): (2, 1),
-    ("E", "F"): (5, 0),
-    ("F", "D"): (3, 4),
-    ("F", "E"): (5, 0)
-}
-
-
-def run_optimizations():
+
+
+def run_optimizations(edges=CAT_EDGES):
     print("\n--- Optimization Methods ---")
     print(TEST_PATHS1)
     print("path values: ")
-    print(path_value(TEST_PATHS1, CAT_EDGES))
+    print(path_value(TEST_PATHS1, edges))
     print()
     print("pareto_optimal: ")
-    print(pareto_optimal(TEST_PATHS1, CAT_EDGES))
+    print(pareto_optimal(TEST_PATHS1, edges))
     print()
     print("weighted_sum: ")
-    print(weighted_sum(TEST_PATHS1, CAT_EDGES, 10, 1))
+    print(weighted_sum(TEST_PATHS1, edges, 10, 1))
     print()
     print("epsilon-constraint: ")
-    print(epsilon_constraint(TEST_PATHS1, CAT_EDGES, "cost", 50))
+    print(epsilon_constraint(TEST_PATHS1, edges, "cost", 50))
 
 
-def run_recursive():
+def run_recursive(edges=CAT_EDGES, start="A", goal="F"):
     print("\n--- Recursive Path Algorithm ---")
 
-    start = "A"
-    goal = "F"
-
-    result = recursive_best_path(start, goal, CAT_EDGES, optimize_weighted)
+    result = recursive_best_path(start, goal, edges, optimize_weighted)
 
     if result is None:
         print("No path found.")
@@ -80,13 +72,10 @@ def run_recursive():
         print("Total fun:", fun)
 
 
-def run_greedy(focus):
+def run_greedy(focus, edges=CAT_EDGES, start="A", goal="F"):
     print("\n--- Greedy Path Algorithm ---")
 
-    start = "A"
-    goal = "F"
-
-    result = greedy_best_path(start, goal, CAT_EDGES, focus)
+    result = greedy_best_path(start, goal, edges, focus)
 
     if result is None:
         print("No path found.")
@@ -107,7 +96,16 @@ def run_measurements():
     print("Greedy algorithm (10000 runs):", greedy_time)
 
 
-def main():
+def main(graph_file=None):
+    # Use a binary graph file if one is given, else the example graph.
+    # A Graph keeps its edge index between the menu options.
+    edges = Graph(CAT_EDGES)
+    start = "A"
+    goal = "F"
+    if graph_file is not None:
+        edges = load_graph(graph_file)
+        start = input("Start node: ")
+        goal = input("Goal node: ")
     while True:
         print("\n==============================")
         print(" Cat Path Optimization Menu")
@@ -122,15 +120,15 @@ def main():
         choice = input("Choose an option: ")
 
         if choice == "1":
-            run_optimizations()
+            run_optimizations(edges)
         elif choice == "2":
-            run_recursive()
+            run_recursive(edges, start, goal)
         elif choice == "3":
             print("The greedy algorithm can only focus on one goal.")
             while True:
                 greedy_focus = input("Choose either 'cost' or 'fun': ")
                 if greedy_focus in ("cost", "fun"):
-                    run_greedy(greedy_focus)
+                    run_greedy(greedy_focus, edges, start, goal)
                     break
         elif choice == "4":
             run_measurements()
@@ -141,5 +139,31 @@ def main():
             print("Invalid option. Please try again.")
 
 
+def serve(graph_file=None, socket_path=None):
+    # Load the graph once, then answer JSON-lines queries.
+    edges = CAT_EDGES
+    if graph_file is not None:
+        edges = load_graph(graph_file)
+    server = QueryServer(edges)
+    try:
+        if socket_path is None:
+            asyncio.run(serve_stdin(server))
+        else:
+            asyncio.run(serve_unix_socket(server, socket_path))
+    except KeyboardInterrupt:
+        pass
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Cat path optimization")
+    # Optional argument: path of a binary graph file (see graph_file).
+    parser.add_argument("graph_file", nargs="?")
+    parser.add_argument("--serve", action="store_true",
+                        help="answer JSON-lines queries from stdin")
+    parser.add_argument("--socket",
+                        help="answer JSON-lines queries on a Unix socket")
+    arguments = parser.parse_args()
+    if arguments.serve or arguments.socket:
+        serve(arguments.graph_file, arguments.socket)
+    else:
+        main(arguments.graph_file)
@@ -0,0 +1,317 @@
+"""
+Multiobjective optimization with any number of objectives.
+Edges carry a tuple of values, for example (cost, fun, time, risk),
+every objective is either minimized ("min") or maximized ("max").
+The paths are evaluated in one batch like in path_value, the pareto
+optimal paths are found with a divide and conquer skyline (Kung et al.).
+With the directions ("min", "max") the results are the same as those
+of the (cost, fun) methods in multiobjective_optimization.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+from multiobjective_optimization import path_value
+from search_stats import SearchStats, timed
+from graph import CAT_EDGES
+
+
+# Directions of the (cost, fun) values.
+COST_FUN = ("min", "max")
+# Below this number of point pairs the dominance is checked pair by pair.
+_BRUTE_FORCE_PAIRS = 64
+
+TEST_PATHS1 = [("A", "C", "D", "F"), ("A", "B", "D", "F"),
+               ("A", "B", "E", "F")]
+# (cost, fun, time), time is minimized.
+TIMED_EDGES = {
+    ("A", "B"): (3, 2, 1),
+    ("A", "C"): (1, 0, 4),
+    ("B", "D"): (4, 5, 2),
+    ("B", "E"): (2, 1, 1),
+    ("C", "D"): (2, 3, 1),
+    ("D", "F"): (3, 4, 2),
+    ("E", "F"): (5, 0, 1)
+}
+
+
+def _check_directions(directions, dimensions):
+    if len(directions) != dimensions:
+        raise ValueError(f"Give one direction per objective ({dimensions}).")
+    for direction in directions:
+        if direction not in ("min", "max"):
+            raise ValueError("Direction has to be 'min' or 'max'")
+
+
+def _minimized(paths_values, directions):
+    """
+    Turns every value vector into a vector where lower is better
+    in every objective by negating the maximized values.
+    """
+    signs = [1 if direction == "min" else -1 for direction in directions]
+    return [tuple(sign * value for sign, value in zip(signs, values))
+            for values in paths_values]
+
+
+def skyline_indices(paths_values, directions=COST_FUN):
+    """
+    Finds the pareto optimal value vectors with Kung's divide and conquer
+    method. Like pareto_indices, a vector is only dominated by a vector
+    that is strictly better in every objective, equal vectors are all kept.
+    The vectors are split at the median of the first objective, both halves
+    are solved on their own and the better half removes the dominated
+    vectors of the other half. That removal splits again at the median of
+    the next objective, so the work grows with n log(n) ** (d - 1)
+    instead of n ** 2.
+    :param paths_values: a list containing a tuple of values for each path
+    :param directions: "min" or "max" for every objective
+    :return: a sorted list with the indices of all pareto optimal vectors
+    >>> skyline_indices([(6, 7), (10, 11), (10, 3)])
+    [0, 1]
+    >>> skyline_indices([(1, 5, 2), (2, 4, 3), (0, 6, 1), (1, 5, 2)],
+    ...                 ("min", "max", "min"))
+    [2]
+    >>> skyline_indices([(1, 5, 2), (2, 4, 1)], ("min", "max", "min"))
+    [0, 1]
+    >>> skyline_indices([])
+    []
+    """
+    if not paths_values:
+        return []
+    _check_directions(directions, len(paths_values[0]))
+    points = [values + (i,) for i, values in enumerate(
+        _minimized(paths_values, directions))]
+    return sorted(point[-1] for point in _front(points, len(directions)))
+
+
+def _dominated(point, other, first, dimensions):
+    """
+    Checks whether other is lower than point in the objectives
+    first to dimensions - 1.
+    """
+    for k in range(first, dimensions):
+        if not other[k] < point[k]:
+            return False
+    return True
+
+
+def _split_value(values):
+    """
+    Returns a value that leaves at least one value above it and one value
+    at or below it, None if all values are equal.
+    """
+    values = sorted(values)
+    if values[0] == values[-1]:
+        return None
+    split = values[len(values) // 2]
+    if split == values[-1]:
+        # Take the largest value below the maximum.
+        split = max(value for value in values if value < split)
+    return split
+
+
+def _front(points, dimensions):
+    """
+    Returns the points that no other point dominates in every objective.
+    """
+    if len(points) * len(points) <= _BRUTE_FORCE_PAIRS:
+        return [point for point in points
+                if not any(_dominated(point, other, 0, dimensions)
+                           for other in points)]
+    split = _split_value([point[0] for point in points])
+    if split is None:
+        # No point is lower than another in the first objective.
+        return points
+    low = _front([point for point in points if point[0] <= split],
+                 dimensions)
+    high = _front([point for point in points if point[0] > split],
+                  dimensions)
+    # The low points are lower in the first objective than the high points.
+    return low + _filter(high, low, 1, dimensions)
+
+
+def _filter(points, others, first, dimensions):
+    """
+    Returns the points that no point of others dominates in the objectives
+    first to dimensions - 1.
+    """
+    if not points or not others:
+        return points
+    if first == dimensions:
+        return []
+    if first == dimensions - 1:
+        lowest = min(other[first] for other in others)
+        return [point for point in points if not lowest < point[first]]
+    if len(points) * len(others) <= _BRUTE_FORCE_PAIRS:
+        return [point for point in points
+                if not any(_dominated(point, other, first, dimensions)
+                           for other in others)]
+    split = _split_value([other[first] for other in others])
+    if split is None:
+        # Every other point has the same value in this objective.
+        value = others[0][first]
+        return ([point for point in points if point[first] <= value]
+                + _filter([point for point in points if point[first] > value],
+                          others, first + 1, dimensions))
+    low_others = [other for other in others if other[first] <= split]
+    high_others = [other for other in others if other[first] > split]
+    # High others cannot dominate points at or below the split.
+    low_points = _filter([point for point in points
+                          if point[first] <= split],
+                         low_others, first, dimensions)
+    # Low others are lower in this objective than the high points.
+    high_points = _filter([point for point in points
+                           if point[first] > split],
+                          low_others, first + 1, dimensions)
+    high_points = _filter(high_points, high_others, first, dimensions)
+    return low_points + high_points
+
+
+def vector_pareto_optimal(paths_list, edges_dict, directions=COST_FUN,
+                          stats=None):
+    """
+    Calculates the pareto optimal paths for any number of objectives.
+    :param paths_list: a list containing tuples with nodes stored within
+    :param edges_dict: a Graph or a dictionary containing edges
+    and a tuple of values for each
+    :param directions: "min" or "max" for every objective
+    :param stats: optional SearchStats object, counts the dominated paths
+    as pruned and times the evaluation and the dominance filter
+    :return: a set of pareto optimal paths
+    >>> (vector_pareto_optimal(TEST_PATHS1, CAT_EDGES)
+    ...     == {('A', 'B', 'D', 'F'), ('A', 'C', 'D', 'F')})
+    True
+    >>> path_value(TEST_PATHS1, TIMED_EDGES)
+    [(6, 7, 7), (10, 11, 5), (10, 3, 3)]
+    >>> sorted(vector_pareto_optimal(TEST_PATHS1, TIMED_EDGES,
+    ...                              ("min", "max", "min")))
+    [('A', 'B', 'D', 'F'), ('A', 'B', 'E', 'F'), ('A', 'C', 'D', 'F')]
+    >>> stats = SearchStats()
+    >>> _ = vector_pareto_optimal(TEST_PATHS1, CAT_EDGES, stats=stats)
+    >>> stats.paths_pruned, sorted(stats.phase_times)
+    (1, ['dominance', 'evaluation'])
+    """
+    # First calculate the values of each path.
+    paths_values = path_value(paths_list, edges_dict, stats)
+    # Check if path is valid.
+    if paths_values is None:
+        return None
+    with timed(stats, "dominance"):
+        optimal_indices = skyline_indices(paths_values, directions)
+    if stats is not None:
+        stats.paths_pruned += len(paths_values) - len(optimal_indices)
+    optimal_paths = {paths_list[i] for i in optimal_indices}
+    # Check if optimal path exists.
+    if len(optimal_paths) == 0:
+        return None
+    return optimal_paths
+
+
+def vector_weighted_sum(paths_list, edges_dict, weights, directions=COST_FUN,
+                        stats=None):
+    """
+    Finds the paths with the lowest weighted sum of their values,
+    minimized values count positive and maximized values negative
+    (cost * weight_cost - fun * weight_fun for the (cost, fun) values).
+    :param paths_list: a list containing tuples with nodes stored within
+    :param edges_dict: a Graph or a dictionary containing edges
+    and a tuple of values for each
+    :param weights: a weight for every objective
+    :param directions: "min" or "max" for every objective
+    :param stats: optional SearchStats object, counts the paths that were
+    not chosen as pruned and times the evaluation and the selection
+    :return: a set of optimal paths
+    >>> vector_weighted_sum(TEST_PATHS1, CAT_EDGES, (5, 1))
+    {('A', 'C', 'D', 'F')}
+    >>> vector_weighted_sum(TEST_PATHS1, TIMED_EDGES, (1, 1, 3),
+    ...                     ("min", "max", "min"))
+    {('A', 'B', 'D', 'F')}
+    >>> vector_weighted_sum(TEST_PATHS1, CAT_EDGES, (1, 2, 3))
+    Traceback (most recent call last):
+    ...
+    ValueError: Give one weight per objective (2).
+    >>> vector_weighted_sum(TEST_PATHS1, CAT_EDGES, (None, 1))
+    Weight factors must be numbers.
+    """
+    if len(weights) != len(directions):
+        raise ValueError(f"Give one weight per objective ({len(directions)}).")
+    # Check if numbers were entered for the weights.
+    try:
+        [float(weight) for weight in weights]
+    except (TypeError, ValueError):
+        print("Weight factors must be numbers.")
+        return None
+    # First calculate the values of each path.
+    paths_values = path_value(paths_list, edges_dict, stats)
+    # Check if path is valid.
+    if paths_values is None:
+        return None
+    _check_directions(directions, len(paths_values[0]))
+    with timed(stats, "selection"):
+        ratings = [sum(weight * value
+                       for weight, value in zip(weights, values))
+                   for values in _minimized(paths_values, directions)]
+        best = min(ratings)
+        optimal_indices = [i for i, rating in enumerate(ratings)
+                           if rating == best]
+    if stats is not None:
+        stats.paths_pruned += len(paths_values) - len(optimal_indices)
+    return {paths_list[i] for i in optimal_indices}
+
+
+def vector_epsilon_constraint(paths_list, edges_dict, main_objective, bounds,
+                              directions=COST_FUN, stats=None):
+    """
+    Optimizes one objective while every other objective has to stay within
+    its bound: at most the bound for minimized objectives, at least the
+    bound for maximized ones.
+    :param paths_list: a list containing tuples with nodes stored within
+    :param edges_dict: a Graph or a dictionary containing edges
+    and a tuple of values for each
+    :param main_objective: index of the optimized objective
+    :param bounds: a bound for every objective, None for no bound
+    (the bound of the main objective is ignored)
+    :param directions: "min" or "max" for every objective
+    :param stats: optional SearchStats object, counts the paths that were
+    not chosen as pruned and times the evaluation and the selection
+    :return: a set of optimal paths or None
+    >>> vector_epsilon_constraint(TEST_PATHS1, CAT_EDGES, 0, (None, 8))
+    {('A', 'B', 'D', 'F')}
+    >>> vector_epsilon_constraint(TEST_PATHS1, TIMED_EDGES, 1, (8, None, 4),
+    ...                           ("min", "max", "min"))
+    >>> vector_epsilon_constraint(TEST_PATHS1, TIMED_EDGES, 1, (10, None, 5),
+    ...                           ("min", "max", "min"))
+    {('A', 'B', 'D', 'F')}
+    """
+    if len(bounds) != len(directions):
+        raise ValueError(f"Give one bound per objective ({len(directions)}).")
+    if not 0 <= main_objective < len(directions):
+        raise ValueError("main_objective has to be the index of an objective")
+    # First calculate the values of each path.
+    paths_values = path_value(paths_list, edges_dict, stats)
+    # Check if path is valid.
+    if paths_values is None:
+        return None
+    _check_directions(directions, len(paths_values[0]))
+    with timed(stats, "selection"):
+        # With negated maximized values every bound is an upper bound.
+        minimized = _minimized(paths_values, directions)
+        limits = [(k, -bound if directions[k] == "max" else bound)
+                  for k, bound in enumerate(bounds)
+                  if bound is not None and k != main_objective]
+        feasible = [i for i, values in enumerate(minimized)
+                    if all(values[k] <= limit for k, limit in limits)]
+        optimal_indices = []
+        if feasible:
+            best = min(minimized[i][main_objective] for i in feasible)
+            optimal_indices = [i for i in feasible
+                               if minimized[i][main_objective] == best]
+    if stats is not None:
+        stats.paths_pruned += len(paths_values) - len(optimal_indices)
+    # Check if optimal path exists.
+    if len(optimal_indices) == 0:
+        return None
+    return {paths_list[i] for i in optimal_indices}
+
+
+if __name__ == "__main__":
+    doctest.testmod()
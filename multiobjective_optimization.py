@@ -4,39 +4,37 @@ For test purposes, assume a graph and a list of possible paths already exists.
 """
 __author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
 
+import bisect
 import doctest
+import heapq
+import numbers
+from graph import CAT_EDGES, cost_fun_graph
+from path_evaluation import evaluate_paths
+from path_trie import PathTrie
+from search_stats import SearchStats, timed
 
 
 TEST_PATHS1 = [("A", "C", "D", "F"), ("A", "B", "D", "F"),
                ("A", "B", "E", "F")]
 TEST_PATHS2 = [("A", "C", "D", "B", "E", "F"), ("A", "B", "D", "F")]
 TEST_PATHS3 = [("A", "B", "D"), ("A", "C", "D")]
-CAT_EDGES = {
-    ("A", "B"): (3, 2),
-    ("A", "C"): (1, 0),
-    ("B", "A"): (1, 0),
-    ("B", "D"): (4, 5),
-    ("B", "E"): (2, 1),
-    ("C", "A"): (1, 0),
-    ("C", "D"): (2, 3),
-    ("D", "B"): (4, 5),
-    ("D", "C"): (2, 3),
-    ("D", "F"): (3, 4),
-    ("E", "B"): (2, 1),
-    ("E", "F"): (5, 0),
-    ("F", "D"): (3, 4),
-    ("F", "E"): (5, 0)
-}
-
-
-def path_value(paths_list, edges_dict):
+
+
+def path_value(paths_list, edges_dict, stats=None, report_invalid=False):
     """
     Sums up the costs and the fun on each path.
+    All paths are evaluated in one batch, see path_evaluation.
     :param paths_list: a list containing tuples with
     nodes stored within to represent paths
-    :param edges_dict: a dictionary containing edges
+    :param edges_dict: a Graph or a dictionary containing edges
     and their respective cost and fun values
-    :return: a list containing tuples with each path's total cost and fun
+    :param stats: optional SearchStats object, counts the evaluated paths
+    and their edges and times the evaluation
+    :param report_invalid: if True, invalid paths do not stop the
+    evaluation, they are returned by index instead of printing a message
+    :return: a list containing tuples with each path's total cost and fun,
+    with report_invalid a tuple (paths_values, invalid_indices) where
+    paths_values holds None for every invalid path
     >>> path_value(TEST_PATHS1, CAT_EDGES)
     [(6, 7), (10, 11), (10, 3)]
     >>> path_value(TEST_PATHS2, CAT_EDGES)
@@ -45,41 +43,49 @@ def path_value(paths_list, edges_dict):
     [(7, 7), (3, 3)]
     >>> path_value([("A", "B")], {("A", "C") : (3, 2)})
     Atleast one path is invalid.
+    >>> path_value([("A", "F"), ("A", "C")], CAT_EDGES, report_invalid=True)
+    ([None, (1, 0)], [0])
+    >>> stats = SearchStats()
+    >>> _ = path_value(TEST_PATHS1, CAT_EDGES, stats)
+    >>> stats.paths_completed, stats.edges_scanned, list(stats.phase_times)
+    (3, 9, ['evaluation'])
+    >>> stats = SearchStats()
+    >>> _ = path_value(PathTrie(TEST_PATHS1), CAT_EDGES, stats)
+    >>> stats.paths_completed, stats.edges_scanned, stats.max_depth
+    (3, 8, 3)
     """
-    path_values = []
-    for i in paths_list:
-        my_path_value = [0, 0]
-        for j in range(0, len(i) - 1):
-            # Pair up every node on the path.
-            edge_node1 = i[j]
-            edge_node2 = i[j + 1]
-            # Check if path is connected by edges.
-            try:
-                """
-                Find the respective edge in edge dictionary
-                and safe edge values from dictionary in new tuple.
-                """
-                edge_value = edges_dict[(edge_node1, edge_node2)]
-            except KeyError:
-                print("Atleast one path is invalid.")
-                return None
-            # Sum up every path value.
-            for k in range(0, 2):
-                my_path_value[k] += edge_value[k]
-        # Add value of one path to list of path values.
-        path_values.append(tuple(my_path_value))
+    with timed(stats, "evaluation"):
+        path_values, invalid_indices = evaluate_paths(paths_list, edges_dict)
+    if stats is not None:
+        stats.paths_completed += len(path_values) - len(invalid_indices)
+        if isinstance(paths_list, PathTrie):
+            # Every shared edge of the trie is looked up once.
+            stats.edges_scanned += paths_list.stored_edges()
+            stats.max_depth = max(stats.max_depth, paths_list.max_length())
+        else:
+            path_lengths = [max(len(path) - 1, 0) for path in paths_list]
+            stats.edges_scanned += sum(path_lengths)
+            stats.max_depth = max([stats.max_depth] + path_lengths)
+    if report_invalid:
+        return path_values, invalid_indices
+    # Check if every path is connected by edges.
+    if invalid_indices:
+        print("Atleast one path is invalid.")
+        return None
     if len(path_values) == 0:
         return None
     return path_values
 
 
-def pareto_optimal(paths_list, edges_dict):
+def pareto_optimal(paths_list, edges_dict, stats=None):
     """
     Calculates a pareto optimal path.
     Paths that are not worse in both values than other paths are optimal.
     :param paths_list: a list containing tuples with nodes stored within
     :param edges_dict: a dictionary containing edges
     and their respective cost and fun values
+    :param stats: optional SearchStats object, counts the dominated paths
+    as pruned and times the evaluation and the dominance filter
     :return: a set of pareto optimal paths
     >>> (pareto_optimal(TEST_PATHS1, CAT_EDGES) ==
     ...     {('A', 'B', 'D', 'F'), ('A', 'C', 'D', 'F')})
@@ -90,42 +96,72 @@ def pareto_optimal(paths_list, edges_dict):
     ...     == {('A', 'C', 'D'), ('A', 'B', 'D')})
     True
     >>> pareto_optimal([], CAT_EDGES)
+    >>> (pareto_optimal([("A", "B", "E"), ("A", "B", "A")],
+    ...     {("A", "B"): (1, 1), ("B", "E"): (1, 1), ("B", "A"): (1, 1)})
+    ...     == {("A", "B", "E"), ("A", "B", "A")})
+    True
+    >>> stats = SearchStats()
+    >>> _ = pareto_optimal(TEST_PATHS1, CAT_EDGES, stats)
+    >>> stats.paths_pruned, sorted(stats.phase_times)
+    (1, ['dominance', 'evaluation'])
     """
     # First calculate the cost and fun values for each path.
-    paths_values = path_value(paths_list, edges_dict)
+    paths_values = path_value(paths_list, edges_dict, stats)
     # Check if path is valid.
     if paths_values is None:
         return None
-    optimal_paths = set()
-    # Compare every path with every other path.
-    for path1 in paths_values:
-        for path2 in paths_values:
-            """
-            Make sure to not compare a path with itself
-            or a path with another path of the same value.
-            """
-            if path1 == path2:
-                continue
-            current_cost_value = path2[0]
-            current_fun_value = path2[1]
-            new_cost_value = path1[0]
-            new_fun_value = path1[1]
-            # Every path must not be worse than any other path at both goals.
-            # Cost must be low and fun must be high.
-            if (new_cost_value > current_cost_value and
-                    new_fun_value < current_fun_value):
-                break
-        else:
-            # Add new path to set of pareto-optimal paths.
-            my_optimal_path = paths_list[paths_values.index(path1)]
-            optimal_paths.add(my_optimal_path)
+    with timed(stats, "dominance"):
+        optimal_indices = pareto_indices(paths_values)
+    if stats is not None:
+        stats.paths_pruned += len(paths_values) - len(optimal_indices)
+    optimal_paths = {paths_list[i] for i in optimal_indices}
     # Check if optimal path exists.
     if len(optimal_paths) == 0:
         return None
     return optimal_paths
 
 
-def weighted_sum(paths_list, edges_dict, cost_weight, fun_weight):
+def pareto_indices(paths_values):
+    """
+    Finds the pareto optimal values with a sort-and-sweep (skyline) method.
+    A value is dominated if another value has lower cost and higher fun.
+    After sorting by cost, a value is dominated exactly if a value
+    with a lower cost has a higher fun, so one sweep is enough.
+    :param paths_values: a list containing tuples with
+    each path's total cost and fun
+    :return: a sorted list with the indices of all pareto optimal values,
+    equal values are all kept
+    >>> pareto_indices([(6, 7), (10, 11), (10, 3)])
+    [0, 1]
+    >>> pareto_indices([(3, 3), (5, 1), (3, 3), (2, 2)])
+    [0, 2, 3]
+    >>> pareto_indices([])
+    []
+    """
+    order = sorted(range(len(paths_values)), key=lambda i: paths_values[i][0])
+    optimal_indices = []
+    best_fun = float("-inf")
+    group_start = 0
+    while group_start < len(order):
+        # Values with the same cost cannot dominate each other.
+        group_cost = paths_values[order[group_start]][0]
+        group_end = group_start
+        group_best_fun = float("-inf")
+        while (group_end < len(order)
+               and paths_values[order[group_end]][0] == group_cost):
+            fun = paths_values[order[group_end]][1]
+            if fun >= best_fun:
+                optimal_indices.append(order[group_end])
+            group_best_fun = max(group_best_fun, fun)
+            group_end += 1
+        best_fun = max(best_fun, group_best_fun)
+        group_start = group_end
+    optimal_indices.sort()
+    return optimal_indices
+
+
+def weighted_sum(paths_list, edges_dict, cost_weight, fun_weight,
+                 stats=None):
     """
     Calculates an optimal path based on the weighted sum method.
     Cost and fun values are augmented by multiplying
@@ -138,6 +174,8 @@ def weighted_sum(paths_list, edges_dict, cost_weight, fun_weight):
     the weight of an edge's cost value
     :param fun_weight: a number value determining
     the weight of an edge's fun value
+    :param stats: optional SearchStats object, counts the paths that
+    are not chosen as pruned and times the evaluation and the selection
     :return: a set of optimal paths
     >>> (weighted_sum(TEST_PATHS1, CAT_EDGES, 1, 1)
     ...     == {('A', 'C', 'D', 'F'), ('A', 'B', 'D', 'F')})
@@ -148,9 +186,13 @@ def weighted_sum(paths_list, edges_dict, cost_weight, fun_weight):
     True
     >>> weighted_sum(TEST_PATHS1, CAT_EDGES, "hi", "n")
     Weight factors must be numbers.
+    >>> stats = SearchStats()
+    >>> _ = weighted_sum(TEST_PATHS1, CAT_EDGES, 5, 1, stats)
+    >>> stats.paths_completed, stats.paths_pruned
+    (3, 2)
     """
     # First calculate the cost and fun values for each path.
-    paths_values = path_value(paths_list, edges_dict)
+    paths_values = path_value(paths_list, edges_dict, stats)
     # Check if path is valid
     if paths_values is None:
         return None
@@ -161,7 +203,20 @@ def weighted_sum(paths_list, edges_dict, cost_weight, fun_weight):
     except ValueError:
         print("Weight factors must be numbers.")
         return None
-    optimal_paths = set()
+    with timed(stats, "selection"):
+        optimal_indices = _weighted_sum_indices(paths_values, cost_weight,
+                                                fun_weight)
+    if stats is not None:
+        stats.paths_pruned += len(paths_values) - len(optimal_indices)
+    optimal_paths = {paths_list[i] for i in optimal_indices}
+    # Check if optimal path exists.
+    return optimal_paths
+
+
+def _weighted_sum_indices(paths_values, cost_weight, fun_weight):
+    """
+    Finds the indices of the values with the lowest weighted sum.
+    """
     paths_weighted_sums = []
     # Calculate a value for each path (weighted sum).
     for paths in paths_values:
@@ -172,15 +227,166 @@ def weighted_sum(paths_list, edges_dict, cost_weight, fun_weight):
         # Add calculated sum to list of all weighted sums.
         paths_weighted_sums.append(my_weighted_sum)
     # Check for every sum in list whether it is the smallest value.
-    for i in range(0, len(paths_weighted_sums)):
-        if paths_weighted_sums[i] == min(paths_weighted_sums):
-            # Add path with the same index to set of optimal paths.
-            optimal_paths.add(paths_list[i])
-    # Check if optimal path exists.
-    return optimal_paths
+    min_weighted_sum = min(paths_weighted_sums)
+    return [i for i in range(0, len(paths_weighted_sums))
+            if paths_weighted_sums[i] == min_weighted_sum]
+
+
+class WeightedSumHull:
+    """
+    Answers weighted sum queries with the convex hull of the path values.
+    The optimal paths of every weight pair lie on the hull, so a query only
+    searches the hull instead of looking at every path again.
+    With a positive fun weight the lower hull of the (cost, -fun) points
+    is searched, with a negative fun weight the lower hull of (cost, fun).
+    Points on a hull edge are kept, so ties are found as well.
+    >>> hull = WeightedSumHull([(6, 7), (10, 11), (10, 3), (8, 9)])
+    >>> hull.query(1, 1), hull.query(5, 1), hull.query(1, 5)
+    ([0, 1, 3], [0], [1])
+    >>> hull.query(1, 0), hull.query(0, 0)
+    ([0], [0, 1, 2, 3])
+    """
+
+    def __init__(self, paths_values):
+        """
+        :param paths_values: a list containing tuples with
+        each path's total cost and fun
+        """
+        # Paths with the same values share one point.
+        self._points = {}
+        for i, (cost, fun) in enumerate(paths_values):
+            self._points.setdefault((cost, fun), []).append(i)
+        points = sorted(self._points)
+        self._count = len(paths_values)
+        self._low_fun_hull = _lower_hull(
+            sorted((cost, -fun) for cost, fun in points))
+        self._high_fun_hull = _lower_hull(points)
+        if points:
+            self._min_cost = points[0][0]
+            self._max_cost = points[-1][0]
+
+    def query(self, cost_weight, fun_weight):
+        """
+        Finds every path with the lowest weighted sum
+        cost * cost_weight - fun * fun_weight.
+        :param cost_weight: weight of the cost value
+        :param fun_weight: weight of the fun value
+        :return: a sorted list of the indices of the optimal paths
+        """
+        if self._count == 0:
+            return []
+        if fun_weight == 0:
+            # Only the cost matters.
+            if cost_weight > 0:
+                points = [p for p in self._points if p[0] == self._min_cost]
+            elif cost_weight < 0:
+                points = [p for p in self._points if p[0] == self._max_cost]
+            else:
+                points = list(self._points)
+        else:
+            if fun_weight > 0:
+                hull = self._low_fun_hull
+                sign = 1
+            else:
+                hull = self._high_fun_hull
+                sign = -1
+            points = _hull_minimum(hull, cost_weight, sign * fun_weight)
+            points = [(cost, sign * -second) for cost, second in points]
+        return sorted(i for point in points for i in self._points[point])
+
+
+def _lower_hull(points):
+    """
+    Lower convex hull of sorted points, points on a hull edge are kept.
+    >>> _lower_hull([(0, 0), (1, 1), (2, 0), (3, 0), (4, 2)])
+    [(0, 0), (2, 0), (3, 0), (4, 2)]
+    """
+    hull = []
+    for point in points:
+        while len(hull) >= 2:
+            (x1, y1), (x2, y2) = hull[-2], hull[-1]
+            cross = (x2 - x1) * (point[1] - y1) - (y2 - y1) * (point[0] - x1)
+            if cross >= 0:
+                break
+            hull.pop()
+        hull.append(point)
+    return hull
+
+
+def _hull_minimum(hull, weight_x, weight_y):
+    """
+    Finds the points of a lower hull with the lowest value
+    weight_x * x + weight_y * y, weight_y has to be positive.
+    Along the lower hull the value first falls and then rises,
+    so the minimum is found with a binary search.
+    """
+    def value(i):
+        return weight_x * hull[i][0] + weight_y * hull[i][1]
+
+    low = 0
+    high = len(hull) - 1
+    while low < high:
+        middle = (low + high) // 2
+        if value(middle + 1) - value(middle) >= 0:
+            high = middle
+        else:
+            low = middle + 1
+    best = value(low)
+    # Collect the points on the same hull edge with the same value.
+    first = low
+    while first > 0 and value(first - 1) == best:
+        first -= 1
+    last = low
+    while last < len(hull) - 1 and value(last + 1) == best:
+        last += 1
+    return hull[first:last + 1]
+
+
+def weighted_sum_sweep(paths_list, edges_dict, weight_pairs, stats=None):
+    """
+    Calculates the optimal paths of the weighted sum method
+    for many weight pairs at once.
+    The path values and their convex hull are only calculated once.
+    :param paths_list: a list containing tuples with nodes stored within
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param weight_pairs: a list of (cost_weight, fun_weight) tuples
+    :param stats: optional SearchStats object, times the evaluation,
+    building the hull (dominance) and the queries (selection)
+    :return: a list with a set of optimal paths for every weight pair
+    (None for a pair that is not made of numbers)
+    >>> sweep = weighted_sum_sweep(TEST_PATHS1, CAT_EDGES,
+    ...                            [(1, 1), (5, 1), (1, 5), ("hi", "n")])
+    Weight factors must be numbers.
+    >>> sweep[:3] == [weighted_sum(TEST_PATHS1, CAT_EDGES, 1, 1),
+    ...     {('A', 'C', 'D', 'F')}, {('A', 'B', 'D', 'F')}]
+    True
+    >>> sweep[3] is None
+    True
+    """
+    # First calculate the cost and fun values for each path.
+    paths_values = path_value(paths_list, edges_dict, stats)
+    # Check if path is valid
+    if paths_values is None:
+        return None
+    with timed(stats, "dominance"):
+        hull = WeightedSumHull(paths_values)
+    results = []
+    with timed(stats, "selection"):
+        for cost_weight, fun_weight in weight_pairs:
+            # Check if number was entered for cost and fun weights.
+            if not all(isinstance(weight, numbers.Real)
+                       for weight in (cost_weight, fun_weight)):
+                print("Weight factors must be numbers.")
+                results.append(None)
+                continue
+            results.append({paths_list[i]
+                            for i in hull.query(cost_weight, fun_weight)})
+    return results
 
 
-def epsilon_constraint(paths_list, edges_dict, main_goal, sec_goal_value):
+def epsilon_constraint(paths_list, edges_dict, main_goal, sec_goal_value,
+                       stats=None):
     """
     Calculates an optimal path based on the epsilion constrain method.
     Every path has to meet a secondary goal.
@@ -192,6 +398,8 @@ def epsilon_constraint(paths_list, edges_dict, main_goal, sec_goal_value):
     main goal of the algorithm ("cost"/"fun")
     :param sec_goal_value: a string containing either maximum cost
     or minimum fun to meet the secondary goal
+    :param stats: optional SearchStats object, counts the paths that
+    are not chosen as pruned and times the evaluation and the selection
     :return: a set of optimal paths
     >>> (epsilon_constraint(TEST_PATHS1, CAT_EDGES, "cost", 8)
     ...    == {('A', 'B', 'D', 'F')})
@@ -200,12 +408,16 @@ def epsilon_constraint(paths_list, edges_dict, main_goal, sec_goal_value):
     ...    == {('A', 'C', 'D', 'F')})
     True
     >>> epsilon_constraint(TEST_PATHS1, CAT_EDGES, "cost", 50)  # negative-Test
+    >>> stats = SearchStats()
+    >>> _ = epsilon_constraint(TEST_PATHS1, CAT_EDGES, "cost", 8, stats)
+    >>> stats.paths_pruned, sorted(stats.phase_times)
+    (2, ['evaluation', 'selection'])
     """
     # Make sure goal is either cost or fun.
     if main_goal not in ("cost", "fun"):
         raise ValueError("Value has to be 'cost' or 'fun'")
     # First calculate the cost and fun values for each path.
-    paths_values = path_value(paths_list, edges_dict)
+    paths_values = path_value(paths_list, edges_dict, stats)
     if paths_values is None:
         return None
     # Check if number was entered for cost and fun weights.
@@ -213,27 +425,280 @@ def epsilon_constraint(paths_list, edges_dict, main_goal, sec_goal_value):
         float(sec_goal_value)
     except ValueError:
         print("Minimum requirement for secondary goal must be a number.")
-    optimal_paths = set()
+    with timed(stats, "selection"):
+        optimal_indices = _epsilon_indices(paths_values, main_goal,
+                                           sec_goal_value)
+    if stats is not None:
+        stats.paths_pruned += len(paths_values) - len(optimal_indices)
+    # Check if optimal path exists.
+    if len(optimal_indices) == 0:
+        return None
+    return {paths_list[i] for i in optimal_indices}
+
+
+def _epsilon_indices(paths_values, main_goal, sec_goal_value):
+    """
+    Finds the indices of the values that meet the secondary goal
+    and have the best main goal value among them.
+    """
     paths_sec_goal_fulfilled = []
     paths_main_goal_values = []
-    for values in paths_values:
+    for i, values in enumerate(paths_values):
         # Check what main goal is set and if path fulfills secondary goal.
         if main_goal == "cost" and values[1] >= sec_goal_value:
             paths_main_goal_values.append(values[0])
-            paths_sec_goal_fulfilled.append(values)
+            paths_sec_goal_fulfilled.append(i)
         elif main_goal == "fun" and values[0] <= sec_goal_value:
             paths_main_goal_values.append(values[1])
-            paths_sec_goal_fulfilled.append(values)
+            paths_sec_goal_fulfilled.append(i)
+    if len(paths_sec_goal_fulfilled) == 0:
+        return []
     # Check which path has the lowest cost/highest fun.
-    for paths in paths_sec_goal_fulfilled:
-        if (main_goal == "cost" and paths[0]
-                == min(paths_main_goal_values) or
-                main_goal == "fun" and paths[1]
-                == max(paths_main_goal_values)):
-            # Add path to set of optimal paths.
-            optimal_path_index = paths_values.index(paths)
-            my_optimal_path = paths_list[optimal_path_index]
-            optimal_paths.add(my_optimal_path)
+    if main_goal == "cost":
+        best_value = min(paths_main_goal_values)
+    else:
+        best_value = max(paths_main_goal_values)
+    return [i for i, value in zip(paths_sec_goal_fulfilled,
+                                  paths_main_goal_values)
+            if value == best_value]
+
+
+class EpsilonIndex:
+    """
+    Reusable index for many epsilon constraint queries on the same paths.
+    For main goal "cost" the paths are sorted by falling fun, so the paths
+    meeting a minimum fun are a prefix of that order. For main goal "fun"
+    the paths are sorted by rising cost, so the paths within a maximum cost
+    are a prefix as well. For every prefix the best main goal value is
+    stored, a query is then a binary search for the prefix length.
+    >>> index = EpsilonIndex(TEST_PATHS1, CAT_EDGES)
+    >>> index.query("cost", 8) == {('A', 'B', 'D', 'F')}
+    True
+    >>> index.query("fun", 7) == {('A', 'C', 'D', 'F')}
+    True
+    >>> index.query("cost", 50)
+    >>> index.query_many("fun", [5, 10, 6]) == [None,
+    ...     {('A', 'B', 'D', 'F')}, {('A', 'C', 'D', 'F')}]
+    True
+    >>> EpsilonIndex([("A", "F")], CAT_EDGES)
+    Traceback (most recent call last):
+    ...
+    ValueError: Atleast one path is invalid.
+    """
+
+    def __init__(self, paths_list, edges_dict):
+        """
+        :param paths_list: a list containing tuples with nodes stored within
+        :param edges_dict: a Graph or a dictionary containing edges
+        and their respective cost and fun values
+        :raises ValueError: if a path is not connected by edges
+        """
+        # First calculate the cost and fun values for each path.
+        paths_values, invalid_indices = path_value(paths_list, edges_dict,
+                                                   report_invalid=True)
+        # An index without the invalid paths would answer every query
+        # differently from epsilon_constraint.
+        if invalid_indices:
+            raise ValueError("Atleast one path is invalid.")
+        self.paths_list = list(paths_list)
+        # Main goal "cost": negated fun rises, the best cost is the lowest.
+        self._cost_goal = _EpsilonPrefixes(
+            [(-fun, cost) for cost, fun in paths_values], min)
+        # Main goal "fun": cost rises, the best fun is the highest.
+        self._fun_goal = _EpsilonPrefixes(
+            [(cost, fun) for cost, fun in paths_values], max)
+
+    def query(self, main_goal, sec_goal_value):
+        """
+        Calculates the optimal paths for one threshold,
+        with the same result as epsilon_constraint.
+        :param main_goal: a string containing the
+        main goal of the algorithm ("cost"/"fun")
+        :param sec_goal_value: the minimum fun (main goal "cost")
+        or the maximum cost (main goal "fun")
+        :return: a set of optimal paths or None
+        """
+        # Make sure goal is either cost or fun.
+        if main_goal == "cost":
+            indices = self._cost_goal.best_indices(-sec_goal_value)
+        elif main_goal == "fun":
+            indices = self._fun_goal.best_indices(sec_goal_value)
+        else:
+            raise ValueError("Value has to be 'cost' or 'fun'")
+        # Check if optimal path exists.
+        if len(indices) == 0:
+            return None
+        return {self.paths_list[i] for i in indices}
+
+    def query_many(self, main_goal, sec_goal_values):
+        """
+        Calculates the optimal paths for a list of thresholds.
+        :param main_goal: a string containing the
+        main goal of the algorithm ("cost"/"fun")
+        :param sec_goal_values: a list of thresholds for the secondary goal
+        :return: a list with a set of optimal paths (or None) per threshold
+        """
+        return [self.query(main_goal, value) for value in sec_goal_values]
+
+
+class _EpsilonPrefixes:
+    """
+    Paths sorted by a rising limit value with the best goal value
+    of every prefix, used by EpsilonIndex.
+    """
+
+    def __init__(self, limits_and_goals, choose_best):
+        self._order = sorted(range(len(limits_and_goals)),
+                             key=lambda i: limits_and_goals[i][0])
+        self._limits = [limits_and_goals[i][0] for i in self._order]
+        self._best = []
+        # Positions (in sorted order) of every goal value.
+        self._positions = {}
+        for position, i in enumerate(self._order):
+            goal_value = limits_and_goals[i][1]
+            if self._best:
+                goal_value = choose_best(self._best[-1], goal_value)
+            self._best.append(goal_value)
+            self._positions.setdefault(limits_and_goals[i][1], []).append(
+                position)
+
+    def best_indices(self, limit):
+        """
+        Returns the indices of all paths with a limit value up to limit
+        and the best goal value among them.
+        """
+        prefix_length = bisect.bisect_right(self._limits, limit)
+        if prefix_length == 0:
+            return []
+        positions = self._positions[self._best[prefix_length - 1]]
+        count = bisect.bisect_left(positions, prefix_length)
+        return [self._order[position] for position in positions[:count]]
+
+
+def pareto_labels(start, goal, edges_dict, stats=None):
+    """
+    Builds the pareto front straight from the graph (label-setting method).
+    Every label is a partial path with its summed cost and fun.
+    Labels are expanded lexicographically (lowest cost, then highest fun),
+    a label is discarded as soon as another label at the same node
+    has lower cost and higher fun and visited only nodes it visited as well,
+    because every way to extend it could then be taken by the other label.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param stats: optional SearchStats object, counts expanded labels
+    and discarded labels as pruned, times the search and the final
+    dominance filter
+    :return: a dictionary with every pareto optimal path
+    and its (cost, fun) values
+    >>> (pareto_labels("A", "F", CAT_EDGES)
+    ...     == {('A', 'C', 'D', 'F'): (6, 7), ('A', 'B', 'D', 'F'): (10, 11)})
+    True
+    >>> pareto_labels("A", "Z", CAT_EDGES)
+    {}
+    >>> stats = SearchStats()
+    >>> _ = pareto_labels("A", "F", CAT_EDGES, stats)
+    >>> stats.nodes_expanded, stats.paths_completed, stats.paths_pruned
+    (9, 3, 2)
+    """
+    edges_dict = cost_fun_graph(edges_dict)
+    # Every node gets a bit, visited nodes of a label are stored as bitmask.
+    node_bits = {node: 1 << i for i, node in enumerate(edges_dict.nodes)}
+    if start not in node_bits:
+        return {}
+    # A label is [cost, fun, visited mask, path, discarded].
+    first_label = [0, 0, node_bits[start], (start,), False]
+    node_labels = {start: [first_label]}
+    queue = [(0, 0, 0, first_label)]
+    counter = 1
+    goal_labels = []
+    with timed(stats, "search"):
+        while queue:
+            *_, label = heapq.heappop(queue)
+            if label[4]:
+                continue
+            cost, fun, mask, path, _ = label
+            current = path[-1]
+            if stats is not None:
+                stats.max_depth = max(stats.max_depth, len(path) - 1)
+            if current == goal:
+                goal_labels.append(label)
+                continue
+            neighbors = edges_dict.neighbors(current)
+            if stats is not None:
+                stats.nodes_expanded += 1
+                stats.edges_scanned += len(neighbors)
+            for neighbor, edge_cost, edge_fun in neighbors:
+                neighbor_bit = node_bits[neighbor]
+                if mask & neighbor_bit:
+                    continue
+                new_label = [cost + edge_cost, fun + edge_fun,
+                             mask | neighbor_bit, path + (neighbor,), False]
+                labels = node_labels.setdefault(neighbor, [])
+                if _label_dominated(new_label, labels):
+                    if stats is not None:
+                        stats.paths_pruned += 1
+                    continue
+                # Discard labels at the neighbor that the new label dominates.
+                remaining = []
+                for other in labels:
+                    if _label_dominated(other, [new_label]):
+                        other[4] = True
+                        if stats is not None:
+                            stats.paths_pruned += 1
+                    else:
+                        remaining.append(other)
+                remaining.append(new_label)
+                node_labels[neighbor] = remaining
+                heapq.heappush(queue, (new_label[0], -new_label[1], counter,
+                                       new_label))
+                counter += 1
+    # Paths ending at the goal only have to beat each other in both values.
+    goal_labels = [label for label in goal_labels if not label[4]]
+    goal_values = [(label[0], label[1]) for label in goal_labels]
+    with timed(stats, "dominance"):
+        optimal_indices = pareto_indices(goal_values)
+    if stats is not None:
+        stats.paths_completed += len(goal_values)
+        stats.paths_pruned += len(goal_values) - len(optimal_indices)
+    return {goal_labels[i][3]: goal_values[i] for i in optimal_indices}
+
+
+def _label_dominated(label, labels):
+    """
+    Checks whether one of the labels has lower cost, higher fun
+    and a visited mask that is a subset of the label's visited mask.
+    """
+    cost, fun, mask = label[0], label[1], label[2]
+    for other in labels:
+        if (other[0] < cost and other[1] > fun
+                and other[2] & ~mask == 0):
+            return True
+    return False
+
+
+def pareto_front(start, goal, edges_dict, stats=None):
+    """
+    Calculates the pareto optimal paths from start to goal
+    without enumerating every path first.
+    The result has the same form as the result of pareto_optimal.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param stats: optional SearchStats object, see pareto_labels
+    :return: a set of pareto optimal paths
+    >>> pareto_front("A", "F", CAT_EDGES) == pareto_optimal(
+    ...     [("A", "B", "D", "F"), ("A", "B", "E", "F"),
+    ...      ("A", "C", "D", "B", "E", "F"), ("A", "C", "D", "F")], CAT_EDGES)
+    True
+    >>> (pareto_front("A", "E", CAT_EDGES) == {('A', 'B', 'E'),
+    ...     ('A', 'C', 'D', 'B', 'E'), ('A', 'B', 'D', 'F', 'E')})
+    True
+    >>> pareto_front("A", "Z", CAT_EDGES)
+    """
+    optimal_paths = set(pareto_labels(start, goal, edges_dict, stats))
     # Check if optimal path exists.
     if len(optimal_paths) == 0:
         return None
@@ -0,0 +1,201 @@
+"""
+Parallel branch-and-bound search for the optimize_weighted score.
+The top of the search tree is expanded up to a frontier depth,
+the subtrees below the frontier prefixes are searched on several processes.
+A ParallelSearch keeps its processes and their copy of the graph
+for many queries.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from graph import CAT_EDGES, Graph, cost_fun_graph
+from recursive_function import (
+    optimize_weighted, recursive_best_path, remaining_bounds,
+    bounded_search_from)
+
+
+# Graph and shared best score of a worker process, set once by _init_worker.
+_worker = {}
+
+
+def _init_worker(edges, shared_best):
+    _worker["graph"] = Graph(edges)
+    _worker["shared_best"] = shared_best
+
+
+def _search_prefix(task):
+    # The query data is the same object in every task of a query,
+    # so it is only pickled once per chunk of tasks.
+    (goal, weight_cost, weight_fun, bounds, slack), prefix = task
+    return bounded_search_from(
+        prefix, goal, _worker["graph"], weight_cost, weight_fun,
+        bounds, slack, _worker["shared_best"])
+
+
+def frontier_prefixes(start, goal, edges_dict, depth, bounds=None):
+    """
+    Expands the search tree up to a given depth.
+    The prefixes are returned in the order the serial search visits them.
+    Paths reaching the goal earlier are returned as well.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param depth: number of edges of a frontier prefix
+    :param bounds: optional bounds from remaining_bounds, nodes without
+    a bound cannot reach the goal and are left out
+    :return: a list of prefixes, each a list of nodes
+    >>> frontier_prefixes("A", "F", CAT_EDGES, 2)
+    [['A', 'B', 'D'], ['A', 'B', 'E'], ['A', 'C', 'D']]
+    >>> frontier_prefixes("A", "C", CAT_EDGES, 1)
+    [['A', 'B'], ['A', 'C']]
+    """
+    edges_dict = cost_fun_graph(edges_dict)
+    prefixes = []
+
+    def expand(path):
+        if path[-1] == goal or len(path) > depth:
+            prefixes.append(list(path))
+            return
+        for neighbor, _, _ in edges_dict.neighbors(path[-1]):
+            if neighbor in path:
+                continue
+            if bounds is not None and neighbor not in bounds:
+                continue
+            path.append(neighbor)
+            expand(path)
+            path.pop()
+
+    expand([start])
+    return prefixes
+
+
+class ParallelSearch:
+    """
+    A pool of processes that answers many parallel_best_path queries
+    on one graph. The graph is copied to every process once, when the
+    pool starts. If a Graph changed since then, the pool is started again
+    with the new edges. Queries are answered one at a time, because all
+    processes share one best score.
+    >>> with ParallelSearch(CAT_EDGES, max_workers=2) as search:
+    ...     first = search.best_path("A", "F")
+    ...     second = search.best_path("A", "F", 10, 1)
+    >>> first, second
+    ((['A', 'B', 'D', 'F'], 10, 11), (['A', 'C', 'D', 'F'], 6, 7))
+    """
+
+    def __init__(self, edges_dict, max_workers=None):
+        """
+        :param edges_dict: a Graph or a dictionary containing edges
+        and their respective cost and fun values
+        :param max_workers: number of processes (default: number of cores)
+        """
+        self.graph = cost_fun_graph(edges_dict)
+        self.max_workers = max_workers
+        self._shared_best = multiprocessing.Value("d", float("inf"))
+        self._lock = threading.Lock()
+        self._executor = None
+        self._version = None
+
+    def best_path(self, start, goal, weight_cost=1, weight_fun=1,
+                  frontier_depth=2):
+        """
+        Finds the path with the lowest optimize_weighted score,
+        see parallel_best_path.
+        :param start: a string containing the start node
+        :param goal: a string containing the goal node
+        :param weight_cost: weight of the cost value
+        :param weight_fun: weight of the fun value
+        :param frontier_depth: number of edges expanded before splitting
+        :return: a tuple (best_path, total_cost, total_fun) or None
+        """
+        if start == goal:
+            return [start], 0, 0
+        bounds, slack = remaining_bounds(self.graph, goal, weight_cost,
+                                         weight_fun)
+        if start not in bounds:
+            return None
+        prefixes = frontier_prefixes(start, goal, self.graph, frontier_depth,
+                                     bounds)
+        query = (goal, weight_cost, weight_fun, bounds, slack)
+        with self._lock:
+            executor = self._start()
+            with self._shared_best.get_lock():
+                self._shared_best.value = float("inf")
+            workers = self.max_workers or os.cpu_count() or 1
+            results = list(executor.map(
+                _search_prefix, [(query, prefix) for prefix in prefixes],
+                chunksize=max(1, len(prefixes) // (4 * workers))))
+        # The first prefix with the lowest score wins, like in the serial
+        # search.
+        best_result = None
+        best_score = float("inf")
+        for result, score, _ in results:
+            if result is not None and score < best_score:
+                best_result = result
+                best_score = score
+        return best_result
+
+    def close(self):
+        """
+        Stops the processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _start(self):
+        version = getattr(self.graph, "version", 0)
+        if self._executor is not None and self._version != version:
+            # The processes hold the edges from before the change.
+            self.close()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.max_workers, initializer=_init_worker,
+                initargs=(dict(self.graph), self._shared_best))
+            self._version = version
+        return self._executor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+def parallel_best_path(start, goal, edges_dict, weight_cost=1, weight_fun=1,
+                       frontier_depth=2, max_workers=None):
+    """
+    Finds the path with the lowest optimize_weighted score on several
+    processes. Every frontier prefix is searched with branch and bound,
+    the best score found so far is shared between the processes so they
+    can cut off subtrees of each other. The results are merged in the order
+    of the serial search, so the same path as recursive_best_path is found.
+    The processes are started for this one query, a ParallelSearch keeps
+    them for the next queries.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param weight_cost: weight of the cost value
+    :param weight_fun: weight of the fun value
+    :param frontier_depth: number of edges expanded before splitting
+    :param max_workers: number of processes (default: number of cores)
+    :return: a tuple (best_path, total_cost, total_fun) or None
+    >>> (parallel_best_path("A", "F", CAT_EDGES, max_workers=2)
+    ...     == recursive_best_path("A", "F", CAT_EDGES, optimize_weighted))
+    True
+    >>> parallel_best_path("A", "Z", CAT_EDGES) is None
+    True
+    """
+    with ParallelSearch(edges_dict, max_workers) as search:
+        return search.best_path(start, goal, weight_cost, weight_fun,
+                                frontier_depth)
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -0,0 +1,170 @@
+"""
+Streaming pareto optimization.
+Simple paths are generated one by one together with their cost and fun,
+an online archive keeps only the pareto optimal ones,
+so memory grows with the pareto front and not with the number of paths.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import bisect
+import doctest
+from graph import CAT_EDGES, cost_fun_graph
+
+
+def simple_paths(start, goal, edges_dict):
+    """
+    Generates every simple path from start to goal, one at a time,
+    in the order of recursive_best_path's search.
+    The cost and fun of a path are summed up while walking along it.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :return: a generator of (path, total_cost, total_fun) tuples
+    >>> for path in simple_paths("A", "F", CAT_EDGES):
+    ...     print(path)
+    (('A', 'B', 'D', 'F'), 10, 11)
+    (('A', 'B', 'E', 'F'), 10, 3)
+    (('A', 'C', 'D', 'B', 'E', 'F'), 14, 9)
+    (('A', 'C', 'D', 'F'), 6, 7)
+    >>> list(simple_paths("A", "A", CAT_EDGES))
+    [(('A',), 0, 0)]
+    """
+    if start == goal:
+        yield (start,), 0, 0
+        return
+    edges_dict = cost_fun_graph(edges_dict)
+    path = [start]
+    visited = {start}
+    path_costs = [0]
+    path_funs = [0]
+    edge_iterators = [iter(edges_dict.neighbors(start))]
+    while edge_iterators:
+        for neighbor, edge_cost, edge_fun in edge_iterators[-1]:
+            if neighbor in visited:
+                continue
+            total_cost = path_costs[-1] + edge_cost
+            total_fun = path_funs[-1] + edge_fun
+            if neighbor == goal:
+                yield tuple(path) + (goal,), total_cost, total_fun
+                continue
+            visited.add(neighbor)
+            path.append(neighbor)
+            path_costs.append(total_cost)
+            path_funs.append(total_fun)
+            edge_iterators.append(iter(edges_dict.neighbors(neighbor)))
+            break
+        else:
+            visited.discard(path.pop())
+            path_costs.pop()
+            path_funs.pop()
+            edge_iterators.pop()
+
+
+class ParetoArchive:
+    """
+    Online archive of pareto optimal paths.
+    Like in pareto_optimal, a path is dominated if another path has
+    lower cost and higher fun, paths with equal values are all kept.
+    The archive is sorted by cost, along it the fun never falls,
+    so a new path is checked and inserted with a binary search.
+    >>> archive = ParetoArchive()
+    >>> archive.add(("A", "B", "E", "F"), 10, 3)
+    True
+    >>> archive.add(("A", "C", "D", "F"), 6, 7)
+    True
+    >>> archive.add(("A", "C", "D", "B", "E", "F"), 14, 9)
+    True
+    >>> archive.add(("A", "X", "F"), 15, 8)
+    False
+    >>> archive.items()
+    [(('A', 'C', 'D', 'F'), 6, 7), (('A', 'C', 'D', 'B', 'E', 'F'), 14, 9)]
+    >>> archive.extend(simple_paths("A", "F", CAT_EDGES))
+    >>> archive.paths() == {('A', 'C', 'D', 'F'), ('A', 'B', 'D', 'F')}
+    True
+    """
+
+    def __init__(self):
+        self._costs = []
+        self._funs = []
+        self._paths = []
+
+    def add(self, path, cost, fun):
+        """
+        Adds a path to the archive if no archived path dominates it
+        and removes the archived paths it dominates.
+        :param path: a tuple of nodes
+        :param cost: the total cost of the path
+        :param fun: the total fun of the path
+        :return: True if the path was added
+        """
+        position = bisect.bisect_left(self._costs, cost)
+        # The cheaper path with the most fun comes right before position.
+        if position > 0 and self._funs[position - 1] > fun:
+            return False
+        # Dominated paths are more expensive with less fun,
+        # they follow directly after the paths with the same cost.
+        first = bisect.bisect_right(self._costs, cost, position)
+        last = first
+        while last < len(self._costs) and self._funs[last] < fun:
+            last += 1
+        del self._costs[first:last]
+        del self._funs[first:last]
+        del self._paths[first:last]
+        # Keep the fun rising within paths of the same cost as well.
+        insert_at = bisect.bisect_right(self._funs, fun, position, first)
+        self._costs.insert(insert_at, cost)
+        self._funs.insert(insert_at, fun)
+        self._paths.insert(insert_at, path)
+        return True
+
+    def extend(self, evaluated_paths):
+        """
+        Adds every path of an iterable of (path, cost, fun) tuples.
+        """
+        for path, cost, fun in evaluated_paths:
+            self.add(path, cost, fun)
+
+    def items(self):
+        """
+        :return: a list of the archived (path, cost, fun) tuples,
+        sorted by cost
+        """
+        return list(zip(self._paths, self._costs, self._funs))
+
+    def paths(self):
+        """
+        :return: a set of the archived paths
+        """
+        return set(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+
+def pareto_stream(start, goal, edges_dict):
+    """
+    Calculates the pareto optimal paths from start to goal by streaming
+    every simple path into a ParetoArchive.
+    The result has the same form as the result of pareto_optimal.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :return: a set of pareto optimal paths
+    >>> (pareto_stream("A", "E", CAT_EDGES) == {('A', 'B', 'E'),
+    ...     ('A', 'C', 'D', 'B', 'E'), ('A', 'B', 'D', 'F', 'E')})
+    True
+    >>> pareto_stream("A", "Z", CAT_EDGES)
+    """
+    archive = ParetoArchive()
+    archive.extend(simple_paths(start, goal, edges_dict))
+    optimal_paths = archive.paths()
+    # Check if optimal path exists.
+    if len(optimal_paths) == 0:
+        return None
+    return optimal_paths
+
+
+if __name__ == "__main__":
+    doctest.testmod()
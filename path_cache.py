@@ -0,0 +1,203 @@
+"""
+Result cache for repeated path queries on one graph.
+The cache has a fixed size and drops the least recently used result first.
+When an edge of the graph changes, only the results that may depend
+on that edge are removed.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+from collections import OrderedDict
+from graph import CAT_EDGES, Graph, CompactGraph, cost_fun_graph
+from greedy_algo import greedy_best_path
+from dp_solver import weighted_best_path
+from recursive_function import optimize_weighted
+
+
+class PathCache:
+    """
+    Caches the results of weighted and greedy path queries on one graph.
+    recursive_best_path is not cached, its optimize_func can be any
+    function, so two calls cannot be told apart; weighted_best_path
+    gives the same result for optimize_weighted.
+    A result is stored under the query parameters together with the graph
+    version it is valid for. Edge changes made with Graph.set_edge or
+    Graph.remove_edge are reported to the cache, which then removes:
+    - weighted results whose path uses the edge, or (if the edge got better
+      or was added) whose start node could reach the edge,
+    - greedy results whose path leaves a node through which the edge starts,
+      and greedy results without a path.
+    >>> cache = PathCache(CAT_EDGES, max_size=2)
+    >>> cache.weighted_best_path("A", "F")
+    (['A', 'B', 'D', 'F'], 10, 11)
+    >>> cache.weighted_best_path("A", "F")
+    (['A', 'B', 'D', 'F'], 10, 11)
+    >>> cache.greedy_best_path("A", "F", "cost")
+    (('A', 'C', 'D', 'F'), 6, 7)
+    >>> cache.graph.set_edge("E", "F", 6, 0)
+    >>> cache.stats()
+    {'hits': 1, 'misses': 2, 'evictions': 0, 'invalidations': 0, 'size': 2}
+    >>> cache.graph.set_edge("D", "F", 3, 1)
+    >>> cache.stats()["invalidations"], cache.weighted_best_path("A", "F")
+    (2, (['A', 'B', 'D', 'F'], 10, 8))
+
+    A CompactGraph cannot change, so its results are never removed:
+    >>> cache = PathCache(CompactGraph(CAT_EDGES))
+    >>> cache.greedy_best_path("A", "F", "cost")
+    (('A', 'C', 'D', 'F'), 6, 7)
+    >>> cache.greedy_best_path("A", "F", "cost")
+    (('A', 'C', 'D', 'F'), 6, 7)
+    >>> cache.stats()["hits"]
+    1
+    """
+
+    def __init__(self, edges_dict, max_size=256):
+        """
+        :param edges_dict: a Graph, a CompactGraph or a dictionary
+        containing edges and their respective cost and fun values,
+        changes have to be made on the graph attribute of the cache
+        :param max_size: maximum number of stored results
+        """
+        self.graph = cost_fun_graph(edges_dict)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        # Query key -> entry dictionary, the oldest entry comes first.
+        self._entries = OrderedDict()
+        self._version = _version(self.graph)
+        if isinstance(self.graph, Graph):
+            self.graph.add_listener(self._edge_changed)
+
+    def close(self):
+        """
+        Stops following the changes of the graph, the cache can be
+        thrown away afterwards.
+        >>> cache = PathCache(CAT_EDGES)
+        >>> cache.weighted_best_path("A", "F")
+        (['A', 'B', 'D', 'F'], 10, 11)
+        >>> cache.close()
+        >>> cache.graph.set_edge("A", "B", 1, 1)
+        >>> cache.stats()["invalidations"], cache.weighted_best_path("A", "F")
+        (0, (['A', 'B', 'D', 'F'], 8, 10))
+        """
+        if isinstance(self.graph, Graph):
+            self.graph.remove_listener(self._edge_changed)
+
+    def weighted_best_path(self, start, goal, weight_cost=1, weight_fun=1):
+        """
+        Cached version of dp_solver.weighted_best_path.
+        :param start: a string containing the start node
+        :param goal: a string containing the goal node
+        :param weight_cost: weight of the cost value
+        :param weight_fun: weight of the fun value
+        :return: a tuple (best_path, total_cost, total_fun) or None
+        """
+        key = ("weighted", start, goal, weight_cost, weight_fun)
+        return self._lookup(key, lambda: weighted_best_path(
+            start, goal, self.graph, weight_cost, weight_fun))
+
+    def greedy_best_path(self, start, goal, focus_value):
+        """
+        Cached version of greedy_algo.greedy_best_path.
+        :param start: a string containing the start node
+        :param goal: a string containing the goal node
+        :param focus_value: "cost" or "fun"
+        :return: a tuple (path, total_cost, total_fun) or None
+        """
+        key = ("greedy", start, goal, focus_value)
+        return self._lookup(key, lambda: greedy_best_path(
+            start, goal, self.graph, focus_value))
+
+    def stats(self):
+        """
+        Returns the counters of the cache.
+        :return: a dictionary with hits, misses, evictions,
+        invalidations and the current size
+        """
+        return {"hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries)}
+
+    def clear(self):
+        """
+        Removes every stored result.
+        """
+        self._entries.clear()
+
+    def _lookup(self, key, search):
+        if self._version != _version(self.graph):
+            # The graph changed without telling the cache.
+            self.clear()
+            self._version = _version(self.graph)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry["result"]
+        self.misses += 1
+        result = search()
+        entry = {"result": result, "version": self._version}
+        if result is not None:
+            path = result[0]
+            entry["edges"] = set(zip(path, path[1:]))
+            entry["nodes"] = set(path[:-1])
+        if key[0] == "weighted":
+            entry["reachable"] = self._reachable(key[1])
+        self._entries[key] = entry
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def _reachable(self, start):
+        found = {start}
+        stack = [start]
+        while stack:
+            for neighbor, _, _ in self.graph.neighbors(stack.pop()):
+                if neighbor not in found:
+                    found.add(neighbor)
+                    stack.append(neighbor)
+        return found
+
+    def _edge_changed(self, node1, node2, old_value, new_value):
+        for key in list(self._entries):
+            if self._affected(key, self._entries[key], node1, node2,
+                              old_value, new_value):
+                del self._entries[key]
+                self.invalidations += 1
+            else:
+                self._entries[key]["version"] = self.graph.version
+        self._version = self.graph.version
+
+    @staticmethod
+    def _affected(key, entry, node1, node2, old_value, new_value):
+        if entry["result"] is None:
+            # A missing path may be found after any change.
+            return key[0] == "greedy" or new_value is not None
+        if key[0] == "greedy":
+            return node1 in entry["nodes"]
+        if (node1, node2) in entry["edges"]:
+            return True
+        if new_value is None or node1 not in entry["reachable"]:
+            return False
+        weight_cost, weight_fun = key[3], key[4]
+        new_score = optimize_weighted(*new_value, weight_cost, weight_fun)
+        # Only a better (or new) edge can make another path the best one.
+        return (old_value is None or new_score
+                < optimize_weighted(*old_value, weight_cost, weight_fun))
+
+
+def _version(graph):
+    """
+    Returns the version of a Graph, a read-only CompactGraph stays at 0.
+    """
+    if isinstance(graph, Graph):
+        return graph.version
+    return 0
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -0,0 +1,242 @@
+"""
+Vectorized evaluation of many paths at once.
+Node labels are replaced by integer ids, the edge values are stored
+in one dense array per objective (cost, fun and any further values of the
+edge value tuples) and all paths are packed into one flat array.
+The totals of every path then come from one gather and one segmented sum.
+NumPy is used if it is installed, otherwise plain Python loops are used.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+from graph import CAT_EDGES, as_graph
+from path_trie import PathTrie
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+TEST_PATHS1 = [("A", "C", "D", "F"), ("A", "B", "D", "F"),
+               ("A", "B", "E", "F")]
+
+
+class EdgeTable:
+    """
+    The edges of a graph stored as dense arrays.
+    Every edge (node1, node2) gets the key id(node1) * n + id(node2),
+    the keys are sorted and the value columns follow that order.
+    Column k holds value k of every edge, all edges need the same number
+    of values.
+    >>> table = EdgeTable(CAT_EDGES)
+    >>> table.node_ids["C"], table.keys[:3], table.columns[0][:3]
+    (2, [1, 2, 6], [3, 1, 1])
+    >>> EdgeTable({("A", "B"): (1, 2, 3), ("B", "C"): (4, 5, 6)}).evaluate(
+    ...     [("A", "B", "C")])
+    ([(5, 7, 9)], [])
+    >>> EdgeTable({("A", "B"): (1, 2, 3), ("B", "C"): (4, 5)})
+    Traceback (most recent call last):
+    ...
+    ValueError: Every edge needs 3 values.
+    """
+
+    def __init__(self, edges_dict):
+        """
+        :param edges_dict: a Graph or a dictionary containing edges
+        and their respective cost and fun values
+        """
+        graph = as_graph(edges_dict)
+        self.node_ids = {node: i for i, node in enumerate(graph.nodes)}
+        node_count = len(self.node_ids)
+        edges = sorted(
+            (self.node_ids[node1] * node_count + self.node_ids[node2], value)
+            for (node1, node2), value in graph.items())
+        self.keys = [key for key, _ in edges]
+        # Number of values per edge, two (cost and fun) for an empty graph.
+        self.dimensions = len(edges[0][1]) if edges else 2
+        if any(len(value) != self.dimensions for _, value in edges):
+            raise ValueError(f"Every edge needs {self.dimensions} values.")
+        self.columns = [[value[k] for _, value in edges]
+                        for k in range(self.dimensions)]
+        self.edge_index = {key: i for i, key in enumerate(self.keys)}
+        if numpy is not None:
+            self._key_array = numpy.array(self.keys, dtype=numpy.int64)
+            self._column_arrays = [numpy.array(column)
+                                   for column in self.columns]
+
+    def pack_paths(self, paths_list):
+        """
+        Packs all paths into one flat list of node ids.
+        Nodes that are not part of the graph get the id -1.
+        :param paths_list: a list containing tuples with nodes stored within
+        :return: a tuple (flat, offsets), path i is flat[offsets[i]:
+        offsets[i + 1]]
+        >>> EdgeTable(CAT_EDGES).pack_paths([("A", "C"), ("B", "Z", "F")])
+        ([0, 2, 1, -1, 5], [0, 2, 5])
+        """
+        node_ids = self.node_ids
+        flat = []
+        offsets = [0]
+        for path in paths_list:
+            flat.extend(node_ids.get(node, -1) for node in path)
+            offsets.append(len(flat))
+        return flat, offsets
+
+    def evaluate(self, paths_list):
+        """
+        Sums up the cost and fun (every edge value) of every path.
+        :param paths_list: a list containing tuples with nodes stored within
+        :return: a tuple (paths_values, invalid_indices), paths_values holds
+        (total_cost, total_fun) for every path or None for an invalid path,
+        invalid_indices holds the indices of the invalid paths
+        >>> EdgeTable(CAT_EDGES).evaluate(TEST_PATHS1 + [("A", "F"), ("A",)])
+        ([(6, 7), (10, 11), (10, 3), None, (0, 0)], [3])
+        """
+        flat, offsets = self.pack_paths(paths_list)
+        if numpy is not None and len(flat) > 1 and self.keys:
+            return self._evaluate_numpy(flat, offsets)
+        return self._evaluate_python(flat, offsets)
+
+    def _evaluate_python(self, flat, offsets):
+        node_count = len(self.node_ids)
+        columns = self.columns
+        paths_values = []
+        invalid_indices = []
+        for i in range(len(offsets) - 1):
+            totals = [0] * self.dimensions
+            for j in range(offsets[i], offsets[i + 1] - 1):
+                edge = self.edge_index.get(flat[j] * node_count + flat[j + 1])
+                if edge is None or flat[j] < 0 or flat[j + 1] < 0:
+                    invalid_indices.append(i)
+                    paths_values.append(None)
+                    break
+                for k, column in enumerate(columns):
+                    totals[k] += column[edge]
+            else:
+                paths_values.append(tuple(totals))
+        return paths_values, invalid_indices
+
+    def _evaluate_numpy(self, flat, offsets):
+        flat = numpy.array(flat, dtype=numpy.int64)
+        offsets = numpy.array(offsets, dtype=numpy.int64)
+        starts = offsets[:-1]
+        # Pair j connects flat[j] and flat[j + 1], path i owns the pairs
+        # starts[i] up to ends[i] - 1, all other pairs cross two paths.
+        ends = numpy.maximum(offsets[1:] - 1, starts)
+        in_path = numpy.ones(len(flat) - 1, dtype=bool)
+        boundaries = offsets[1:-1] - 1
+        in_path[boundaries[(boundaries >= 0)
+                           & (boundaries < len(in_path))]] = False
+        sources = flat[:-1]
+        targets = flat[1:]
+        # Gather: find every pair in the sorted edge keys.
+        keys = sources * len(self.node_ids) + targets
+        positions = numpy.searchsorted(self._key_array, keys)
+        positions = numpy.minimum(positions, len(self._key_array) - 1)
+        found = ((sources >= 0) & (targets >= 0)
+                 & (self._key_array[positions] == keys))
+        used = in_path & found
+        missing = (in_path & ~found).astype(numpy.int64)
+        # Segmented sum over the pairs of every path with at least one edge,
+        # once per value column.
+        with_edges = ends > starts
+        segment_starts = starts[with_edges]
+        path_missing = numpy.zeros(len(starts), dtype=numpy.int64)
+        if with_edges.any():
+            path_missing[with_edges] = numpy.add.reduceat(missing,
+                                                          segment_starts)
+        path_columns = []
+        for column_array in self._column_arrays:
+            pair_values = numpy.where(used, column_array[positions], 0)
+            path_column = numpy.zeros(len(starts), dtype=pair_values.dtype)
+            if with_edges.any():
+                path_column[with_edges] = numpy.add.reduceat(pair_values,
+                                                             segment_starts)
+            path_columns.append(path_column.tolist())
+        invalid_indices = numpy.nonzero(path_missing)[0].tolist()
+        paths_values = list(zip(*path_columns))
+        for i in invalid_indices:
+            paths_values[i] = None
+        return paths_values, invalid_indices
+
+
+def edge_table(edges_dict):
+    """
+    Returns the EdgeTable of a graph, a Graph object keeps its table
+    so it is only built once. A dictionary is converted to a new Graph
+    on every call, so its table is built again every time.
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :return: an EdgeTable
+    >>> graph = as_graph(CAT_EDGES)
+    >>> edge_table(graph) is edge_table(graph)
+    True
+    """
+    graph = as_graph(edges_dict)
+    if graph._edge_table is None:
+        graph._edge_table = EdgeTable(graph)
+    return graph._edge_table
+
+
+def evaluate_paths(paths_list, edges_dict):
+    """
+    Sums up the cost and fun of every path in one batch.
+    Invalid paths do not stop the evaluation, they are reported by index.
+    The EdgeTable is only built if the paths have at least as many nodes
+    as the graph has edges, fewer paths look up their edges one by one.
+    Callers that evaluate paths more than once have to pass a Graph,
+    it keeps its table; the table of a dictionary is built for every call.
+    A PathTrie sums up every shared beginning of its paths only once.
+    :param paths_list: a list containing tuples with nodes stored within
+    or a PathTrie
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :return: a tuple (paths_values, invalid_indices), paths_values holds
+    (total_cost, total_fun) for every path or None for an invalid path
+    >>> evaluate_paths([("A", "B"), ("A", "C")], {("A", "C"): (3, 2)})
+    ([None, (3, 2)], [0])
+    >>> evaluate_paths([], CAT_EDGES)
+    ([], [])
+    >>> evaluate_paths(PathTrie(TEST_PATHS1), CAT_EDGES)
+    ([(6, 7), (10, 11), (10, 3)], [])
+    >>> evaluate_paths([("A", "B", "D"), ("A", "F"), ("A",)], CAT_EDGES)
+    ([(7, 7), None, (0, 0)], [1])
+    >>> evaluate_paths((path for path in TEST_PATHS1), CAT_EDGES)
+    ([(6, 7), (10, 11), (10, 3)], [])
+    """
+    if isinstance(paths_list, PathTrie):
+        return paths_list.evaluate(edges_dict)
+    # The paths are read twice, a generator would be empty the second time.
+    paths_list = list(paths_list)
+    if (getattr(edges_dict, "_edge_table", None) is None
+            and sum(len(path) for path in paths_list) < len(edges_dict)):
+        # Building the table costs more than looking up the few edges
+        # of the paths, only a Graph keeps its table for the next call.
+        return _lookup_edges(paths_list, edges_dict)
+    return edge_table(edges_dict).evaluate(paths_list)
+
+
+def _lookup_edges(paths_list, edges_dict):
+    """
+    Sums up the values of every path edge by edge.
+    """
+    dimensions = len(next(iter(edges_dict.values()), (0, 0)))
+    paths_values = []
+    invalid_indices = []
+    for i, path in enumerate(paths_list):
+        totals = [0] * dimensions
+        for edge in zip(path, path[1:]):
+            if edge not in edges_dict:
+                invalid_indices.append(i)
+                paths_values.append(None)
+                break
+            for k, value in enumerate(edges_dict[edge]):
+                totals[k] += value
+        else:
+            paths_values.append(tuple(totals))
+    return paths_values, invalid_indices
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -0,0 +1,186 @@
+"""
+Path collection that stores shared beginnings of paths only once.
+The paths are kept in a prefix tree (trie): every trie node is one node
+of a path, the paths that start the same way share their trie nodes.
+A PathTrie can be passed wherever a paths_list is expected, the cost
+and fun of every trie edge are then only summed up once.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import doctest
+import operator
+from array import array
+from collections.abc import Sequence
+from graph import CAT_EDGES, as_graph
+
+
+TEST_PATHS1 = [("A", "C", "D", "F"), ("A", "B", "D", "F"),
+               ("A", "B", "E", "F")]
+
+
+class PathTrie(Sequence):
+    """
+    A list of paths stored as a prefix tree.
+    The trie nodes are numbered in the order they were added, so the
+    parent of a trie node always has a lower number. Path i ends at the
+    trie node ends[i] and is rebuilt by following the parents.
+    The children of a trie node are a linked list (first child, next
+    sibling) in flat arrays, which takes far less memory than a dictionary
+    per trie node, a path node has only a few neighbors to look through.
+    >>> trie = PathTrie(TEST_PATHS1)
+    >>> len(trie), trie.stored_nodes(), trie[1]
+    (3, 9, ('A', 'B', 'D', 'F'))
+    >>> trie.add(("A", "B"))
+    3
+    >>> trie.stored_nodes(), list(trie)[-1], trie[-1]
+    (9, ('A', 'B'), ('A', 'B'))
+    >>> trie.stored_edges(), trie.max_length()
+    (8, 3)
+    >>> trie.evaluate(CAT_EDGES)
+    ([(6, 7), (10, 11), (10, 3), (3, 2)], [])
+    >>> PathTrie([("A", "F"), ("A", "C")]).evaluate(CAT_EDGES)
+    ([None, (1, 0)], [0])
+    >>> PathTrie([("A", "B", "C")]).evaluate({("A", "B"): (1, 2, 3),
+    ...                                       ("B", "C"): (4, 5, 6)})
+    ([(5, 7, 9)], [])
+    """
+
+    def __init__(self, paths_list=()):
+        """
+        :param paths_list: a list containing tuples with nodes stored within
+        """
+        # Parent trie node of every trie node, -1 for the first node.
+        self._parents = array("q")
+        self._labels = []
+        # First child and next sibling of every trie node, -1 for none.
+        self._first_children = array("q")
+        self._next_siblings = array("q")
+        self._first_root = -1
+        self._roots = 0
+        # Number of edges of the longest path.
+        self._max_length = 0
+        # Last trie node of every path, -1 for an empty path.
+        self._ends = array("q")
+        for path in paths_list:
+            self.add(path)
+
+    def add(self, path):
+        """
+        Adds a path, only the part after the longest stored
+        beginning needs new trie nodes.
+        :param path: a tuple of nodes
+        :return: the index of the path
+        """
+        labels = self._labels
+        first_children = self._first_children
+        next_siblings = self._next_siblings
+        trie_node = -1
+        for node in path:
+            if trie_node < 0:
+                child = self._first_root
+            else:
+                child = first_children[trie_node]
+            while child >= 0 and labels[child] != node:
+                child = next_siblings[child]
+            if child < 0:
+                child = len(labels)
+                self._parents.append(trie_node)
+                labels.append(node)
+                first_children.append(-1)
+                if trie_node < 0:
+                    next_siblings.append(self._first_root)
+                    self._first_root = child
+                    self._roots += 1
+                else:
+                    next_siblings.append(first_children[trie_node])
+                    first_children[trie_node] = child
+            trie_node = child
+        self._ends.append(trie_node)
+        self._max_length = max(self._max_length, len(path) - 1)
+        return len(self._ends) - 1
+
+    def stored_nodes(self):
+        """
+        :return: the number of trie nodes, every shared beginning
+        of paths is counted once
+        """
+        return len(self._labels)
+
+    def stored_edges(self):
+        """
+        :return: the number of trie edges, which is the number of edge
+        lookups evaluate needs
+        """
+        return len(self._labels) - self._roots
+
+    def max_length(self):
+        """
+        :return: the number of edges of the longest path
+        """
+        return self._max_length
+
+    def evaluate(self, edges_dict):
+        """
+        Sums up the cost and fun (every edge value) of every path, each
+        trie edge is looked up once and its totals are shared by every
+        path through it.
+        :param edges_dict: a Graph or a dictionary containing edges
+        and their respective cost and fun values
+        :return: a tuple (paths_values, invalid_indices) like
+        path_evaluation.evaluate_paths
+        """
+        graph = as_graph(edges_dict)
+        parents = self._parents
+        labels = self._labels
+        zeros = (0,) * len(next(iter(graph.values()), (0, 0)))
+        # Totals of the path up to every trie node, None if invalid.
+        totals = [None] * len(labels)
+        for trie_node, parent in enumerate(parents):
+            if parent < 0:
+                totals[trie_node] = zeros
+                continue
+            if totals[parent] is None:
+                continue
+            edge = (labels[parent], labels[trie_node])
+            if edge not in graph:
+                continue
+            totals[trie_node] = tuple(map(operator.add, totals[parent],
+                                          graph[edge]))
+        paths_values = []
+        invalid_indices = []
+        for i, end in enumerate(self._ends):
+            if end < 0:
+                paths_values.append(zeros)
+            elif totals[end] is not None:
+                paths_values.append(totals[end])
+            else:
+                paths_values.append(None)
+                invalid_indices.append(i)
+        return paths_values, invalid_indices
+
+    def _path(self, end):
+        path = []
+        while end >= 0:
+            path.append(self._labels[end])
+            end = self._parents[end]
+        path.reverse()
+        return tuple(path)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._path(end) for end in self._ends[index]]
+        return self._path(self._ends[index])
+
+    def __iter__(self):
+        for end in self._ends:
+            yield self._path(end)
+
+    def __len__(self):
+        return len(self._ends)
+
+    def __repr__(self):
+        return f"PathTrie({list(self)!r})"
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -0,0 +1,396 @@
+"""
+Headless query mode: the graph is loaded once, queries arrive as JSON lines
+on stdin or on a local Unix socket and every result is sent back as one
+JSON line. Each request may carry an "id" that is copied into its response.
+
+Query types and their fields:
+- recursive: start, goal, weight_cost (1), weight_fun (1)
+- greedy: start, goal, focus_value ("cost"/"fun")
+- k_best: start, goal, k, weight_cost (1), weight_fun (1)
+- pareto: paths, or start and goal, optional epsilon or max_size
+  for an approximate front (see approximate_pareto)
+- weighted: paths, weight_cost, weight_fun
+- epsilon: paths, main_goal ("cost"/"fun"), sec_goal_value
+Recursive and greedy results are cached (see path_cache), they are
+answered on threads of the server process that share the cache.
+All other queries are answered by a pool of worker processes, so a slow
+query does not hold up the queries of other connections.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import asyncio
+import contextlib
+import doctest
+import io
+import json
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from graph import CAT_EDGES, Graph, CompactGraph
+from graph_file import load_graph
+from path_cache import PathCache
+from multiobjective_optimization import (
+    pareto_optimal, pareto_front, weighted_sum, epsilon_constraint)
+from approximate_pareto import approximate_pareto, approximate_pareto_front
+from k_best_paths import best_paths
+
+
+# Query types answered with the cache of the server process.
+_CACHED_TYPES = ("recursive", "greedy")
+# Fields every query type needs, pareto needs paths or start and goal.
+_REQUIRED_FIELDS = {
+    "recursive": ("start", "goal"),
+    "greedy": ("start", "goal", "focus_value"),
+    "k_best": ("start", "goal", "k"),
+    "pareto": (),
+    "weighted": ("paths", "weight_cost", "weight_fun"),
+    "epsilon": ("paths", "main_goal", "sec_goal_value"),
+}
+# Server of a worker process, set once by _init_worker.
+_worker = {}
+
+
+class QueryServer:
+    """
+    Answers JSON queries on one graph.
+    >>> server = QueryServer(CAT_EDGES)
+    >>> server.handle_line('{"type": "recursive", "start": "A", "goal": "F"}')
+    '{"result": {"path": ["A", "B", "D", "F"], "cost": 10, "fun": 11}}'
+    >>> server.handle_line('{"type": "pareto", "start": "A", "goal": "F"}')
+    '{"result": [["A", "B", "D", "F"], ["A", "C", "D", "F"]]}'
+    >>> server.handle_line('{"type": "pareto", "start": "A", "goal": "F",'
+    ...                    ' "max_size": 1}')
+    '{"result": [["A", "C", "D", "F"]]}'
+    >>> server.handle_line('{"type": "weighted", "weight_cost": 5,'
+    ...                    ' "weight_fun": 1, "paths": [["A", "C", "D", "F"],'
+    ...                    ' ["A", "B", "D", "F"]]}')
+    '{"result": [["A", "C", "D", "F"]]}'
+    >>> server.handle_line('{"id": 2, "type": "weighted", "weight_cost": 1,'
+    ...                    ' "weight_fun": 1, "paths": [["A", "F"]]}')
+    '{"id": 2, "error": "Atleast one path is invalid."}'
+    >>> server.handle_line('{"type": "k_best", "start": "A", "goal": "B",'
+    ...                    ' "k": 1, "weight_fun": 0}')
+    '{"result": [{"path": ["A", "B"], "cost": 3, "fun": 2}]}'
+    >>> server.handle_line('{"type": "greedy", "start": "A"}')
+    '{"error": "Missing field \\'goal\\'."}'
+    >>> server.handle_line('{"type": "pareto", "start": "A"}')
+    '{"error": "Missing field \\'goal\\'."}'
+
+    A graph loaded from a binary graph file:
+    >>> import os, tempfile
+    >>> from graph_file import write_graph, load_graph
+    >>> file_path = os.path.join(tempfile.mkdtemp(), "cat.graph")
+    >>> write_graph(CAT_EDGES, file_path)
+    >>> server = QueryServer(load_graph(file_path))
+    >>> server.handle_line('{"type": "recursive", "start": "A", "goal": "F"}')
+    '{"result": {"path": ["A", "B", "D", "F"], "cost": 10, "fun": 11}}'
+    >>> server.handle_line('{"type": "pareto", "start": "A", "goal": "F"}')
+    '{"result": [["A", "B", "D", "F"], ["A", "C", "D", "F"]]}'
+    """
+
+    def __init__(self, edges_dict, cache_size=1024):
+        """
+        :param edges_dict: a Graph or a dictionary containing edges
+        and their respective cost and fun values
+        :param cache_size: number of cached recursive and greedy results
+        """
+        self.cache = PathCache(edges_dict, cache_size)
+        self.graph = self.cache.graph
+        self._cache_lock = threading.Lock()
+        self._print_lock = threading.Lock()
+        self._handlers = {
+            "recursive": self._recursive,
+            "greedy": self._greedy,
+            "k_best": self._k_best,
+            "pareto": self._pareto,
+            "weighted": self._weighted,
+            "epsilon": self._epsilon,
+        }
+
+    def handle(self, request):
+        """
+        Answers one query.
+        :param request: a dictionary with the query type and its fields
+        :return: a response dictionary with "result" or "error"
+        """
+        response = {}
+        if "id" in request:
+            response["id"] = request["id"]
+        handler = self._handlers.get(request.get("type"))
+        if handler is None:
+            response["error"] = f"Unknown query type {request.get('type')!r}."
+            return response
+        missing = _missing_field(request)
+        if missing is not None:
+            response["error"] = f"Missing field {missing!r}."
+            return response
+        messages = io.StringIO()
+        try:
+            if request.get("type") in _CACHED_TYPES:
+                with self._cache_lock:
+                    result = handler(request)
+            else:
+                # The optimization methods print their error messages,
+                # they must not end up in the output stream. Only one
+                # thread at a time may replace sys.stdout.
+                with self._print_lock, contextlib.redirect_stdout(messages):
+                    result = handler(request)
+        except Exception as error:
+            # A bad query must not stop the server.
+            response["error"] = str(error) or type(error).__name__
+            return response
+        if result is None and messages.getvalue():
+            response["error"] = messages.getvalue().strip()
+        else:
+            response["result"] = result
+        return response
+
+    def handle_line(self, line):
+        """
+        Answers one JSON line.
+        :param line: a JSON object as text
+        :return: the response as one line of JSON
+        """
+        request, error = _parse(line)
+        if error is not None:
+            return json.dumps(error)
+        return json.dumps(self.handle(request))
+
+    async def handle_line_async(self, line, executor=None):
+        """
+        Answers one JSON line without blocking the event loop.
+        Cached queries run on a thread of this process, all other
+        queries on the worker processes of the executor.
+        :param line: a JSON object as text
+        :param executor: a pool made by worker_pool or None to answer
+        every query on a thread of this process
+        :return: the response as one line of JSON
+        """
+        request, error = _parse(line)
+        if error is not None:
+            return json.dumps(error)
+        loop = asyncio.get_running_loop()
+        if executor is None or request.get("type") in _CACHED_TYPES:
+            response = await loop.run_in_executor(None, self.handle, request)
+        else:
+            try:
+                response = await loop.run_in_executor(
+                    executor, _handle_in_worker, request)
+            except Exception as error:
+                # A lost worker process must not stop the server.
+                response = {"error": str(error) or type(error).__name__}
+                if "id" in request:
+                    response = {"id": request["id"], **response}
+        return json.dumps(response)
+
+    def worker_pool(self, workers=None):
+        """
+        Starts the worker processes, each of them gets its own copy of
+        the graph. A graph loaded with load_graph is mapped from its file
+        by every worker, so the edges are not copied. Later changes of the
+        graph do not reach the workers.
+        :param workers: number of processes (default: one per CPU),
+        0 starts no pool
+        :return: a ProcessPoolExecutor or None
+        """
+        if workers == 0:
+            return None
+        file_path = getattr(self.graph, "file_path", None)
+        if file_path is not None:
+            initargs = (None, file_path, True)
+        else:
+            initargs = (dict(self.graph), None,
+                        isinstance(self.graph, CompactGraph))
+        return ProcessPoolExecutor(workers, initializer=_init_worker,
+                                   initargs=initargs)
+
+    def _recursive(self, request):
+        return _path_result(self.cache.weighted_best_path(
+            request["start"], request["goal"],
+            request.get("weight_cost", 1), request.get("weight_fun", 1)))
+
+    def _greedy(self, request):
+        return _path_result(self.cache.greedy_best_path(
+            request["start"], request["goal"], request["focus_value"]))
+
+    def _k_best(self, request):
+        return [_path_result(result) for result in best_paths(
+            request["start"], request["goal"], self.graph, request["k"],
+            request.get("weight_cost", 1), request.get("weight_fun", 1))]
+
+    def _pareto(self, request):
+        if "epsilon" in request or "max_size" in request:
+            epsilon = request.get("epsilon")
+            max_size = request.get("max_size")
+            if "paths" in request:
+                return _paths_result(approximate_pareto(
+                    _paths(request), self.graph, epsilon, max_size))
+            return _paths_result(approximate_pareto_front(
+                request["start"], request["goal"], self.graph, epsilon,
+                max_size))
+        if "paths" in request:
+            return _paths_result(pareto_optimal(_paths(request), self.graph))
+        return _paths_result(pareto_front(request["start"], request["goal"],
+                                          self.graph))
+
+    def _weighted(self, request):
+        return _paths_result(weighted_sum(
+            _paths(request), self.graph, request["weight_cost"],
+            request["weight_fun"]))
+
+    def _epsilon(self, request):
+        return _paths_result(epsilon_constraint(
+            _paths(request), self.graph, request["main_goal"],
+            request["sec_goal_value"]))
+
+
+def _init_worker(edges, file_path, compact):
+    if file_path is not None:
+        graph = load_graph(file_path)
+    elif compact:
+        graph = CompactGraph(edges)
+    else:
+        graph = Graph(edges)
+    _worker["server"] = QueryServer(graph)
+
+
+def _handle_in_worker(request):
+    return _worker["server"].handle(request)
+
+
+def _missing_field(request):
+    """
+    :return: the first required field the request lacks or None
+    """
+    fields = _REQUIRED_FIELDS[request["type"]]
+    if request["type"] == "pareto" and "paths" not in request:
+        fields = ("start", "goal")
+    for field in fields:
+        if field not in request:
+            return field
+    return None
+
+
+def _parse(line):
+    """
+    Reads one JSON line.
+    :return: a tuple (request, error response), one of them is None
+    """
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as error:
+        return None, {"error": f"Invalid JSON: {error.msg}."}
+    if not isinstance(request, dict):
+        return None, {"error": "A query has to be a JSON object."}
+    return request, None
+
+
+def _paths(request):
+    return [tuple(path) for path in request["paths"]]
+
+
+def _path_result(result):
+    if result is None:
+        return None
+    path, cost, fun = result
+    return {"path": list(path), "cost": cost, "fun": fun}
+
+
+def _paths_result(paths):
+    if paths is None:
+        return None
+    return sorted(list(path) for path in paths)
+
+
+async def serve_stream(server, reader, write, executor=None):
+    """
+    Answers the JSON lines of a stream until it ends.
+    The next line is read while the current one is answered,
+    the responses keep the order of the lines.
+    :param server: a QueryServer
+    :param reader: an async function returning the next line
+    ("" at the end of the stream)
+    :param write: an async function sending one response line
+    :param executor: a pool made by QueryServer.worker_pool or None
+    """
+    next_line = asyncio.ensure_future(reader())
+    while True:
+        line = await next_line
+        if not line:
+            break
+        next_line = asyncio.ensure_future(reader())
+        if line.strip():
+            await write(await server.handle_line_async(line, executor)
+                        + "\n")
+
+
+async def serve_stdin(server, input_stream=None, output_stream=None,
+                      workers=None):
+    """
+    Answers JSON lines from stdin on stdout.
+    :param server: a QueryServer
+    :param input_stream: stream to read from (default: sys.stdin)
+    :param output_stream: stream to write to (default: sys.stdout)
+    :param workers: number of worker processes, see QueryServer.worker_pool
+    >>> output = io.StringIO()
+    >>> asyncio.run(serve_stdin(QueryServer(CAT_EDGES), io.StringIO(
+    ...     '{"id": "a", "type": "greedy", "start": "A", "goal": "F",'
+    ...     ' "focus_value": "cost"}\\nnot json\\n'
+    ...     '{"id": "b", "type": "weighted", "weight_cost": 1,'
+    ...     ' "weight_fun": 1, "paths": [["A", "F"]]}\\n'), output, 1))
+    >>> print(output.getvalue(), end="")
+    {"id": "a", "result": {"path": ["A", "C", "D", "F"], "cost": 6, "fun": 7}}
+    {"error": "Invalid JSON: Expecting value."}
+    {"id": "b", "error": "Atleast one path is invalid."}
+    """
+    input_stream = input_stream or sys.stdin
+    output_stream = output_stream or sys.stdout
+
+    async def read():
+        return await asyncio.to_thread(input_stream.readline)
+
+    async def write(text):
+        output_stream.write(text)
+        output_stream.flush()
+
+    executor = server.worker_pool(workers)
+    try:
+        await serve_stream(server, read, write, executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+async def serve_unix_socket(server, socket_path, workers=None):
+    """
+    Answers JSON lines on a Unix socket, every connection is served
+    concurrently. Runs until it is cancelled.
+    :param server: a QueryServer
+    :param socket_path: path of the socket file
+    :param workers: number of worker processes, see QueryServer.worker_pool
+    """
+    async def connection(reader, writer):
+        async def read():
+            return (await reader.readline()).decode("utf-8")
+
+        async def write(text):
+            writer.write(text.encode("utf-8"))
+            await writer.drain()
+
+        try:
+            await serve_stream(server, read, write, executor)
+        finally:
+            writer.close()
+
+    executor = server.worker_pool(workers)
+    try:
+        unix_server = await asyncio.start_unix_server(connection, socket_path)
+        async with unix_server:
+            await unix_server.serve_forever()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    doctest.testmod()
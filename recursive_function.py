@@ -4,6 +4,11 @@ with cost and fun (Ablenkungswert) values.
 """
 __author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
 
+import contextlib
+import heapq
+from graph import CAT_EDGES, Graph, cost_fun_graph
+from search_stats import SearchStats, timed
+
 
 def optimize_weighted(cost, fun, weight_cost=1, weight_fun=1):
     """
@@ -28,25 +33,6 @@ def optimize_weighted(cost, fun, weight_cost=1, weight_fun=1):
     return cost * weight_cost - fun * weight_fun
 
 
-# Example graph
-CAT_EDGES = {
-    ("A", "B"): (3, 2),
-    ("A", "C"): (1, 0),
-    ("B", "A"): (1, 0),
-    ("B", "D"): (4, 5),
-    ("B", "E"): (2, 1),
-    ("C", "A"): (1, 0),
-    ("C", "D"): (2, 3),
-    ("D", "B"): (4, 5),
-    ("D", "C"): (2, 3),
-    ("D", "F"): (3, 4),
-    ("E", "B"): (2, 1),
-    ("E", "F"): (5, 0),
-    ("F", "D"): (3, 4),
-    ("F", "E"): (5, 0)
-}
-
-
 def recursive_best_path(
     current,
     goal,
@@ -55,11 +41,18 @@ def recursive_best_path(
     path=None,
     acc_cost=0,
     acc_fun=0,
-    visited=None
+    visited=None,
+    stats=None,
+    prune=False
 ):
     """
     Recursively finds the optimal path
     according to a given optimization function.
+    With prune=True the search runs in bounded_best_path, which cuts off
+    every partial path that cannot beat the best path found so far and
+    returns the same result. This only works for linear scores like
+    optimize_weighted, the weights are read from optimize_func(1, 0)
+    and optimize_func(0, 1). The cut off subtrees are counted as pruned.
     >>> result = recursive_best_path("A", "F", CAT_EDGES, optimize_weighted)
     >>> result[0][0]
     'A'
@@ -72,7 +65,38 @@ def recursive_best_path(
     >>> recursive_best_path("A", "Z", CAT_EDGES, optimize_weighted) is None
     True
 
+    A prebuilt Graph gives the same result:
+    >>> (recursive_best_path("A", "F", Graph(CAT_EDGES), optimize_weighted)
+    ...     == recursive_best_path("A", "F", CAT_EDGES, optimize_weighted))
+    True
+
+    Without the optional arguments the search runs in iterative_best_path,
+    which returns the same result without recursion.
+
+    A SearchStats object passed as stats counts the work of the search:
+    >>> stats = SearchStats()
+    >>> _ = recursive_best_path("A", "F", CAT_EDGES, optimize_weighted,
+    ...                         stats=stats)
+    >>> stats.nodes_expanded, stats.paths_completed, stats.max_depth
+    (9, 4, 5)
+
+    >>> def cost_first(cost, fun):
+    ...     return optimize_weighted(cost, fun, 10, 1)
+    >>> stats = SearchStats()
+    >>> recursive_best_path("A", "F", CAT_EDGES, cost_first, stats=stats,
+    ...                     prune=True)
+    (['A', 'C', 'D', 'F'], 6, 7)
+    >>> stats.nodes_expanded, stats.paths_pruned
+    (6, 2)
     """
+    # Build the adjacency index once, recursive calls reuse it.
+    edges_dict = cost_fun_graph(edges_dict)
+    if path is None and visited is None and acc_cost == 0 and acc_fun == 0:
+        if prune:
+            return _pruned_best_path(current, goal, edges_dict,
+                                     optimize_func, stats)
+        return iterative_best_path(current, goal, edges_dict, optimize_func,
+                                   stats)
     if path is None:
         path = [current]
     if visited is None:
@@ -80,20 +104,23 @@ def recursive_best_path(
 
     # base case
     if current == goal:
+        if stats is not None:
+            stats.paths_completed += 1
+            stats.max_depth = max(stats.max_depth, len(path) - 1)
         return path, acc_cost, acc_fun
 
     visited.add(current)
+    if stats is not None:
+        stats.nodes_expanded += 1
+        stats.edges_scanned += len(edges_dict.neighbors(current))
+        stats.max_depth = max(stats.max_depth, len(path) - 1)
 
     best_result = None
     best_score = float("inf")
 
     # find neighbors
-    neighbors = [n2 for (n1, n2) in edges_dict if n1 == current]
-
-    for neighbor in neighbors:
+    for neighbor, edge_cost, edge_fun in edges_dict.neighbors(current):
         if neighbor not in visited:
-            edge_cost, edge_fun = edges_dict[(current, neighbor)]
-
             # recursive call
             result = recursive_best_path(
                 neighbor,
@@ -103,7 +130,8 @@ def recursive_best_path(
                 path + [neighbor],
                 acc_cost + edge_cost,
                 acc_fun + edge_fun,
-                visited.copy()
+                visited.copy(),
+                stats
             )
 
             if result is not None:
@@ -117,6 +145,351 @@ def recursive_best_path(
     return best_result
 
 
+def _pruned_best_path(start, goal, edges_dict, optimize_func, stats):
+    """
+    Runs bounded_best_path with the weights of a linear optimize_func.
+    """
+    offset = optimize_func(0, 0)
+    weight_cost = optimize_func(1, 0) - offset
+    weight_fun = offset - optimize_func(0, 1)
+    with timed(stats, "search"):
+        result, pruned = bounded_best_path(start, goal, edges_dict,
+                                           weight_cost, weight_fun, stats)
+    if stats is not None:
+        stats.paths_pruned += pruned
+        if result is not None:
+            stats.paths_completed += 1
+    return result
+
+
+def iterative_best_path(start, goal, edges_dict, optimize_func, stats=None):
+    """
+    Finds the optimal path like recursive_best_path,
+    but with an explicit stack instead of recursive calls.
+    The current path is a single list of node ids that grows and shrinks,
+    visited nodes are marked in a bytearray, so extending a path does not
+    copy the path or the visited nodes. Deep paths are not limited by
+    Python's recursion limit.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param optimize_func: function rating a path by its total cost and fun,
+    a lower result is better
+    :param stats: optional SearchStats object that counts the work
+    and times the search
+    :return: a tuple (best_path, total_cost, total_fun) or None
+    >>> iterative_best_path("A", "F", CAT_EDGES, optimize_weighted)
+    (['A', 'B', 'D', 'F'], 10, 11)
+    >>> stats = SearchStats()
+    >>> _ = iterative_best_path("A", "F", CAT_EDGES, optimize_weighted, stats)
+    >>> stats.nodes_expanded, stats.edges_scanned, stats.paths_completed
+    (9, 22, 4)
+    >>> iterative_best_path("A", "Z", CAT_EDGES, optimize_weighted) is None
+    True
+    >>> chain = {(i, i + 1): (1, 0) for i in range(5000)}
+    >>> iterative_best_path(0, 5000, chain, optimize_weighted)[1:]
+    (5000, 0)
+    """
+    if start == goal:
+        if stats is not None:
+            stats.paths_completed += 1
+        return [start], 0, 0
+    edges_dict = cost_fun_graph(edges_dict)
+    node_ids, adjacency = edges_dict.indexed()
+    if start not in node_ids or goal not in node_ids:
+        return None
+    with timed(stats, "search"):
+        best_result = _iterative_search(node_ids[start], node_ids[goal],
+                                        adjacency, optimize_func, stats)
+    if best_result is None:
+        return None
+    best_path, total_cost, total_fun = best_result
+    return [edges_dict.nodes[i] for i in best_path], total_cost, total_fun
+
+
+def _iterative_search(start_id, goal_id, adjacency, optimize_func, stats):
+    """
+    Search loop of iterative_best_path on node ids.
+    Every expanded node has all of its edges scanned, so the counters
+    only change when the path gets one step deeper or reaches the goal.
+    """
+    counting = stats is not None
+    expanded = 1
+    scanned = len(adjacency[start_id])
+    completed = 0
+    max_depth = 0
+    visited = bytearray(len(adjacency))
+    visited[start_id] = 1
+    # One entry per depth: node id, cost and fun so far, remaining edges.
+    path = [start_id]
+    path_costs = [0]
+    path_funs = [0]
+    edge_iterators = [iter(adjacency[path[0]])]
+    best_result = None
+    best_score = float("inf")
+    while edge_iterators:
+        for neighbor, edge_cost, edge_fun in edge_iterators[-1]:
+            if visited[neighbor]:
+                continue
+            total_cost = path_costs[-1] + edge_cost
+            total_fun = path_funs[-1] + edge_fun
+            if neighbor == goal_id:
+                if counting:
+                    completed += 1
+                    max_depth = max(max_depth, len(path))
+                score = optimize_func(total_cost, total_fun)
+                if score < best_score:
+                    best_score = score
+                    best_result = (path + [goal_id], total_cost, total_fun)
+                continue
+            # Go one step deeper.
+            visited[neighbor] = 1
+            path.append(neighbor)
+            path_costs.append(total_cost)
+            path_funs.append(total_fun)
+            edges = adjacency[neighbor]
+            edge_iterators.append(iter(edges))
+            if counting:
+                expanded += 1
+                scanned += len(edges)
+                max_depth = max(max_depth, len(path) - 1)
+            break
+        else:
+            # Every edge is tried, go back one step.
+            visited[path.pop()] = 0
+            path_costs.pop()
+            path_funs.pop()
+            edge_iterators.pop()
+    if counting:
+        stats.nodes_expanded += expanded
+        stats.edges_scanned += scanned
+        stats.paths_completed += completed
+        stats.max_depth = max(stats.max_depth, max_depth)
+    return best_result
+
+
+def remaining_bounds(edges_dict, goal, weight_cost=1, weight_fun=1):
+    """
+    Precomputes for every node an optimistic (lowest possible) score
+    of the remaining way to the goal, scored with optimize_weighted.
+    If no edge has a negative score, the bound is the shortest distance
+    to the goal. Otherwise it is the best outgoing edge of the node,
+    the remaining nodes are accounted for by the search itself.
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param goal: a string containing the goal node
+    :param weight_cost: weight of the cost value
+    :param weight_fun: weight of the fun value
+    :return: a tuple (bounds, slack) of two dictionaries, bounds holds the
+    bound of each node that can reach the goal, slack holds the negative part
+    of each node's best outgoing edge (empty if no edge score is negative)
+    >>> bounds, slack = remaining_bounds(CAT_EDGES, "F", 1, 0)
+    >>> bounds["A"], bounds["B"], bounds["F"], slack
+    (6, 7, 0, {})
+    >>> bounds, slack = remaining_bounds(CAT_EDGES, "F")
+    >>> bounds["B"], slack["B"], slack["E"]
+    (-1, -1, 0)
+    """
+    edges_dict = cost_fun_graph(edges_dict)
+    # Collect the reversed edges with their scores.
+    incoming = {node: [] for node in edges_dict.nodes}
+    best_out = {}
+    for (node1, node2), (cost, fun) in edges_dict.items():
+        score = optimize_weighted(cost, fun, weight_cost, weight_fun)
+        incoming[node2].append((node1, score))
+        if node1 != goal:
+            best_out[node1] = min(best_out.get(node1, score), score)
+    if goal not in incoming:
+        return {}, {}
+    if all(score >= 0 for score in best_out.values()):
+        # Dijkstra on the reversed graph, starting at the goal.
+        bounds = {}
+        queue = [(0, 0, goal)]
+        counter = 1
+        while queue:
+            distance, _, node = heapq.heappop(queue)
+            if node in bounds:
+                continue
+            bounds[node] = distance
+            for previous, score in incoming[node]:
+                if previous not in bounds:
+                    heapq.heappush(queue,
+                                   (distance + score, counter, previous))
+                    counter += 1
+        return bounds, {}
+    # Only nodes that can reach the goal get a bound.
+    reachable = {goal}
+    stack = [goal]
+    while stack:
+        node = stack.pop()
+        for previous, _ in incoming[node]:
+            if previous not in reachable:
+                reachable.add(previous)
+                stack.append(previous)
+    bounds = {goal: 0}
+    slack = {}
+    for node in reachable:
+        if node != goal:
+            bounds[node] = best_out[node]
+            slack[node] = min(0, best_out[node])
+    return bounds, slack
+
+
+def bounded_best_path(start, goal, edges_dict, weight_cost=1, weight_fun=1,
+                      stats=None):
+    """
+    Branch-and-bound version of recursive_best_path for
+    the optimize_weighted score. The best score found so far is kept,
+    every partial path whose optimistic bound cannot beat it is cut off.
+    The result is the same path the exhaustive search returns.
+    :param start: a string containing the start node
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param weight_cost: weight of the cost value
+    :param weight_fun: weight of the fun value
+    :param stats: optional SearchStats object, counts the expanded nodes
+    and their scanned edges
+    :return: a tuple (result, pruned), result is (best_path, total_cost,
+    total_fun) or None, pruned is the number of cut off subtrees
+    >>> result, pruned = bounded_best_path("A", "F", CAT_EDGES)
+    >>> result == recursive_best_path("A", "F", CAT_EDGES, optimize_weighted)
+    True
+    >>> bounded_best_path("A", "F", CAT_EDGES, 10, 1)
+    ((['A', 'C', 'D', 'F'], 6, 7), 2)
+    >>> bounded_best_path("A", "Z", CAT_EDGES)
+    (None, 0)
+    """
+    edges_dict = cost_fun_graph(edges_dict)
+    bounds, slack = remaining_bounds(edges_dict, goal, weight_cost, weight_fun)
+    result, _, pruned = bounded_search_from(
+        [start], goal, edges_dict, weight_cost, weight_fun, bounds, slack,
+        stats=stats)
+    return result, pruned
+
+
+def bounded_search_from(prefix, goal, edges_dict, weight_cost, weight_fun,
+                        bounds, slack, shared_best=None, stats=None):
+    """
+    Runs the branch-and-bound search below a given path prefix.
+    :param prefix: a list of nodes the searched paths start with
+    :param goal: a string containing the goal node
+    :param edges_dict: a Graph or a dictionary containing edges
+    and their respective cost and fun values
+    :param weight_cost: weight of the cost value
+    :param weight_fun: weight of the fun value
+    :param bounds: the bounds from remaining_bounds
+    :param slack: the slack from remaining_bounds
+    :param shared_best: optional object whose value attribute holds the best
+    score found by other searches, only paths that are strictly worse are
+    cut off with it, so equally good paths are still found
+    :param stats: optional SearchStats object, counts the expanded nodes
+    and their scanned edges
+    :return: a tuple (result, score, pruned), result is (best_path,
+    total_cost, total_fun) or None
+    >>> bounds, slack = remaining_bounds(CAT_EDGES, "F")
+    >>> bounded_search_from(["A", "C"], "F", CAT_EDGES, 1, 1, bounds, slack)
+    ((['A', 'C', 'D', 'F'], 6, 7), -1, 0)
+    """
+    edges_dict = cost_fun_graph(edges_dict)
+    best_result = None
+    best_score = float("inf")
+    pruned = 0
+    if prefix[-1] not in bounds:
+        return None, best_score, 0
+    prefix_cost = 0
+    prefix_fun = 0
+    for node1, node2 in zip(prefix, prefix[1:]):
+        edge_cost, edge_fun = edges_dict[(node1, node2)]
+        prefix_cost += edge_cost
+        prefix_fun += edge_fun
+    if prefix[-1] == goal:
+        return (list(prefix), prefix_cost, prefix_fun), optimize_weighted(
+            prefix_cost, prefix_fun, weight_cost, weight_fun), 0
+    path = list(prefix)
+    visited = set(prefix)
+    # One entry per node below the prefix: cost, fun and slack so far,
+    # remaining edges.
+    path_costs = [prefix_cost]
+    path_funs = [prefix_fun]
+    slacks_left = [sum(slack.values()) - sum(slack.get(node, 0)
+                                             for node in prefix)]
+    edges = edges_dict.neighbors(prefix[-1])
+    edge_iterators = [iter(edges)]
+    expanded = 1
+    scanned = len(edges)
+    while edge_iterators:
+        acc_cost = path_costs[-1]
+        acc_fun = path_funs[-1]
+        slack_left = slacks_left[-1]
+        acc_score = optimize_weighted(acc_cost, acc_fun,
+                                      weight_cost, weight_fun)
+        other_best = float("inf")
+        if shared_best is not None:
+            other_best = shared_best.value
+        for neighbor, edge_cost, edge_fun in edge_iterators[-1]:
+            if neighbor in visited:
+                continue
+            if neighbor not in bounds:
+                # The goal cannot be reached from this neighbor.
+                pruned += 1
+                continue
+            neighbor_slack = slack.get(neighbor, 0)
+            # Optimistic score of the best way through this neighbor.
+            bound = (acc_score
+                     + optimize_weighted(edge_cost, edge_fun,
+                                         weight_cost, weight_fun)
+                     + bounds[neighbor] + slack_left - neighbor_slack)
+            if bound >= best_score or bound > other_best:
+                pruned += 1
+                continue
+            total_cost = acc_cost + edge_cost
+            total_fun = acc_fun + edge_fun
+            if neighbor == goal:
+                score = optimize_weighted(total_cost, total_fun,
+                                          weight_cost, weight_fun)
+                if score < best_score:
+                    best_score = score
+                    best_result = (path + [goal], total_cost, total_fun)
+                    if shared_best is not None:
+                        _share_best(shared_best, score)
+                continue
+            # Go one step deeper.
+            visited.add(neighbor)
+            path.append(neighbor)
+            path_costs.append(total_cost)
+            path_funs.append(total_fun)
+            slacks_left.append(slack_left - neighbor_slack)
+            edges = edges_dict.neighbors(neighbor)
+            edge_iterators.append(iter(edges))
+            expanded += 1
+            scanned += len(edges)
+            break
+        else:
+            # Every edge is tried, go back one step.
+            visited.discard(path.pop())
+            path_costs.pop()
+            path_funs.pop()
+            slacks_left.pop()
+            edge_iterators.pop()
+    if stats is not None:
+        stats.nodes_expanded += expanded
+        stats.edges_scanned += scanned
+    return best_result, best_score, pruned
+
+
+def _share_best(shared_best, score):
+    """
+    Lowers the shared best score. A multiprocessing.Value is checked and
+    set under its lock, so another process cannot raise it in between.
+    """
+    get_lock = getattr(shared_best, "get_lock", None)
+    with get_lock() if get_lock is not None else contextlib.nullcontext():
+        if score < shared_best.value:
+            shared_best.value = score
+
+
 if __name__ == "__main__":
 
     # Test 1: normal case
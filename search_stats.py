@@ -0,0 +1,114 @@
+"""
+Optional instrumentation of the searches and optimization methods.
+A SearchStats object is passed to a function with the stats argument,
+the function then counts its work and times its phases in it.
+Without a stats object the functions skip the counting.
+"""
+__author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
+
+import contextlib
+import doctest
+import time
+
+
+# Phases used by the functions: "search" walks the graph, "evaluation" sums
+# up the values of paths, "dominance" filters dominated paths and
+# "selection" chooses the best paths.
+_NO_TIMING = contextlib.nullcontext()
+
+
+class SearchStats:
+    """
+    Counters and phase times of one or more function calls.
+    The counters are summed up over all calls, max_depth is the most
+    edges of a path seen in any call.
+    - nodes_expanded: nodes (or labels) whose outgoing edges were looked at
+    - edges_scanned: edges looked at, for path lists the edges of the paths
+    - paths_completed: paths that reached the goal or were evaluated
+    - paths_pruned: partial paths that were cut off, for path lists the
+      paths that were not chosen
+    - max_depth: number of edges of the longest path seen
+    - phase_times: seconds spent in every phase
+    The optional callback is called after every phase with
+    (phase, seconds, stats), for example to log slow queries.
+    >>> stats = SearchStats()
+    >>> with stats.phase("search"):
+    ...     stats.nodes_expanded += 1
+    >>> stats.as_dict()["nodes_expanded"], list(stats.phase_times)
+    (1, ['search'])
+    >>> seen = []
+    >>> stats = SearchStats(lambda phase, seconds, _: seen.append(phase))
+    >>> stats.add_time("selection", 0.5)
+    >>> seen, stats.phase_times
+    (['selection'], {'selection': 0.5})
+    """
+
+    def __init__(self, callback=None):
+        """
+        :param callback: optional function called after every phase
+        with the phase name, its seconds and the stats object
+        """
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        """
+        Sets every counter and time back to zero.
+        """
+        self.nodes_expanded = 0
+        self.edges_scanned = 0
+        self.paths_completed = 0
+        self.paths_pruned = 0
+        self.max_depth = 0
+        self.phase_times = {}
+
+    def add_time(self, phase, seconds):
+        """
+        Adds the seconds of one phase and calls the callback.
+        :param phase: name of the phase
+        :param seconds: time spent in the phase
+        """
+        self.phase_times[phase] = self.phase_times.get(phase, 0) + seconds
+        if self.callback is not None:
+            self.callback(phase, seconds, self)
+
+    @contextlib.contextmanager
+    def phase(self, phase):
+        """
+        Times the code inside a with block as the given phase.
+        :param phase: name of the phase
+        """
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_time(phase, time.perf_counter() - start)
+
+    def as_dict(self):
+        """
+        :return: a dictionary with every counter and the phase times
+        """
+        return {"nodes_expanded": self.nodes_expanded,
+                "edges_scanned": self.edges_scanned,
+                "paths_completed": self.paths_completed,
+                "paths_pruned": self.paths_pruned,
+                "max_depth": self.max_depth,
+                "phase_times": dict(self.phase_times)}
+
+
+def timed(stats, phase):
+    """
+    Returns a context manager that times a phase if stats is given
+    and does nothing otherwise.
+    :param stats: a SearchStats object or None
+    :param phase: name of the phase
+    >>> with timed(None, "search"):
+    ...     pass
+    """
+    if stats is None:
+        return _NO_TIMING
+    return stats.phase(phase)
+
+
+if __name__ == "__main__":
+    doctest.testmod()
@@ -1,19 +1,28 @@
 """
 Time measurement using timeit.
-This module compares the runtime of the recursive and greedy algorithms.
+This module compares the runtime of the recursive and greedy algorithms
+on the example graph. The benchmark suite in benchmark.py measures all
+functions on larger synthetic graphs.
 """
 __author__ = "8249067, Sanchez, 8724694, Tran, 8572770, Kesidis"
 
+import random
 import timeit
+import tracemalloc
 
 # Import the recursive path finding algorithm and its optimization function
-from recursive_function import recursive_best_path, optimize_weighted
+from recursive_function import (
+    recursive_best_path, iterative_best_path, bounded_best_path,
+    optimize_weighted)
+
+# Import the parallel search
+from parallel_search import ParallelSearch
 
 # Import the greedy path finding algorithm
 from greedy_algo import greedy_best_path
 
-# Import the graph used for testing
-from multiobjective_optimization import CAT_EDGES
+# Import the graph used for testing and the pareto filter
+from multiobjective_optimization import CAT_EDGES, pareto_indices
 
 
 def measure_recursive_time():
@@ -35,11 +44,117 @@ def measure_greedy_time():
     """
     return timeit.timeit(
         # lambda wraps the greedy function call
-        lambda: greedy_best_path(CAT_EDGES, "A", "F", "cost"),
+        lambda: greedy_best_path("A", "F", CAT_EDGES, "cost"),
         number=10000
     )
 
 
+def nested_loop_pareto(paths_values):
+    """
+    The former pareto filter of pareto_optimal, which compares
+    every value with every other value. Only kept for comparison.
+    >>> nested_loop_pareto([(6, 7), (10, 11), (10, 3)])
+    [0, 1]
+    """
+    optimal_indices = []
+    for i, path1 in enumerate(paths_values):
+        for path2 in paths_values:
+            if path1[0] > path2[0] and path1[1] < path2[1]:
+                break
+        else:
+            optimal_indices.append(i)
+    return optimal_indices
+
+
+def measure_pareto_scaling(sizes=(1000, 2000, 4000, 8000), seed=1):
+    """
+    Measures the nested loop against the sort-and-sweep pareto filter
+    for growing numbers of random (cost, fun) values.
+    Cost and fun are correlated, so a noticeable part of the values
+    is pareto optimal, like for real paths.
+    :param sizes: numbers of values to measure
+    :param seed: seed of the random values
+    :return: a list of (size, nested loop time, sweep time) tuples
+    """
+    generator = random.Random(seed)
+    results = []
+    for size in sizes:
+        paths_values = []
+        for _ in range(size):
+            cost = generator.randint(0, 10 * size)
+            paths_values.append((cost, cost + generator.randint(0, size)))
+        nested_time = timeit.timeit(
+            lambda: nested_loop_pareto(paths_values), number=1)
+        sweep_time = timeit.timeit(
+            lambda: pareto_indices(paths_values), number=1)
+        results.append((size, nested_time, sweep_time))
+    return results
+
+
+def measure_search_memory(node_count=10, seed=1):
+    """
+    Compares the recursive search (path and visited set copied on every
+    call) with the iterative search (one path buffer, bytearray visited)
+    on a random complete graph.
+    :param node_count: number of nodes of the complete graph
+    :param seed: seed of the random edge values
+    :return: a dictionary with time and peak memory in bytes
+    for "recursive" and "iterative"
+    """
+    generator = random.Random(seed)
+    edges = {(node1, node2): (generator.randint(1, 9), generator.randint(0, 9))
+             for node1 in range(node_count) for node2 in range(node_count)
+             if node1 != node2}
+    goal = node_count - 1
+    searches = {
+        # The optional arguments force the original recursive search.
+        "recursive": lambda: recursive_best_path(
+            0, goal, edges, optimize_weighted, [0], 0, 0, set()),
+        "iterative": lambda: iterative_best_path(
+            0, goal, edges, optimize_weighted),
+    }
+    results = {}
+    for name, search in searches.items():
+        search_time = timeit.timeit(search, number=1)
+        tracemalloc.start()
+        search()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {"time": search_time, "peak_bytes": peak}
+    return results
+
+
+def measure_parallel_search(node_count=14, worker_counts=(1, 2, 4, 8),
+                            frontier_depth=2, seed=1):
+    """
+    Measures the parallel search with different numbers of processes
+    against the serial branch-and-bound search on a random dense graph.
+    The processes are started and get the graph before the time is taken,
+    so only the search itself is measured, like for a long running pool.
+    :param node_count: number of nodes of the graph
+    :param worker_counts: numbers of processes to measure
+    :param frontier_depth: number of edges expanded before splitting
+    :param seed: seed of the random edge values
+    :return: a list of (workers, time) tuples, workers 0 is the serial search
+    """
+    generator = random.Random(seed)
+    edges = {(node1, node2): (generator.randint(1, 9), generator.randint(0, 9))
+             for node1 in range(node_count) for node2 in range(node_count)
+             if node1 != node2 and generator.random() < 0.7}
+    goal = node_count - 1
+    results = [(0, timeit.timeit(
+        lambda: bounded_best_path(0, goal, edges), number=1))]
+    for workers in worker_counts:
+        with ParallelSearch(edges, workers) as search:
+            # Start the processes.
+            search.best_path(0, 1)
+            results.append((workers, timeit.timeit(
+                lambda: search.best_path(0, goal,
+                                         frontier_depth=frontier_depth),
+                number=1)))
+    return results
+
+
 if __name__ == "__main__":
     # Execute time measurements
     recursive_time = measure_recursive_time()
@@ -48,3 +163,23 @@ if __name__ == "__main__":
     # Print measured execution times
     print("Recursive algorithm (10000 runs):", recursive_time)
     print("Greedy algorithm (10000 runs):", greedy_time)
+
+    # Compare both pareto filters for growing numbers of paths
+    for size, nested_time, sweep_time in measure_pareto_scaling():
+        print(f"Pareto filter ({size} paths): nested loop {nested_time:.4f}s,"
+              f" sort-and-sweep {sweep_time:.4f}s")
+
+    # Compare time and memory of the recursive and iterative search
+    for name, result in measure_search_memory().items():
+        print(f"{name} search: {result['time']:.4f}s,"
+              f" peak {result['peak_bytes']} bytes")
+
+    # Measure the parallel search with growing numbers of processes
+    parallel_times = measure_parallel_search()
+    one_worker_time = dict(parallel_times).get(1)
+    for workers, search_time in parallel_times:
+        speedup = ""
+        if workers and one_worker_time:
+            speedup = f" (speedup {one_worker_time / search_time:.2f}x)"
+        print(f"Branch and bound with {workers or 'no'} worker processes:"
+              f" {search_time:.4f}s{speedup}")